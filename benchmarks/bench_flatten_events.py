@@ -0,0 +1,143 @@
+"""
+Benchmarks the columnar tjt_inventory.flatten_events against the original nested loop
+over events, packages and locations, on a synthetic multi-season Events/List payload.
+
+Usage:
+    python benchmarks/bench_flatten_events.py --seasons 10 --events 60
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import pandas as pd
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tjt_inventory import flatten_events
+from tjt_mock_data import make_events
+
+
+def make_payload(n_seasons, n_events, seed=0):
+    """Events/List across n_seasons consecutive seasons, n_events fixtures each."""
+    events = []
+    for season in range(n_seasons):
+        season_events = make_events(n_events, random.Random(seed + season), datetime(2025 - season, 8, 16, 15, 0))
+        for event in season_events:
+            event["Id"] += season * n_events
+        events.extend(season_events)
+    return events
+
+
+def legacy_flatten_events(events):
+    """The original loop, kept verbatim for comparison."""
+    all_rows = []
+    for event in events:
+        event_id = event.get("Id")
+        event_name = event.get("Name")
+        kick_off = event.get("KickOffEventStart")
+        competition = event.get("EventCompetition")
+        gender = event.get("Gender")
+        go_live_date = event.get("GoLiveDate")
+
+        packages = event.get("HospitalityPackages", [])
+        if not packages:
+            continue
+
+        for pkg in packages:
+            package_id = pkg.get("PackageId")
+            package_name = pkg.get("PackageName")
+            price = pkg.get("Price")
+            max_sale_quantity = pkg.get("MaxSaleQuantity", 0)
+            available_seats = pkg.get("AvailableSeats", None)
+
+            locations = pkg.get("Locations", [])
+            if not locations:
+                all_rows.append({
+                    "EventId": event_id,
+                    "EventName": event_name,
+                    "KickOffEventStart": kick_off,
+                    "EventCompetition": competition,
+                    "Gender": gender,
+                    "GoLiveDate": go_live_date,
+                    "PackageId": package_id,
+                    "PackageName": package_name,
+                    "AvailableSeats": available_seats,
+                    "MaxSaleQuantity": max_sale_quantity,
+                    "Price": price,
+                    "Capacity": None
+                })
+            else:
+                for loc in locations:
+                    capacity = loc.get("Capacity")
+                    all_rows.append({
+                        "EventId": event_id,
+                        "EventName": event_name,
+                        "KickOffEventStart": kick_off,
+                        "EventCompetition": competition,
+                        "Gender": gender,
+                        "GoLiveDate": go_live_date,
+                        "PackageId": package_id,
+                        "PackageName": package_name,
+                        "AvailableSeats": available_seats,
+                        "MaxSaleQuantity": max_sale_quantity,
+                        "Price": price,
+                        "Capacity": capacity
+                    })
+
+    df = pd.DataFrame(all_rows, columns=[
+        "EventId", "EventName", "KickOffEventStart", "EventCompetition", "Gender", "GoLiveDate",
+        "PackageId", "PackageName", "AvailableSeats", "MaxSaleQuantity", "Price", "Capacity",
+    ])
+
+    if 'KickOffEventStart' in df.columns:
+        df['KickOffEventStart'] = pd.to_datetime(df['KickOffEventStart'], errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S')
+    if 'GoLiveDate' in df.columns:
+        df['GoLiveDate'] = pd.to_datetime(df['GoLiveDate'], errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    return df
+
+
+def legacy_with_dashboard_parse(events):
+    """The legacy loop plus the parse the dashboards ran on its text dates."""
+    df = legacy_flatten_events(events)
+    df["KickOffEventStart"] = pd.to_datetime(df["KickOffEventStart"], errors="coerce")
+    df["GoLiveDate"] = pd.to_datetime(df["GoLiveDate"], errors="coerce")
+    return df
+
+
+def time_call(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--seasons", type=int, default=10)
+    arg_parser.add_argument("--events", type=int, default=60)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    events = make_payload(args.seasons, args.events)
+
+    legacy_time, legacy_df = time_call(legacy_with_dashboard_parse, events, repeat=args.repeat)
+    columnar_time, columnar_df = time_call(flatten_events, events, repeat=args.repeat)
+
+    # Same rows; the columnar path keeps datetime64 dates instead of text
+    assert pd.api.types.is_datetime64_any_dtype(columnar_df["KickOffEventStart"])
+    assert pd.api.types.is_datetime64_any_dtype(columnar_df["GoLiveDate"])
+    pd.testing.assert_frame_equal(columnar_df, legacy_df, check_dtype=False)
+
+    print(f"events={len(events)} rows={len(columnar_df)}")
+    print(f"legacy loop : {legacy_time:8.3f}s  {len(legacy_df) / legacy_time:12,.0f} rows/s")
+    print(f"columnar    : {columnar_time:8.3f}s  {len(columnar_df) / columnar_time:12,.0f} rows/s")
+    print(f"speedup     : {legacy_time / columnar_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmarks every stage of the tjt_hosp_api ingest on synthetic seasons (tjt_mock_data)
+at several sizes, reporting wall time, peak RSS and rows/s per stage.
+
+Each size runs in its own process so peak RSS isn't inherited from a larger run.
+Results are appended to benchmarks/results/ingest_history.jsonl and compared with
+the previous run of the same size, so regressions show up when the transforms change.
+
+Usage:
+    python benchmarks/bench_ingest.py --sizes 10000,100000,1000000
+    python benchmarks/bench_ingest.py --sizes 10000 --fail-on-regression
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import threading
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HISTORY_PATH = os.path.join(ROOT, "benchmarks", "results", "ingest_history.jsonl")
+DEFAULT_SIZES = "10000,100000,1000000"
+
+
+def current_rss():
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # No /proc (e.g. macOS): fall back to the process-wide peak, reported in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class PeakRSS:
+    """Samples RSS on a thread while the with-block runs and keeps the highest value."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def _sample(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, current_rss())
+            self._done.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+def run_stages(n_transactions, seed):
+    """Runs the ingest stages once on a generated season and returns their metrics."""
+    import pandas as pd
+    import tjt_hosp_api
+    import tjt_dataset_store
+    from tjt_sales_cube import build_cube
+    from tjt_mock_data import generate_season
+    from tjt_transforms import (
+        expand_seats, to_datetime_column, DATETIME_COLUMNS, drop_duplicate_keys, SALES_KEY, SEAT_KEY,
+        filtered_columns_with_seat_data, filtered_columns_without_seat_data,
+    )
+
+    n_events = max(10, min(400, n_transactions // 2500))
+    n_guests = max(1000, n_transactions // 5)
+    generate_start = time.perf_counter()
+    season = generate_season(n_events, n_guests, n_transactions, seed)
+    generate_seconds = time.perf_counter() - generate_start
+
+    stages = {}
+    state = {}
+
+    def stage(name, rows, func):
+        with PeakRSS() as rss:
+            start = time.perf_counter()
+            state[name] = func()
+            seconds = time.perf_counter() - start
+        stages[name] = {
+            "seconds": round(seconds, 4),
+            "rows": rows,
+            "rows_per_sec": round(rows / seconds) if seconds else None,
+            "peak_rss_mb": round(rss.peak / 2**20, 1),
+        }
+
+    events = season["events"]
+    transactions_per_event = [season["transactions"][event["Id"]] for event in events]
+
+    stage("accounts_index", len(season["guests"]),
+          lambda: tjt_hosp_api.build_guest_index(pd.DataFrame(season["guests"])))
+    stage("accounts_merge", n_transactions, lambda: [
+        record
+        for event, transactions in zip(events, transactions_per_event)
+        for record in tjt_hosp_api.merge_event_transactions(event, transactions, state["accounts_index"])
+    ])
+    stage("build_frame", n_transactions, lambda: pd.DataFrame(state["accounts_merge"]))
+    del state["accounts_merge"]
+
+    df = state["build_frame"]
+    stage("date_parsing", n_transactions * len(DATETIME_COLUMNS),
+          lambda: [to_datetime_column(df[column]) for column in DATETIME_COLUMNS])
+    stage("seat_explosion", n_transactions, lambda: expand_seats(df))
+
+    final_df = state["seat_explosion"]
+    columns_with_seats = [col for col in final_df.columns if col in filtered_columns_with_seat_data]
+    columns_without_seats = [col for col in final_df.columns if col in filtered_columns_without_seat_data]
+    stage("drop_duplicates", len(final_df) * 2,
+          lambda: (
+              drop_duplicate_keys(final_df, SEAT_KEY, columns_with_seats),
+              drop_duplicate_keys(final_df, SALES_KEY, columns_without_seats),
+          ))
+    stage("column_filtering", len(final_df), lambda: (
+        state["drop_duplicates"][0][columns_with_seats], state["drop_duplicates"][1][columns_without_seats],
+    ))
+
+    with_seats, without_seats = state["column_filtering"]
+    stage("schema_conform", len(without_seats) + len(with_seats), lambda: (
+        tjt_dataset_store.conform(without_seats, tjt_dataset_store.SCHEMAS["filtered_df_without_seats"]),
+        tjt_dataset_store.conform(with_seats, tjt_dataset_store.SCHEMAS["filtered_df_with_seats"]),
+    ))
+    stage("sales_cube", len(without_seats), lambda: build_cube(state["schema_conform"][0]))
+
+    return {
+        "transactions": n_transactions,
+        "events": n_events,
+        "guests": n_guests,
+        "sales_rows": len(without_seats),
+        "seat_rows": len(final_df),
+        "generate_seconds": round(generate_seconds, 2),
+        "total_seconds": round(sum(metrics["seconds"] for metrics in stages.values()), 4),
+        "peak_rss_mb": round(max(metrics["peak_rss_mb"] for metrics in stages.values()), 1),
+        "stages": stages,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_result(history, n_transactions):
+    for entry in reversed(history):
+        if entry["transactions"] == n_transactions:
+            return entry
+    return None
+
+
+def report(result, previous, threshold):
+    """Prints one size's stage table; returns the names of stages that regressed."""
+    print(f"\n{result['transactions']:,} transactions -> {result['sales_rows']:,} sales rows, "
+          f"{result['seat_rows']:,} seat rows (generated in {result['generate_seconds']}s)")
+    print(f"{'stage':<18}{'seconds':>10}{'rows/s':>14}{'peak RSS MB':>13}{'vs last':>10}")
+
+    regressions = []
+    for name, metrics in result["stages"].items():
+        change = ""
+        before = (previous or {}).get("stages", {}).get(name)
+        if before and before["seconds"]:
+            ratio = metrics["seconds"] / before["seconds"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > threshold:
+                change += " !"
+                regressions.append(name)
+        rows_per_sec = f"{metrics['rows_per_sec']:,}" if metrics["rows_per_sec"] else "-"
+        print(f"{name:<18}{metrics['seconds']:>10.3f}{rows_per_sec:>14}{metrics['peak_rss_mb']:>13.1f}{change:>10}")
+    print(f"{'total':<18}{result['total_seconds']:>10.3f}{'':>14}{result['peak_rss_mb']:>13.1f}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated transaction counts")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--history", default=HISTORY_PATH)
+    arg_parser.add_argument("--no-save", action="store_true", help="Don't append this run to the history")
+    arg_parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown vs the last run flagged as a regression")
+    arg_parser.add_argument("--fail-on-regression", action="store_true")
+    arg_parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_stages(args.worker, args.seed)))
+        return 0
+
+    history = load_history(args.history)
+    run_info = {
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+    }
+
+    regressions = []
+    for size in [int(value) for value in args.sizes.split(",") if value.strip()]:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(size), "--seed", str(args.seed)],
+            capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            print(f"\n{size:,} transactions: benchmark failed\n{completed.stderr}")
+            continue
+        result = {**run_info, **json.loads(completed.stdout.strip().splitlines()[-1])}
+        regressions += [f"{size}:{name}" for name in report(result, previous_result(history, size), args.threshold)]
+
+        if not args.no_save:
+            os.makedirs(os.path.dirname(args.history), exist_ok=True)
+            with open(args.history, "a") as f:
+                f.write(json.dumps(result) + "\n")
+
+    if regressions:
+        print(f"\nSlower than the previous run by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
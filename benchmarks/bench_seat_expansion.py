@@ -0,0 +1,224 @@
+"""
+Benchmarks the columnar seat expansion in tjt_transforms.expand_seats against the
+original Step 7 loop over df.iterrows() from tjt_hosp_api, on synthetic transactions.
+
+Usage:
+    python benchmarks/bench_seat_expansion.py --orders 20000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateutil import parser
+from tjt_transforms import (
+    expand_seats, select_sales_columns, to_datetime_column, DATETIME_COLUMNS,
+    filtered_columns_with_seat_data, filtered_columns_without_seat_data,
+)
+
+
+def make_merged_transactions(n_orders, seed=0):
+    """
+    Builds a DataFrame shaped like the Step 5 output of tjt_hosp_api: event details,
+    transaction fields, guest details and a TMSessionId seat payload on most orders.
+    """
+    rng = random.Random(seed)
+    records = []
+    for i in range(n_orders):
+        event_id = 1000 + i % 40
+        seats = [
+            {"PriceBandName": "Band A", "Row": str(rng.randint(1, 20)), "Number": str(n), "AreaName": "Club Level", "BlockId": rng.randint(1, 50)}
+            for n in range(rng.randint(1, 6))
+        ]
+        has_seats = rng.random() < 0.8
+        records.append({
+            "Fixture Name": f"Arsenal v Team {event_id}",
+            "Id": 500000 + i,
+            "EventId": event_id,
+            "EventCategory": "Men's First Team",
+            "EventCompetition": "Premier League",
+            "KickOffEventStart": f"2025-{rng.randint(1, 12):02d}-15T15:00:00",
+            "Name": rng.choice(["Platinum Club", "Diamond Club", "Box 12", "Woolwich Restaurant"]),
+            "Type": rng.choice(["Seasonal Membership", "Match Day"]),
+            "PackageId": rng.randint(1, 30),
+            "GuestId": rng.randint(1, 5000),
+            "Seats": len(seats),
+            "CRCCode": "CRC",
+            "Price": round(rng.uniform(100, 5000), 2),
+            "Discount": None,
+            "DiscountValue": 0,
+            "IsPaid": rng.random() < 0.9,
+            "TotalPrice": round(rng.uniform(100, 20000), 2),
+            "CreatedOn": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00.{rng.randint(0, 999999):06d}",
+            "PaymentTime": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:30:00",
+            "CreatedBy": rng.choice(["dcoppin", "bgardiner", "jedwards", "dmontague"]),
+            "GLCode": "GL100",
+            "SaleLocation": rng.choice(["Online", "Phone"]),
+            "Locations": [{"Id": 900000 + i, "LocationName": f"Box {rng.randint(1, 99)}"}] if rng.random() < 0.9 else [],
+            "TMSessionId": json.dumps({"Seats": seats}) if has_seats else None,
+            "First Name": "Guest", "Surname": str(i), "Email": f"guest{i}@example.com",
+            "Country Code": "GB", "PostCode": "N5 1BU", "City": "London",
+            "CompanyName": "", "DOB": None, "Status": "Active", "IsSeasonal": False,
+        })
+    return pd.DataFrame(records)
+
+
+def parse_datetime(date_str):
+    """The original per-cell parser used by the legacy loop."""
+    if date_str is None:
+        return None
+    try:
+        return parser.parse(date_str).strftime("%d-%m-%Y %H:%M")
+    except Exception:
+        return date_str
+
+
+def legacy_expand_seats(df):
+    """The original Step 7/8 loop, kept verbatim for comparison."""
+    final_data = []
+
+    for _, row in df.iterrows():
+        if row['TMSessionId']:
+            tm_session_data = json.loads(row['TMSessionId'])
+            seats = tm_session_data.get('Seats', [])
+
+            # Extract LocationName from Locations if it's a list of dictionaries
+            if isinstance(row.get('Locations'), list) and row['Locations']:
+                location_info = row['Locations'][0]
+                location_name = location_info.get('LocationName', '')
+                location_order_id = location_info.get('Id')  # Extract the Order Id from the location
+            else:
+                location_name = ''
+                location_order_id = None
+
+            # Handle the extraction of the Package Name, especially for 'Platinum' under 'Seasonal Membership'
+            package_name = row.get('Name')
+            if row.get('Type') == 'Seasonal Membership' and 'Platinum' in row.get('Name', ''):
+                package_name = 'Platinum'
+
+            for seat in seats:
+                seat_record = {
+                    "Order Id": row["Id"],  # Use Location Id if available, otherwise use row Id
+                    "EventId": row.get("EventId"),
+                    "First Name": row.get("First Name"),
+                    "Surname": row.get("Surname"),
+                    "CompanyName": row.get("CompanyName"),
+                    "DOB": row.get("DOB"),
+                    "Email": row.get("Email"),
+                    "IsSeasonal": row.get("IsSeasonal"),
+                    "Country Code": row.get("Country Code"),
+                    "PostCode": row.get("PostCode"),
+                    "City": row.get("City"),
+                    "Status": row.get("Status"),
+                    "GLCode": row.get("GLCode"),
+                    "PackageId": row.get("PackageId"),
+                    "GuestId": row.get("GuestId"),
+                    "CRCCode": row.get("CRCCode"),
+                    "Fixture Name": row["Fixture Name"],
+                    "EventCategory": row.get("EventCategory"),
+                    "EventCompetition": row.get("EventCompetition"),
+                    "Type": row.get("Type"),
+                    "KickOffEventStart": parse_datetime(row.get("KickOffEventStart")),
+                    "Package Name": package_name,  # Use the updated logic for Package Name
+                    "LocationName": location_name,  # Adding the LocationName
+                    "Price": row.get("Price"),
+                    "Seats": row.get("Seats", seat.get("Seats")),
+                    "PriceBandName": seat.get("PriceBandName"),
+                    "Row": seat.get("Row"),
+                    "Seat Number": seat.get("Number"),
+                    "AreaName": seat.get("AreaName"),
+                    "BlockId": seat.get("BlockId"),
+                    "Discount": row.get("Discount"),
+                    "DiscountValue": row.get("DiscountValue"),
+                    "IsPaid": row.get("IsPaid"),
+                    "TotalPrice": row.get("TotalPrice"),
+                    "CreatedOn": parse_datetime(row.get("CreatedOn")),
+                    "PaymentTime": parse_datetime(row.get("PaymentTime")),
+                    "CreatedBy": row.get("CreatedBy"),
+                    "SaleLocation": row.get("SaleLocation"),
+                }
+
+                final_data.append(seat_record)
+        else:
+            # Handle the scenario where there is no TMSessionId
+            if isinstance(row.get('Locations'), list) and row['Locations']:
+                row['LocationName'] = row['Locations'][0].get('LocationName', '')
+                row['Order Id'] = row['Locations'][0].get('Id') or row["Id"]  # Use Location Id if available
+            else:
+                row['LocationName'] = ''
+                row['Order Id'] = row["Id"]
+
+            # Handle the extraction of the Package Name for rows without TMSessionId
+            if row.get('Type') == 'Seasonal Membership' and 'Platinum' in row.get('Name', ''):
+                row['Package Name'] = 'Platinum'
+            else:
+                row['Package Name'] = row.get('Name')
+
+            # Convert date strings to desired format
+            row['CreatedOn'] = parse_datetime(row.get("CreatedOn"))
+            row['KickOffEventStart'] = parse_datetime(row.get("KickOffEventStart"))
+
+            # Append the transaction without seat details
+            final_data.append(row)
+
+    # Step 8: Convert final_data to a DataFrame
+    final_df = pd.DataFrame(final_data)
+    return final_df
+
+
+def legacy_filtered_frames(final_df):
+    filtered_columns_with_seats = [col for col in final_df.columns if col in filtered_columns_with_seat_data]
+    filtered_columns_without_seats = [col for col in final_df.columns if col in filtered_columns_without_seat_data]
+    return final_df[filtered_columns_with_seats], final_df[filtered_columns_without_seats].drop_duplicates()
+
+
+def assert_same_frame(actual, expected):
+    # The legacy loop emits "%d-%m-%Y %H:%M" strings (and raw PaymentTime for orders without seats)
+    expected = expected.copy()
+    for column in DATETIME_COLUMNS:
+        if column in expected.columns:
+            formatted = pd.to_datetime(expected[column], format="%d-%m-%Y %H:%M", errors="coerce")
+            expected[column] = formatted.fillna(to_datetime_column(expected[column].where(formatted.isna())))
+    actual = actual[expected.columns].reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected.reset_index(drop=True), check_dtype=False)
+
+
+def time_call(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--orders", type=int, default=20000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    df = make_merged_transactions(args.orders)
+
+    legacy_time, legacy_df = time_call(legacy_expand_seats, df, repeat=args.repeat)
+    columnar_time, columnar_df = time_call(expand_seats, df, repeat=args.repeat)
+
+    # Both paths must give the same with-seats and without-seats frames
+    expected_with_seats, expected_without_seats = legacy_filtered_frames(legacy_df)
+    actual_with_seats, actual_without_seats = select_sales_columns(columnar_df)
+    assert_same_frame(actual_with_seats, expected_with_seats)
+    assert_same_frame(actual_without_seats, expected_without_seats)
+
+    print(f"orders={len(df)} seat rows={len(columnar_df)}")
+    print(f"legacy loop : {legacy_time:8.3f}s  {len(legacy_df) / legacy_time:12,.0f} rows/s")
+    print(f"columnar    : {columnar_time:8.3f}s  {len(columnar_df) / columnar_time:12,.0f} rows/s")
+    print(f"speedup     : {legacy_time / columnar_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
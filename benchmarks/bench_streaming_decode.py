@@ -0,0 +1,97 @@
+"""
+Compares peak memory and time of decoding Accounts/List and the per-event
+HospitalitySaleTransactions with response.json() (the previous path) against the
+streaming decode in tjt_http.TJTClient.stream_items, served by tjt_mock_server.
+
+Each mode runs in its own process so their peak RSS is measured independently.
+
+Usage:
+    python benchmarks/bench_streaming_decode.py --guests 200000 --transactions 200000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_ingest import PeakRSS, current_rss
+
+
+def measure(label, func):
+    baseline = current_rss()
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+    return {"stage": label, "seconds": round(seconds, 3), "peak_mb": round((rss.peak - baseline) / 2**20, 1), "rows": len(result)}
+
+
+def run_mode(mode):
+    import pandas as pd
+    import tjt_hosp_api
+    import tjt_catalog
+    from tjt_http import shared_client
+
+    events = tjt_hosp_api.fetch_events()
+    client = shared_client()
+
+    if mode == "json":
+        def accounts():
+            return pd.DataFrame(client.get_json(tjt_catalog.accounts_url).get('Data', {}).get('Guests', []))
+
+        def transactions():
+            return [
+                record
+                for event in events
+                for record in client.get_json(tjt_hosp_api.transactions_url_template.format(event['Id']))
+                .get('Data', {}).get('HospitalitySaleTransactions', [])
+            ]
+    else:
+        def accounts():
+            return tjt_catalog.download_accounts()[0]
+
+        def transactions():
+            return [record for event in events for record in tjt_hosp_api.fetch_event_transactions(event)]
+
+    return [measure("accounts", accounts), measure("transactions", transactions)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--events", type=int, default=40)
+    arg_parser.add_argument("--guests", type=int, default=200000)
+    arg_parser.add_argument("--transactions", type=int, default=200000)
+    arg_parser.add_argument("--mode", choices=["json", "stream"], help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode)))
+        return
+
+    from tjt_mock_data import generate_season
+    from tjt_mock_server import MockResponses, start_mock_server
+
+    server, base_url = start_mock_server(MockResponses.from_season(generate_season(args.events, args.guests, args.transactions)))
+    env = {**os.environ, "TJT_BASE_URL": base_url}
+    results = {}
+    for mode in ["json", "stream"]:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode], env=env, capture_output=True, text=True, check=True
+        )
+        results[mode] = {row["stage"]: row for row in json.loads(completed.stdout.strip().splitlines()[-1])}
+    server.shutdown()
+
+    print(f"{args.guests:,} guests, {args.transactions:,} transactions over {args.events} events")
+    print(f"{'stage':<14}{'json MB':>10}{'stream MB':>11}{'json s':>9}{'stream s':>10}{'memory':>9}")
+    for stage in ["accounts", "transactions"]:
+        before, after = results["json"][stage], results["stream"][stage]
+        factor = before["peak_mb"] / after["peak_mb"] if after["peak_mb"] > 0 else float("inf")
+        print(f"{stage:<14}{before['peak_mb']:>10.1f}{after['peak_mb']:>11.1f}{before['seconds']:>9.2f}{after['seconds']:>10.2f}{factor:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import re
 from datetime import datetime
 import os
 import logging
+from tjt_transforms import ensure_datetime
 
 
 def load_budget_targets():
@@ -61,8 +62,8 @@ def generate_event_level_men_cumulative_sales_chart(filtered_data):
         df.columns = df.columns.str.strip()
         df["Fixture Name"]     = df["Fixture Name"].str.strip()
         df["EventCompetition"] = df["EventCompetition"].str.strip()
-        df["PaymentTime"]      = pd.to_datetime(df["PaymentTime"], errors="coerce", dayfirst=True)
-        df["KickOffEventStart"]= pd.to_datetime(df["KickOffEventStart"], errors="coerce", dayfirst=True).dt.round("min")
+        df["PaymentTime"]      = ensure_datetime(df["PaymentTime"], dayfirst=True)
+        df["KickOffEventStart"]= ensure_datetime(df["KickOffEventStart"], dayfirst=True).dt.round("min")
         df["IsPaid"]           = df["IsPaid"].astype(str).str.upper().fillna("FALSE")
 
         # --- 3️⃣ Merge on all three keys ---
@@ -220,9 +221,9 @@ def generate_event_level_women_cumulative_sales_chart(filtered_data):
     df.columns = df.columns.str.strip()
     df["Fixture Name"]      = df["Fixture Name"].astype(str).str.strip()
     df["EventCompetition"]  = df["EventCompetition"].astype(str).str.strip()
-    df["PaymentTime"]       = pd.to_datetime(df["PaymentTime"], errors="coerce", dayfirst=True)
+    df["PaymentTime"]       = ensure_datetime(df["PaymentTime"], dayfirst=True)
     df["KickOffEventStart"] = (
-        pd.to_datetime(df["KickOffEventStart"], errors="coerce", dayfirst=True)
+        ensure_datetime(df["KickOffEventStart"], dayfirst=True)
           .dt.round("min")
     )
     df["IsPaid"]            = df["IsPaid"].astype(str).str.upper().fillna("FALSE")
@@ -390,12 +391,8 @@ def generate_event_level_concert_cumulative_sales_chart(filtered_data):
         df = filtered_data.copy()
         df.columns = df.columns.str.strip()
         df["Fixture Name"]      = df["Fixture Name"].astype(str).str.strip()
-        df["PaymentTime"]       = pd.to_datetime(
-            df["PaymentTime"], errors="coerce", dayfirst=True
-        )
-        df["KickOffEventStart"] = pd.to_datetime(
-            df["KickOffEventStart"], errors="coerce", dayfirst=True
-        ).dt.round("min")
+        df["PaymentTime"]       = ensure_datetime(df["PaymentTime"], dayfirst=True)
+        df["KickOffEventStart"] = ensure_datetime(df["KickOffEventStart"], dayfirst=True).dt.round("min")
         df["IsPaid"]            = df["IsPaid"].astype(str).str.upper().fillna("FALSE")
         # filter to concert category then set EventCompetition for merge
         df["EventCategory"]     = df.get("EventCategory", pd.Series()).astype(str).str.strip().str.lower()
@@ -8,6 +8,7 @@ import streamlit as st
 from datetime import datetime, timedelta
 from datetime import datetime
 from streamlit_autorefresh import st_autorefresh
+from tjt_transforms import ensure_datetime
 
 ################################################################################
 # 1. Load live sales data from tjt_hosp_api and merged inventory data
@@ -15,19 +16,20 @@ from streamlit_autorefresh import st_autorefresh
 
 def load_live_data():
     """
-    Dynamically reloads tjt_hosp_api and accesses filtered_df_without_seats.
+    Loads filtered_df_without_seats through tjt_hosp_api.load_hospitality_sales().
     Returns a DataFrame of live hospitality sales data.
     """
     try:
-        tjt_hosp_api = importlib.reload(importlib.import_module("tjt_hosp_api"))
-        filtered_df_without_seats = getattr(tjt_hosp_api, "filtered_df_without_seats", None)
+        tjt_hosp_api = importlib.import_module("tjt_hosp_api")
+        # Served from tjt_hosp_api's process-wide cache; only refetched once it is older than TJT_MAX_AGE
+        filtered_df_without_seats = tjt_hosp_api.load_hospitality_sales()
 
         if filtered_df_without_seats is None:
             raise ImportError("filtered_df_without_seats is not available in tjt_hosp_api.")
         return filtered_df_without_seats
 
     except ImportError as e:
-        st.error(f"Error reloading tjt_hosp_api: {e}")
+        st.error(f"Error loading tjt_hosp_api data: {e}")
         return pd.DataFrame(columns=[
             "CreatedBy", "Price", "CreatedOn", "SaleLocation",
             "KickOffEventStart", "Fixture Name", "Package Name",
@@ -36,18 +38,15 @@ def load_live_data():
 
 def load_inventory_data():
     """
-    Dynamically reloads tjt_inventory.py and runs get_inventory_data()
-    to retrieve merged (events + stock) data. Returns a DataFrame.
+    Loads the merged (events + stock) data through tjt_inventory.load_inventory().
+    Returns a DataFrame.
     """
     try:
-        tjt_inventory = importlib.reload(importlib.import_module("tjt_inventory"))
-        if hasattr(tjt_inventory, "get_inventory_data"):
-            return tjt_inventory.get_inventory_data()
-        else:
-            st.warning("No function 'get_inventory_data()' found in tjt_inventory.py")
-            return pd.DataFrame()
+        tjt_inventory = importlib.import_module("tjt_inventory")
+        # Served from tjt_inventory's process-wide cache; only refetched once it is older than TJT_INVENTORY_MAX_AGE
+        return tjt_inventory.load_inventory()
     except ImportError as e:
-        st.error(f"Error reloading tjt_inventory: {e}")
+        st.error(f"Error loading tjt_inventory: {e}")
         return pd.DataFrame()
 
 # ------------------------------------------------------------------------------
@@ -113,7 +112,7 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
     """
 
     # ✅ Convert 'CreatedOn' to datetime safely
-    data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
+    data["CreatedOn"] = ensure_datetime(data["CreatedOn"], dayfirst=True)
 
     # ✅ Ensure correct filtering within the provided date range
     filtered_data = data[
@@ -143,7 +142,7 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
         (data["CreatedOn"] >= today_start) & (data["CreatedOn"] < today_end)
     ]
     today_sales = (
-        today_sales_data.groupby("CreatedBy")["Price"]
+        today_sales_data.groupby("CreatedBy", observed=True)["Price"]
         .sum()
         .reindex(targets_data.columns, fill_value=0)
     )
@@ -156,14 +155,14 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
         (data["CreatedOn"] >= start_of_week) & (data["CreatedOn"] < today_end)
     ]
     weekly_sales = (
-        weekly_sales_data.groupby("CreatedBy")["Price"]
+        weekly_sales_data.groupby("CreatedBy", observed=True)["Price"]
         .sum()
         .reindex(targets_data.columns, fill_value=0)
     )
 
     # ✅ Calculate total progress per executive
     progress = (
-        filtered_data.groupby("CreatedBy")["Price"]
+        filtered_data.groupby("CreatedBy", observed=True)["Price"]
         .sum()
         .reindex(targets_data.columns, fill_value=0)
     )
@@ -291,7 +290,7 @@ def get_next_fixture(data, budget_df):
     Finds the earliest upcoming fixture based on 'KickOffEventStart'.
     Returns (fixture_name, fixture_date, budget_target, event_competition).
     """
-    data["KickOffEventStart"] = pd.to_datetime(data["KickOffEventStart"], errors="coerce")
+    data["KickOffEventStart"] = ensure_datetime(data["KickOffEventStart"])
     today = datetime.now()
     
     # Filter future fixtures
@@ -323,7 +322,7 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
     into a single scrolling marquee string.
     """
     data = data.copy()  # Ensure it's a copy before modifying
-    data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
+    data["CreatedOn"] = ensure_datetime(data["CreatedOn"], dayfirst=True)
     data = data.dropna(subset=["CreatedOn"])  # Drop invalid date rows
 
     # 🔹 **Latest Sale**
@@ -383,8 +382,8 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
     # ✅ **Top Fixture of the Day**
     today_sales = data[data["CreatedOn"].dt.floor('D') == pd.to_datetime(datetime.now().date())]
     if not today_sales.empty:
-        top_fixture = today_sales.groupby("Fixture Name")["Price"].sum().idxmax()
-        top_fixture_revenue = today_sales.groupby("Fixture Name")["Price"].sum().max()
+        top_fixture = today_sales.groupby("Fixture Name", observed=True)["Price"].sum().idxmax()
+        top_fixture_revenue = today_sales.groupby("Fixture Name", observed=True)["Price"].sum().max()
         top_fixture_message = f"📈 Top Selling Fixture Today: {top_fixture} with £{top_fixture_revenue:,.2f} generated."
     else:
         top_fixture_message = "📉 No sales recorded today."
@@ -411,8 +410,8 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
 
     if not exec_sales_today.empty:
         # Get the top-selling executive (username)
-        top_executive_username = exec_sales_today.groupby("CreatedBy")["Price"].sum().idxmax()
-        top_executive_revenue = exec_sales_today.groupby("CreatedBy")["Price"].sum().max()
+        top_executive_username = exec_sales_today.groupby("CreatedBy", observed=True)["Price"].sum().idxmax()
+        top_executive_revenue = exec_sales_today.groupby("CreatedBy", observed=True)["Price"].sum().max()
 
         # Convert username to full name using mapping
         top_executive_name = user_mapping.get(top_executive_username, top_executive_username)
@@ -608,7 +607,7 @@ def display_inventory_details(fixture_row, merged_inventory, full_sales_data):
     else:
         sales_agg = (
             df_sales_for_fixture
-            .groupby(["Package Name", "EventCompetition"])["Seats"]
+            .groupby(["Package Name", "EventCompetition"], observed=True)["Seats"]
             .sum()
             .reset_index()
             .rename(columns={"Seats": "Seats Sold"})
@@ -763,7 +762,7 @@ def run_dashboard():
     filtered_data = filtered_df_without_seats.copy()
     
     # Convert 'CreatedOn' to datetime safely
-    filtered_data["CreatedOn"] = pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True)
+    filtered_data["CreatedOn"] = ensure_datetime(filtered_data["CreatedOn"], dayfirst=True)
     
     filtered_data = filtered_data[filtered_data["CreatedBy"].isin(valid_sales_executives)]
 
@@ -796,7 +795,7 @@ def run_dashboard():
         Includes a download button to export filtered sales data.
         """
         # ✅ Ensure 'CreatedOn' is datetime
-        data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
+        data["CreatedOn"] = ensure_datetime(data["CreatedOn"], dayfirst=True)
 
         # ✅ Apply the same date filtering as calculate_monthly_progress()
         executive_data = data[
@@ -875,8 +874,8 @@ def run_dashboard():
     # -------------------------
     mask_sales = (
         filtered_data["CreatedBy"].isin(valid_sales_executives) &
-        (pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True) >= start_date) &
-        (pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True) <= end_date)
+        (ensure_datetime(filtered_data["CreatedOn"], dayfirst=True) >= start_date) &
+        (ensure_datetime(filtered_data["CreatedOn"], dayfirst=True) <= end_date)
     )
     filtered_sales_data = filtered_data[mask_sales]
 
@@ -8,6 +8,9 @@ import streamlit as st
 from datetime import datetime, timedelta
 from datetime import datetime
 from streamlit_autorefresh import st_autorefresh
+from tjt_transforms import ensure_datetime
+from tjt_sales_cube import SalesCube
+from tjt_season_performance import season_performance
 
 ################################################################################
 # 1. Load live sales data from tjt_hosp_api and merged inventory data
@@ -15,39 +18,50 @@ from streamlit_autorefresh import st_autorefresh
 
 def load_live_data():
     """
-    Dynamically reloads tjt_hosp_api and accesses filtered_df_without_seats.
+    Loads filtered_df_without_seats through tjt_hosp_api.load_hospitality_sales().
     Returns a DataFrame of live hospitality sales data.
     """
     try:
-        tjt_hosp_api = importlib.reload(importlib.import_module("tjt_hosp_api"))
-        filtered_df_without_seats = getattr(tjt_hosp_api, "filtered_df_without_seats", None)
+        tjt_hosp_api = importlib.import_module("tjt_hosp_api")
+        # Served from tjt_hosp_api's process-wide cache; only refetched once it is older than TJT_MAX_AGE
+        filtered_df_without_seats = tjt_hosp_api.load_hospitality_sales()
 
         if filtered_df_without_seats is None:
             raise ImportError("filtered_df_without_seats is not available in tjt_hosp_api.")
         return filtered_df_without_seats
 
     except ImportError as e:
-        st.error(f"Error reloading tjt_hosp_api: {e}")
+        st.error(f"Error loading tjt_hosp_api data: {e}")
         return pd.DataFrame(columns=[
             "CreatedBy", "Price", "CreatedOn", "SaleLocation",
             "KickOffEventStart", "Fixture Name", "Package Name",
             "TotalPrice", "Seats"
         ])
 
+def load_sales_cube():
+    """
+    Loads the pre-aggregated sales cube through tjt_hosp_api.load_sales_cube().
+    Returns a tjt_sales_cube.SalesCube (empty if the data can't be loaded).
+    """
+    try:
+        tjt_hosp_api = importlib.import_module("tjt_hosp_api")
+        # Rebuilt with the sales data; its query results are memoized until the next refresh
+        return tjt_hosp_api.load_sales_cube()
+    except ImportError as e:
+        st.error(f"Error loading tjt_hosp_api data: {e}")
+        return SalesCube.empty()
+
 def load_inventory_data():
     """
-    Dynamically reloads tjt_inventory.py and runs get_inventory_data()
-    to retrieve merged (events + stock) data. Returns a DataFrame.
+    Loads the merged (events + stock) data through tjt_inventory.load_inventory().
+    Returns a DataFrame.
     """
     try:
-        tjt_inventory = importlib.reload(importlib.import_module("tjt_inventory"))
-        if hasattr(tjt_inventory, "get_inventory_data"):
-            return tjt_inventory.get_inventory_data()
-        else:
-            st.warning("No function 'get_inventory_data()' found in tjt_inventory.py")
-            return pd.DataFrame()
+        tjt_inventory = importlib.import_module("tjt_inventory")
+        # Served from tjt_inventory's process-wide cache; only refetched once it is older than TJT_INVENTORY_MAX_AGE
+        return tjt_inventory.load_inventory()
     except ImportError as e:
-        st.error(f"Error reloading tjt_inventory: {e}")
+        st.error(f"Error loading tjt_inventory: {e}")
         return pd.DataFrame()
 
 # ------------------------------------------------------------------------------
@@ -114,7 +128,7 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
     """
 
     # ✅ Convert 'CreatedOn' to datetime safely
-    data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
+    data["CreatedOn"] = ensure_datetime(data["CreatedOn"], dayfirst=True)
 
     # ✅ Ensure correct filtering within the provided date range
     filtered_data = data[
@@ -144,7 +158,7 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
         (data["CreatedOn"] >= today_start) & (data["CreatedOn"] < today_end)
     ]
     today_sales = (
-        today_sales_data.groupby("CreatedBy")["Price"]
+        today_sales_data.groupby("CreatedBy", observed=True)["Price"]
         .sum()
         .reindex(targets_data.columns, fill_value=0)
     )
@@ -157,14 +171,14 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
         (data["CreatedOn"] >= start_of_week) & (data["CreatedOn"] < today_end)
     ]
     weekly_sales = (
-        weekly_sales_data.groupby("CreatedBy")["Price"]
+        weekly_sales_data.groupby("CreatedBy", observed=True)["Price"]
         .sum()
         .reindex(targets_data.columns, fill_value=0)
     )
 
     # ✅ Calculate total progress per executive
     progress = (
-        filtered_data.groupby("CreatedBy")["Price"]
+        filtered_data.groupby("CreatedBy", observed=True)["Price"]
         .sum()
         .reindex(targets_data.columns, fill_value=0)
     )
@@ -296,7 +310,7 @@ def get_next_fixture(data, budget_df):
     Finds the earliest upcoming fixture based on 'KickOffEventStart'.
     Returns (fixture_name, fixture_date, budget_target, event_competition).
     """
-    data["KickOffEventStart"] = pd.to_datetime(data["KickOffEventStart"], errors="coerce")
+    data["KickOffEventStart"] = ensure_datetime(data["KickOffEventStart"])
     today = datetime.now()
     
     # Normalize fixture names
@@ -335,7 +349,7 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
     into a single scrolling marquee string.
     """
     data = data.copy()  # Ensure it's a copy before modifying
-    data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
+    data["CreatedOn"] = ensure_datetime(data["CreatedOn"], dayfirst=True)
     data = data.dropna(subset=["CreatedOn"])  # Drop invalid date rows
 
     # 🔹 **Latest Sale**
@@ -395,8 +409,8 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
     # ✅ **Top Fixture of the Day**
     today_sales = data[data["CreatedOn"].dt.floor('D') == pd.to_datetime(datetime.now().date())]
     if not today_sales.empty:
-        top_fixture = today_sales.groupby("Fixture Name")["Price"].sum().idxmax()
-        top_fixture_revenue = today_sales.groupby("Fixture Name")["Price"].sum().max()
+        top_fixture = today_sales.groupby("Fixture Name", observed=True)["Price"].sum().idxmax()
+        top_fixture_revenue = today_sales.groupby("Fixture Name", observed=True)["Price"].sum().max()
         top_fixture_message = f"📈 Top Selling Fixture Today: {top_fixture} with £{top_fixture_revenue:,.2f} generated."
     else:
         top_fixture_message = "📉 No sales recorded today."
@@ -424,8 +438,8 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
 
     if not exec_sales_today.empty:
         # Get the top-selling executive (username)
-        top_executive_username = exec_sales_today.groupby("CreatedBy")["Price"].sum().idxmax()
-        top_executive_revenue = exec_sales_today.groupby("CreatedBy")["Price"].sum().max()
+        top_executive_username = exec_sales_today.groupby("CreatedBy", observed=True)["Price"].sum().idxmax()
+        top_executive_revenue = exec_sales_today.groupby("CreatedBy", observed=True)["Price"].sum().max()
 
         # Convert username to full name using mapping
         top_executive_name = user_mapping.get(top_executive_username, top_executive_username)
@@ -631,7 +645,7 @@ def display_inventory_details(fixture_row, merged_inventory, full_sales_data):
     else:
         sales_agg = (
             df_sales_for_fixture
-            .groupby(["Package Name", "EventCompetition"])["Seats"]
+            .groupby(["Package Name", "EventCompetition"], observed=True)["Seats"]
             .sum()
             .reset_index()
             .rename(columns={"Seats": "Seats Sold"})
@@ -715,52 +729,14 @@ def display_inventory_details(fixture_row, merged_inventory, full_sales_data):
         unsafe_allow_html=True
     )
 
-def calculate_monthly_performance(data, targets_data, valid_sales_executives):
+def calculate_monthly_performance(sales_cube, start_date, end_date, targets_data, valid_sales_executives):
     """
     Returns a DataFrame indexed by (Month,Year) with two columns per exec:
-    'Revenue' and '% of target'.
+    'Revenue' and '% of target', counting sales from start_date to end_date.
+    Served from the season performance store: closed months are frozen, so only
+    the current month is re-aggregated from the sales cube after a refresh.
     """
-    df = data.copy()
-    df["CreatedOn"] = pd.to_datetime(df["CreatedOn"], errors="coerce", dayfirst=True)
-    df["Month"] = df["CreatedOn"].dt.strftime("%B")
-    df["Year"] = df["CreatedOn"].dt.year
-    # sum up revenue
-    rev = (
-        df
-        .groupby(["Month","Year","CreatedBy"])["Price"]
-        .sum()
-        .reset_index()
-    )
-    # melt targets to long form
-    targets_long = (
-        targets_data
-        .reset_index()
-        .melt(
-            id_vars=["Month","Year"],
-            var_name="CreatedBy",
-            value_name="Target"
-        )
-    )
-    # merge revenue + target
-    perf = pd.merge(
-        rev, targets_long,
-        on=["Month","Year","CreatedBy"],
-        how="right"
-    ).fillna(0)
-    perf["% of target"] = (perf["Price"] / perf["Target"] * 100).round(0)
-    # pivot so we get one row per (Month,Year)
-    perf_rev = perf.pivot(index=["Month","Year"], columns="CreatedBy", values="Price")
-    perf_pct = perf.pivot(index=["Month","Year"], columns="CreatedBy", values="% of target")
-    # re-index in the same order as targets_data
-    perf_rev = perf_rev.reindex(targets_data.index)
-    perf_pct = perf_pct.reindex(targets_data.index)
-    # build a MultiIndex-column DataFrame
-    out = pd.DataFrame(index=targets_data.index)
-    for exec in valid_sales_executives:
-        out[(exec, "Revenue")]      = perf_rev[exec]
-        out[(exec, "% of target")]  = perf_pct[exec]
-    out.columns = pd.MultiIndex.from_tuples(out.columns)
-    return out
+    return season_performance.performance(sales_cube, start_date, end_date, targets_data, valid_sales_executives)
 
 
 ################################################################################
@@ -831,7 +807,7 @@ def run_dashboard():
     filtered_data = filtered_df_without_seats.copy()
     
     # Convert 'CreatedOn' to datetime safely
-    filtered_data["CreatedOn"] = pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True)
+    filtered_data["CreatedOn"] = ensure_datetime(filtered_data["CreatedOn"], dayfirst=True)
     
     filtered_data = filtered_data[filtered_data["CreatedBy"].isin(valid_sales_executives)]
 
@@ -872,7 +848,7 @@ def run_dashboard():
         • red/amber/green conditional formatting on % columns
         """
         # 1️⃣ Parse dates & filter
-        data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
+        data["CreatedOn"] = ensure_datetime(data["CreatedOn"], dayfirst=True)
         executive_data = data[
             (data["CreatedOn"] >= start_date) &
             (data["CreatedOn"] <= end_date) &
@@ -932,7 +908,7 @@ def run_dashboard():
             return
 
         # 4a) Get performance pivot (Revenue & % of target)
-        perf_df = calculate_monthly_performance(executive_data, targets_data, valid_executives)
+        perf_df = calculate_monthly_performance(load_sales_cube(), start_date, end_date, targets_data, valid_executives)
 
         # 4b) Bring Month & Year into columns and insert Target
         perf = perf_df.reset_index()  # cols: Month, Year, (exec,Revenue), (exec,%)
@@ -1026,8 +1002,8 @@ def run_dashboard():
     # -------------------------
     mask_sales = (
         filtered_data["CreatedBy"].isin(valid_sales_executives) &
-        (pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True) >= start_date) &
-        (pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True) <= end_date)
+        (ensure_datetime(filtered_data["CreatedOn"], dayfirst=True) >= start_date) &
+        (ensure_datetime(filtered_data["CreatedOn"], dayfirst=True) <= end_date)
     )
     filtered_sales_data = filtered_data[mask_sales]
 
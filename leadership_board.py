@@ -1,5 +1,8 @@
 import time
 import os
+import json
+import html
+import sys
 import base64
 import importlib
 import pandas as pd
@@ -8,6 +11,11 @@ import streamlit as st
 from datetime import datetime, timedelta
 from datetime import datetime
 from streamlit_autorefresh import st_autorefresh
+from tjt_transforms import ensure_datetime
+from tjt_sales_cube import SalesCube
+from tjt_fixture_inventory import FixtureInventory
+from tjt_live_feed import live_feed, subscribe_url, LIVE_FEED_URL, LIVE_FEED_REFRESH
+from tjt_refresher import refresher
 import streamlit.components.v1 as components
 
 ################################################################################
@@ -28,47 +36,70 @@ except FileNotFoundError:
 
 def load_live_data():
     """
-    Dynamically reloads tjt_hosp_api and accesses filtered_df_without_seats.
+    Loads filtered_df_without_seats through tjt_hosp_api.load_hospitality_sales().
     Returns a DataFrame of live hospitality sales data.
     """
     try:
-        tjt_hosp_api = importlib.reload(importlib.import_module("tjt_hosp_api"))
-        filtered_df_without_seats = getattr(tjt_hosp_api, "filtered_df_without_seats", None)
+        tjt_hosp_api = importlib.import_module("tjt_hosp_api")
+        # Served from tjt_hosp_api's process-wide cache; only refetched once it is older than TJT_MAX_AGE
+        filtered_df_without_seats = tjt_hosp_api.load_hospitality_sales()
 
         if filtered_df_without_seats is None:
             raise ImportError("filtered_df_without_seats is not available in tjt_hosp_api.")
         return filtered_df_without_seats
 
     except ImportError as e:
-        st.error(f"Error reloading tjt_hosp_api: {e}")
+        st.error(f"Error loading tjt_hosp_api data: {e}")
         return pd.DataFrame(columns=[
             "CreatedBy", "Price", "CreatedOn", "SaleLocation",
             "KickOffEventStart", "Fixture Name", "Package Name",
             "TotalPrice", "Seats"
         ])
 
+def load_sales_cube():
+    """
+    Loads the pre-aggregated sales cube through tjt_hosp_api.load_sales_cube().
+    Returns a tjt_sales_cube.SalesCube (empty if the data can't be loaded).
+    """
+    try:
+        tjt_hosp_api = importlib.import_module("tjt_hosp_api")
+        # Rebuilt with the sales data; its query results are memoized until the next refresh
+        return tjt_hosp_api.load_sales_cube()
+    except ImportError as e:
+        st.error(f"Error loading tjt_hosp_api data: {e}")
+        return SalesCube.empty()
+
 def load_inventory_data():
     """
-    Dynamically reloads tjt_inventory.py and runs get_inventory_data()
-    to retrieve merged (events + stock) data. Returns a DataFrame.
+    Loads the merged (events + stock) data through tjt_inventory.load_inventory_frames().
+    Returns a DataFrame shared by every session: read it, don't modify it.
     """
     try:
-        tjt_inventory = importlib.reload(importlib.import_module("tjt_inventory"))
-        if hasattr(tjt_inventory, "get_inventory_data"):
-            return tjt_inventory.get_inventory_data()
-        else:
-            st.warning("No function 'get_inventory_data()' found in tjt_inventory.py")
-            return pd.DataFrame()
+        tjt_inventory = importlib.import_module("tjt_inventory")
+        # Served from tjt_inventory's process-wide cache; only refetched once it is older than TJT_INVENTORY_MAX_AGE
+        return tjt_inventory.load_inventory_frames()["inventory"]
     except ImportError as e:
-        st.error(f"Error reloading tjt_inventory: {e}")
+        st.error(f"Error loading tjt_inventory: {e}")
         return pd.DataFrame()
 
 # ------------------------------------------------------------------------------
 # NOTE: We comment out these two lines below so they DON'T run globally
 # That way, data is instead re-loaded INSIDE run_dashboard() on each refresh.
 # ------------------------------------------------------------------------------
-filtered_df_without_seats = load_live_data()
-df_inventory = load_inventory_data()
+# filtered_df_without_seats = load_live_data()
+# df_inventory = load_inventory_data()
+
+def data_versions():
+    """
+    Identifies the sales and inventory data currently loaded (see SharedDataset.cache_key),
+    so HTML rendered from them is cached until either is refreshed.
+    """
+    sales_api = sys.modules.get("tjt_hosp_api")
+    inventory_api = sys.modules.get("tjt_inventory")
+    return (
+        sales_api.sales_dataset.cache_key() if sales_api else None,
+        inventory_api.inventory_dataset.cache_key() if inventory_api else None,
+    )
 
 ################################################################################
 # 2. Additional Setup (Executives, Targets, Budget)
@@ -108,11 +139,21 @@ targets_data = pd.DataFrame({
 valid_sales_executives =  ["dcoppin", "TBC", "bgardiner", "dmontague", "jedwards"]
 # valid_services_executives = ["HayleyA", "BethNW", "BenT", "jmurphy", "MeganS"]
 
-def load_budget_targets():
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), 'budget_target_2425.xlsx')
+
+def budget_file_mtime():
+    try:
+        return os.path.getmtime(BUDGET_FILE)
+    except OSError:
+        return None
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def load_budget_targets(mtime=None):
     """
     Reads the external Excel file (budget_target_2425.xlsx) for fixture-based budgets.
+    Cached until the file's modification time (mtime) changes.
     """
-    file_path = os.path.join(os.path.dirname(__file__), 'budget_target_2425.xlsx')
+    file_path = BUDGET_FILE
     try:
         budget_df = pd.read_excel(file_path)
         budget_df.columns = budget_df.columns.str.strip()
@@ -124,7 +165,7 @@ def load_budget_targets():
         st.error(f"Error loading budget file: {e}")
         return pd.DataFrame()
 
-budget_df = load_budget_targets()
+budget_df = load_budget_targets(budget_file_mtime())
 
 ################################################################################
 # 3. Leaderboard Calculation & Rendering Functions
@@ -134,19 +175,29 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
-def calculate_monthly_progress(data, start_date, end_date, targets_data):
+def calculate_monthly_progress(sales_cube, start_date, end_date, targets_data, valid_executives):
     """
-    Calculates the monthly progress for specified executives within a date range.
+    Calculates the monthly progress for specified executives within a date range,
+    reading the day-level totals from the sales cube.
     Returns an HTML-styled leaderboard and an array of executives who made sales.
     """
+    progress_data, sales_made = monthly_progress_frame(sales_cube, start_date, end_date, targets_data, valid_executives)
+    if progress_data is None:
+        return None, []
+    styled_table = progress_data.to_html(classes="big-table", escape=False, index=False)
+    return styled_table, sales_made
 
-    # ✅ Convert 'CreatedOn' to datetime safely
-    data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
 
-    # ✅ Ensure correct filtering within the provided date range
-    filtered_data = data[
-        (data["CreatedOn"] >= start_date) & (data["CreatedOn"] <= end_date)
-    ]
+def monthly_progress_frame(sales_cube, start_date, end_date, targets_data, valid_executives):
+    """
+    The leaderboard behind calculate_monthly_progress(), one styled HTML cell per value,
+    or None when the month has no targets. Rows are indexed by exec username ("TOTALS"
+    for the totals row). Returns (DataFrame, executives who made sales).
+    """
+
+    # ✅ The date range covers whole days: start_date's midnight to end_date's 23:59:59
+    first_day = start_date.normalize()
+    last_day = end_date.normalize()
 
     # ✅ Extract current month and year
     current_month = start_date.strftime("%B")
@@ -162,39 +213,26 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
     expected_pace = (days_elapsed / total_days_in_month) * 100
     half_expected_pace = 0.5 * expected_pace
 
-    # ✅ Set today’s start and end time correctly
-    today_start = pd.to_datetime(datetime.now().date())  # Midnight today
-    today_end = today_start + pd.Timedelta(days=1)  # Midnight next day
+    # ✅ Today's date (midnight)
+    today_start = pd.to_datetime(datetime.now().date())
 
-    # ✅ Ensure today's sales are correctly filtered
-    today_sales_data = data[
-        (data["CreatedOn"] >= today_start) & (data["CreatedOn"] < today_end)
-    ]
-    today_sales = (
-        today_sales_data.groupby("CreatedBy")["Price"]
-        .sum()
-        .reindex(targets_data.columns, fill_value=0)
-    )
+    # ✅ Today's sales, within the selected range
+    today_sales = sales_cube.total(
+        by="CreatedBy", first_day=max(today_start, first_day), last_day=min(today_start, last_day), execs=valid_executives
+    ).reindex(targets_data.columns, fill_value=0)
 
     # ✅ Calculate start of the current week (Monday)
     start_of_week = today_start - pd.Timedelta(days=today_start.weekday())
 
     # ✅ Ensure weekly sales include today
-    weekly_sales_data = data[
-        (data["CreatedOn"] >= start_of_week) & (data["CreatedOn"] < today_end)
-    ]
-    weekly_sales = (
-        weekly_sales_data.groupby("CreatedBy")["Price"]
-        .sum()
-        .reindex(targets_data.columns, fill_value=0)
-    )
+    weekly_sales = sales_cube.total(
+        by="CreatedBy", first_day=max(start_of_week, first_day), last_day=min(today_start, last_day), execs=valid_executives
+    ).reindex(targets_data.columns, fill_value=0)
 
     # ✅ Calculate total progress per executive
-    progress = (
-        filtered_data.groupby("CreatedBy")["Price"]
-        .sum()
-        .reindex(targets_data.columns, fill_value=0)
-    )
+    progress = sales_cube.total(
+        by="CreatedBy", first_day=first_day, last_day=last_day, execs=valid_executives
+    ).reindex(targets_data.columns, fill_value=0)
 
     # ✅ Retrieve correct monthly targets
     monthly_targets = targets_data.loc[(current_month, current_year)]
@@ -206,7 +244,7 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
         "Today's Sales": today_sales.values,
         "Weekly Sales": weekly_sales.values,
         "Progress To Monthly Target (Numeric)": progress_percentage.values,
-    }).fillna(0).reset_index(drop=True)
+    }, index=progress.index.to_numpy()).fillna(0)
 
     # ✅ Map usernames to full names
     user_mapping = {
@@ -234,7 +272,7 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
         "Progress To Monthly Target (Numeric)": None
     }
     if any(totals_row.values()):  # Ensure totals_row is not empty or all-NA
-        progress_data = pd.concat([progress_data, pd.DataFrame([totals_row])], ignore_index=True)
+        progress_data = pd.concat([progress_data, pd.DataFrame([totals_row], index=["TOTALS"])])
         
     max_today_sales = progress_data.loc[progress_data["Sales Exec"] != "TOTALS", "Today's Sales"].max()
     max_weekly_sales = progress_data.loc[progress_data["Sales Exec"] != "TOTALS", "Weekly Sales"].max()
@@ -308,11 +346,35 @@ def calculate_monthly_progress(data, start_date, end_date, targets_data):
     ]
 
     # ✅ Return styled table and list of sales made
-    styled_table = progress_data.to_html(classes="big-table", escape=False, index=False)
-    sales_made = filtered_data["CreatedBy"].unique()
-    return styled_table, sales_made
+    sales_made = sales_cube.total(
+        by="CreatedBy", measure="Sales", first_day=first_day, last_day=last_day, execs=valid_executives
+    ).index.to_numpy()
+    return progress_data, sales_made
 
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_monthly_progress(data_versions, start_date, end_date, today, valid_executives, _sales_cube):
+    """
+    Cached calculate_monthly_progress(): the styled leaderboard is only rebuilt when the
+    data, the selected date range or the day (today's and this week's columns) changes.
+    """
+    return calculate_monthly_progress(_sales_cube, start_date, end_date, targets_data, valid_executives)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def sales_export_csv(data_versions, start_date, end_date, valid_executives):
+    """
+    CSV of the executives' sales from start_date to end_date for the sidebar download,
+    or None if there are none. Cached per data version and date range.
+    """
+    data = load_live_data()
+    data["CreatedOn"] = ensure_datetime(data["CreatedOn"], dayfirst=True)
+    executive_data = data[
+        (data["CreatedOn"] >= start_date) &
+        (data["CreatedOn"] <= end_date) &
+        (data["CreatedBy"].isin(valid_executives))
+    ]
+    return executive_data.to_csv(index=False) if not executive_data.empty else None
 
 
 ################################################################################
@@ -324,7 +386,7 @@ def get_next_fixture(data, budget_df):
     Finds the earliest upcoming fixture based on 'KickOffEventStart'.
     Returns (fixture_name, fixture_date, budget_target, event_competition).
     """
-    data["KickOffEventStart"] = pd.to_datetime(data["KickOffEventStart"], errors="coerce")
+    data["KickOffEventStart"] = ensure_datetime(data["KickOffEventStart"])
     today = datetime.now()
     
     # Normalize fixture names
@@ -357,30 +419,26 @@ def get_next_fixture(data, budget_df):
 
 
 
-def generate_scrolling_messages(data, budget_df, df_inventory):
+def generate_scrolling_messages(sales_cube, budget_df, df_inventory):
     """
     Combines multiple short messages (latest sale, next fixture status, top fixture, top exec)
-    into a single scrolling marquee string.
+    into a single scrolling marquee string, read from the sales cube.
     """
-    data = data.copy()  # Ensure it's a copy before modifying
-    data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
-    data = data.dropna(subset=["CreatedOn"])  # Drop invalid date rows
-
     # 🔹 **Latest Sale**
-    latest_sale = data.sort_values(by="CreatedOn", ascending=False).head(1)
-    if not latest_sale.empty:
-        source = str(latest_sale["SaleLocation"].iloc[0]).lower()
-        created_by = str(latest_sale["CreatedBy"].iloc[0])
-        total_price = float(latest_sale["TotalPrice"].iloc[0]) if not pd.isnull(latest_sale["TotalPrice"].iloc[0]) else 0.0
+    latest_sale = sales_cube.latest_sale()
+    if latest_sale is not None:
+        source = str(latest_sale["SaleLocation"]).lower()
+        created_by = str(latest_sale["CreatedBy"])
+        total_price = float(latest_sale["TotalPrice"]) if not pd.isnull(latest_sale["TotalPrice"]) else 0.0
 
         if source in ["online", "website"]:
             latest_sale_message = f"💻 Online sale with £{total_price:,.2f} generated."
         elif source == "moto":
             latest_sale_message = f"📞 Generated by Moto ({created_by}) with £{total_price:,.2f} generated"
         else:
-            seats = int(latest_sale["Seats"].iloc[0]) if not pd.isnull(latest_sale["Seats"].iloc[0]) else 0
-            package_name = latest_sale["Package Name"].iloc[0]
-            fixture_name = latest_sale["Fixture Name"].iloc[0]
+            seats = int(latest_sale["Seats"]) if not pd.isnull(latest_sale["Seats"]) else 0
+            package_name = latest_sale["Package Name"]
+            fixture_name = latest_sale["Fixture Name"]
             latest_sale_message = f"🎟️ Latest Sale: {seats} seat(s) x {package_name} for {fixture_name} via {source.capitalize()} @ £{total_price:,.2f}."
     else:
         latest_sale_message = "🚫 No recent sales to display."
@@ -405,11 +463,9 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
 
     # ✅ **Generate Next Fixture Message**
     if next_fixture_name and pd.notnull(next_fixture_date):
-        fixture_data = data[
-            (data["Fixture Name"] == next_fixture_name) &
-            (data["EventCompetition"] == next_event_competition)
-        ]
-        fixture_revenue = fixture_data["Price"].sum()
+        fixture_revenue = sales_cube.total(
+            where={"Fixture Name": next_fixture_name, "EventCompetition": next_event_competition}
+        )
         days_to_fixture = (next_fixture_date - datetime.now()).days
         budget_achieved = round((fixture_revenue / next_budget_target) * 100, 2) if next_budget_target > 0 else 0
         fixture_display = f"{next_fixture_name} ({next_event_competition})"
@@ -421,10 +477,11 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
         next_fixture_message = "⚠️ No upcoming fixtures to display."
 
     # ✅ **Top Fixture of the Day**
-    today_sales = data[data["CreatedOn"].dt.floor('D') == pd.to_datetime(datetime.now().date())]
-    if not today_sales.empty:
-        top_fixture = today_sales.groupby("Fixture Name")["Price"].sum().idxmax()
-        top_fixture_revenue = today_sales.groupby("Fixture Name")["Price"].sum().max()
+    today = pd.to_datetime(datetime.now().date())
+    fixture_sales_today = sales_cube.total(by="Fixture Name", first_day=today, last_day=today)
+    if not fixture_sales_today.empty:
+        top_fixture = fixture_sales_today.idxmax()
+        top_fixture_revenue = fixture_sales_today.max()
         top_fixture_message = f"📈 Top Selling Fixture Today: {top_fixture} with £{top_fixture_revenue:,.2f} generated."
     else:
         top_fixture_message = "📉 No sales recorded today."
@@ -446,13 +503,13 @@ def generate_scrolling_messages(data, budget_df, df_inventory):
         # "MeganS":    "Megan"
     }
 
-    # Filter sales data for valid executives
-    exec_sales_today = today_sales[today_sales["CreatedBy"].isin(valid_executives)]
+    # Today's sales per valid executive
+    exec_sales_today = sales_cube.total(by="CreatedBy", first_day=today, last_day=today, execs=valid_executives)
 
     if not exec_sales_today.empty:
         # Get the top-selling executive (username)
-        top_executive_username = exec_sales_today.groupby("CreatedBy")["Price"].sum().idxmax()
-        top_executive_revenue = exec_sales_today.groupby("CreatedBy")["Price"].sum().max()
+        top_executive_username = exec_sales_today.idxmax()
+        top_executive_revenue = exec_sales_today.max()
 
         # Convert username to full name using mapping
         top_executive_name = user_mapping.get(top_executive_username, top_executive_username)
@@ -488,11 +545,12 @@ def get_upcoming_fixtures(inventory_df, n=3):
     Ensures duplicate fixtures don't repeat and the soonest matches are displayed.
     """
 
-    # Ensure KickOffEventStart is in datetime format
-    inventory_df["KickOffDT"] = pd.to_datetime(inventory_df["KickOffEventStart"], errors="coerce")
-    
-    # Strip extra whitespace from EventName
-    inventory_df["EventName"] = inventory_df["EventName"].str.strip()
+    # Ensure KickOffEventStart is in datetime format and strip extra whitespace from EventName
+    # (on a new frame: the inventory is shared by every session)
+    inventory_df = inventory_df.assign(
+        KickOffDT=ensure_datetime(inventory_df["KickOffEventStart"]),
+        EventName=inventory_df["EventName"].str.strip(),
+    )
 
     # Get today's date
     now = datetime.now()
@@ -521,226 +579,594 @@ def format_date_suffix(day):
     suffixes = {1: "st", 2: "nd", 3: "rd"}
     return f"{day}{suffixes.get(day % 10, 'th')}"
 
-def display_inventory_details(fixture_row, merged_inventory, full_sales_data):
+# Styles of the fixture inventory tables
+INVENTORY_TABLE_CSS = """
+    <style>
+        @font-face {
+            font-family: 'Chapman-Bold';
+            src: url('fonts/Chapman-Bold_2894575986.ttf') format('truetype');
+        }
+        @font-face {
+            font-family: 'Northbank-N7';
+            src: url('fonts/Northbank-N7_2789728357.ttf') format('truetype');
+        }
+        
+        /* 1. Remove default Streamlit top padding (move table up) */
+        .main .block-container {
+        padding-top: 0rem !important; 
+        margin-top: 40px !important;
+        margin-left: -60px !important; /* Move content to the left */
+        max-width: 80% !important; /* Reduce width for better alignment */
+        }
+        
+        body, html {
+            margin: 0;
+            padding: 0;
+            height: 100%;
+            width: 100%;
+        }
+
+        /* Optional Wrapper to allow horizontal scrolling if needed */
+        .table-wrapper {
+            width: 100%;
+            overflow-x: auto; 
+            margin: 0 auto;
+            margin-left: 0px;  /* Align table fully to the left */
+        }
+
+        .fixture-table {
+            /* Let columns auto-size based on content */
+            table-layout: auto;
+            width: 100%;
+            border-collapse: collapse;
+            background-color: white;
+        }
+
+        /* Header Styling */
+        .fixture-table th {
+            font-family: 'Chapman-Bold';
+            font-size: 24px;
+            text-align: center;
+            font-weight: bold;
+            padding: 3px;
+            border-bottom: 2px solid black;
+            background-color: #EAEAEA;
+            color: black;
+            white-space: nowrap; /* Prevent wrapping in headers */
+        }
+
+        /* Table Cells */
+        .fixture-table td {
+            font-family: 'Chapman-Bold';
+            font-size: 24px;
+            text-align: center;
+            font-weight: bold;
+            padding: 5px;
+            border-bottom: 1px solid #ddd;
+            background-color: white;
+            white-space: nowrap; /* Prevent wrapping in table cells */
+        }
+
+        .fixture-table tr:nth-child(even) {
+            background-color: white !important;
+        }
+
+        .fixture-table tr:hover {
+            background-color: #f5f5f5;
+        }
+    </style>
+"""
+
+def display_inventory_details(fixture_row, fixture_inventory, data_versions, page):
     """
     Displays the inventory details for upcoming fixtures including package stock, prices, and remaining seats.
-    Ensures that stock is calculated properly by subtracting actual sales. It calculates Seats sold minus Available stock at the time of the pull.
+    The table comes from render_inventory_table(), so it is only rebuilt when the data changes.
     """
+    st.markdown(INVENTORY_TABLE_CSS, unsafe_allow_html=True)
+
+    html_table = render_inventory_table(data_versions, page, fixture_row["EventId"], fixture_inventory)
+    if html_table is None:
+        st.error("⚠️ 'MaxSaleQuantity' column is missing in API inventory data!")
+        return
+
+    # Final display
     st.markdown(
+        f"""
+        {html_table}
+        """,
+        unsafe_allow_html=True
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_fixture_inventory(data_versions, as_of, _sales_cube, _df_inventory):
+    """
+    Stock, seats sold and seats remaining of the next three fixtures, computed in one pass
+    per data version (see tjt_fixture_inventory). as_of (a minute) drops fixtures that
+    have kicked off.
+    """
+    upcoming = get_upcoming_fixtures(_df_inventory, n=3)
+    return FixtureInventory.build(_df_inventory, upcoming, _sales_cube)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_inventory_table(data_versions, page, event_id, _fixture_inventory):
+    """
+    Cached inventory_table_html() for the fixture shown on a page, keyed by the sales and
+    inventory data versions.
+    """
+    return inventory_table_html(_fixture_inventory.table(event_id))
+
+
+def inventory_table_html(df_fixture):
+    """
+    Builds the HTML inventory table from a fixture's package table (see tjt_fixture_inventory).
+    Returns None if there is no table (the inventory data has no 'MaxSaleQuantity' column).
+    """
+    if df_fixture is None:
+        return None
+
+    # Apply "SOLD OUT" Styling for Package Name if Seats Remaining = 0
+    def style_seats_remaining(seats_remaining):
         """
-        <style>
-            @font-face {
-                font-family: 'Chapman-Bold';
-                src: url('fonts/Chapman-Bold_2894575986.ttf') format('truetype');
-            }
-            @font-face {
-                font-family: 'Northbank-N7';
-                src: url('fonts/Northbank-N7_2789728357.ttf') format('truetype');
-            }
-            
-            /* 1. Remove default Streamlit top padding (move table up) */
-            .main .block-container {
-            padding-top: 0rem !important; 
-            margin-top: 40px !important;
-            margin-left: -60px !important; /* Move content to the left */
-            max-width: 80% !important; /* Reduce width for better alignment */
-            }
-            
-            body, html {
-                margin: 0;
-                padding: 0;
-                height: 100%;
-                width: 100%;
-            }
+        Returns a styled <div> for the "Seats Remaining" cell:
+        - If seats_remaining <= 0, shows "SOLD OUT" in red background & white text (font-size 10px)
+        - Otherwise, displays the numeric seats_remaining (font-size 18px)
+        """
+        if seats_remaining <= 0:
+            return (
+                "<div style='background-color: red; color: white; font-family: Chapman-Bold; "
+                "font-size: 18px; font-weight: bold; padding: 5px; text-align: center; white-space: nowrap;'>"
+                "SOLD OUT</div>"
+            )
+        else:
+            return (
+                f"<div style='color: black; font-family: Chapman-Bold; font-size: 24px; font-weight: bold; "
+                f"padding: 5px; text-align: center; white-space: nowrap;'>{seats_remaining}</div>"
+            )
 
-            /* Optional Wrapper to allow horizontal scrolling if needed */
-            .table-wrapper {
-                width: 100%;
-                overflow-x: auto; 
-                margin: 0 auto;
-                margin-left: 0px;  /* Align table fully to the left */
-            }
+    df_fixture = df_fixture.assign(**{"Seats Remaining": df_fixture["Seats Remaining"].map(style_seats_remaining)})
 
-            .fixture-table {
-                /* Let columns auto-size based on content */
-                table-layout: auto;
-                width: 100%;
-                border-collapse: collapse;
-                background-color: white;
-            }
+    # Generate HTML Table
+    return df_fixture[["Package Name", "Seats Available", "Seats Sold", "Seats Remaining", "Current Price"]].to_html(
+        classes='fixture-table', index=False, escape=False
+    )
+
+
+def fixture_summary_cards(fixture_row, budget_df, sales_cube):
+    """
+    Builds the summary cards for the given fixture (the sidebar of the inventory pages):
+    a "Next Fixture" card and a "Next Fixture Details" card with its budget progress.
+    Returns a list of HTML strings.
+    """
+    cards = []
+    if fixture_row.empty:
+        cards.append(
+            """
+            <style>
+                @font-face {{
+                    font-family: 'Chapman-Bold';
+                    src: url('fonts/Chapman-Bold_2894575986.ttf') format('truetype');
+                }}
+                .no-fixture-widget {{
+                    background-color: #fff0f0;
+                    border: 2px solid #E41B17;
+                    border-radius: 15px;
+                    padding: 20px 15px;
+                    text-align: center;
+                    font-family: 'Chapman-Bold';
+                    font-size: 28px;
+                    font-weight: bold;
+                    color: #E41B17;
+                }}
+            </style>
+            <div class="no-fixture-widget">
+                ⚠️ No upcoming fixtures found.
+            </div>
+            """
+        )
+        return cards
+
+    fixture_name = fixture_row["EventName"]
+    event_competition = fixture_row["EventCompetition"]
+    fixture_date = pd.to_datetime(fixture_row["KickOffEventStart"], errors="coerce")
+
+    # ✅ Calculate fixture details
+    days_to_fixture = (fixture_date - datetime.now()).days if pd.notnull(fixture_date) else "TBC"
+    
+    # Concert are missing EventCompetition
+    if fixture_name in ["Robbie Williams Live 2025 (Friday)", "Robbie Williams Live 2025 (Saturday)"]:
+        event_competition = ""  # Force blank match since it's blank in budget_df
+
+    # ✅ Ensure correct lookup in budget_df
+    if isinstance(budget_df, pd.DataFrame):
+        matching_row = budget_df[
+            budget_df["Fixture Name"].str.strip().str.lower() == fixture_name.strip().lower()
+        ]
+        budget_target = matching_row["Budget Target"].values[0] if not matching_row.empty else 0
+    else:
+        budget_target = budget_df.get((fixture_name, event_competition), 0)
 
-            /* Header Styling */
-            .fixture-table th {
+
+    
+
+    # ✅ Ensure budget_target is numeric
+    budget_target = float(str(budget_target).replace("£", "").replace(",", "").strip()) if budget_target else 0
+
+    # ✅ Revenue of this fixture's event, from the sales cube
+    fixture_revenue = sales_cube.fixture_revenue(fixture_name, event_competition, fixture_row["EventId"])
+
+    # ✅ Compute budget percentage achieved
+    budget_achieved = round((fixture_revenue / budget_target) * 100, 2) if budget_target > 0 else 0
+
+    # 1️⃣ First widget: minimal “Next Fixture” card 
+    cards.append(
+        f"""
+        <style>
+            @font-face {{
                 font-family: 'Chapman-Bold';
-                font-size: 24px;
+                src: url('fonts/Chapman-Bold_2894575986.ttf') format('truetype');
+            }}
+            .next-fixture-minimal {{
+                background-color: #fff0f0;
+                border: 2px solid #E41B17; /* Use Blue for the border if desired */
+                border-radius: 15px;
+                margin-top: 10px;
+                padding: 15px;
                 text-align: center;
+                font-family: 'Chapman-Bold';
                 font-weight: bold;
-                padding: 3px;
-                border-bottom: 2px solid black;
-                background-color: #EAEAEA;
-                color: black;
-                white-space: nowrap; /* Prevent wrapping in headers */
-            }
+            }}
+            .next-fixture-minimal .header-text {{
+                font-size: 24px;
+                color: #0047AB; /* Blue for "Next Fixture" */
+                margin-bottom: 10px;
+            }}
+            .next-fixture-minimal .fixture-title {{
+                font-size: 22px;
+                color: #E41B17; /* Red for fixture name */
+                margin-bottom: 5px;
+            }}
+        </style>
+        <div class="next-fixture-minimal">
+            <div class="header-text">🏟️ Next Fixture</div>
+            <div class="fixture-title">{fixture_name} ({event_competition})</div>
+        </div>
+        """
+    )
 
-            /* Table Cells */
-            .fixture-table td {
+    # 2️⃣ Second widget: detailed “Next Fixture Details” card
+    cards.append(
+        f"""
+        <style>
+            @font-face {{
                 font-family: 'Chapman-Bold';
-                font-size: 24px;
+                src: url('fonts/Chapman-Bold_2894575986.ttf') format('truetype');
+            }}
+            .next-fixture-widget {{
+                background-color: #fff0f0;
+                border: 2px solid #E41B17;
+                border-radius: 15px;
+                margin-top: 10px;
+                padding: 15px;
                 text-align: center;
+                font-family: 'Chapman-Bold';
+                font-size: 24px;
                 font-weight: bold;
-                padding: 5px;
-                border-bottom: 1px solid #ddd;
-                background-color: white;
-                white-space: nowrap; /* Prevent wrapping in table cells */
-            }
-
-            .fixture-table tr:nth-child(even) {
-                background-color: white !important;
-            }
-
-            .fixture-table tr:hover {
-                background-color: #f5f5f5;
-            }
+                color: #E41B17;
+            }}
+            .next-fixture-widget .fixture-info {{
+                font-size: 20px;
+                color: #0047AB;
+                margin-bottom: 5px;
+            }}
+            .next-fixture-widget .fixture-days {{
+                font-size: 20px;
+                color: #E41B17;
+                margin-bottom: 5px;
+            }}
         </style>
-        """,
-        unsafe_allow_html=True
+        <div class="next-fixture-widget">
+            🏟️ Next Fixture Details <br>
+            <span class="fixture-info">⏳ Days to Fixture:</span>
+            <span class="fixture-days">{days_to_fixture} days</span>
+            <span class="fixture-info">🎯 Budget Target:</span>
+            <span class="fixture-days">£{budget_target:,.0f}</span>
+            <span class="fixture-info">✅ Budget Target Achieved:</span>
+            <span class="fixture-days">{budget_achieved:.2f}%</span>
+        </div>
+        """
     )
+    return cards
+
+
+def ticker_html(scrolling_message):
+    """Fixed marquee at the bottom of the page showing generate_scrolling_messages()."""
+    return f"""
+    <style>
+        @font-face {{
+            font-family: 'Northbank-N5';
+            src: url('fonts/Northbank-N5_2789720163.ttf') format('truetype');
+        }}
+        .custom-scroll-box {{
+            overflow: hidden;
+            white-space: nowrap;
+            max-width: 100%;
+            margin: 0 auto;
+            background-color: #fff0f0;
+            color: #E41B17;
+            padding: 10px 5px;
+            border-radius: 10px;
+            font-family: 'Northbank-N5';
+            font-size: 25px;
+            font-weight: bold;
+            text-align: center;
+            border: 1px solid #E41B17;
+            position: fixed;
+            bottom: 0px;
+            bottom: 0;
+            left: 0; /* Ensure it starts at the left edge */
+            width: 100%;
+            z-index: 1000;
+            box-shadow: 0px 4px 8px rgba(0, 0, 0, 0.2);
+        }}
+        body {{
+            padding-bottom: 90px;
+        }}
+    </style>
+    <div class="custom-scroll-box">
+        <marquee behavior="scroll" direction="left" scrollamount="4">
+            <span id="live-ticker">{scrolling_message}</span>
+        </marquee>
+    </div>
+    """
 
-    # ✅ 1. Filter inventory data for the selected fixture and event competition
-    if fixture_row["EventName"].strip().lower() == "arsenal v paris saint-germain":
-        # hard‑code: only pull the semi-final match (EventId 88)
-        df_fixture = merged_inventory[merged_inventory["EventId"] == 88].copy()
-    else:
-        df_fixture = merged_inventory[
-            (merged_inventory["EventName"] == fixture_row["EventName"]) &
-            (merged_inventory["EventCompetition"] == fixture_row.get("EventCompetition", "")) &
-            (merged_inventory["KickOffEventStart"] == fixture_row["KickOffEventStart"])
-        ].copy()
-
-    # ✅ 2. Ensure 'MaxSaleQuantity' (Stock Available) is present
-    if "MaxSaleQuantity" not in df_fixture.columns:
-        st.error("⚠️ 'MaxSaleQuantity' column is missing in API inventory data!")
-        return
 
-    # ✅ 3. Keep AvailableSeats column (if exists)
-    if "AvailableSeats" not in df_fixture.columns:
-        df_fixture["AvailableSeats"] = 0  # Placeholder to avoid errors
+# Title of the sales leaderboard page
+LEADERBOARD_TITLE_HTML = """
+<style>
+@font-face {
+    font-family: 'Northbank-N7';
+    src: url('fonts/Northbank-N7_2789728357.ttf') format('truetype');
+}
+.custom-title {
+    font-family: 'Northbank-N7';
+    font-size: 45px;
+    font-weight: bold;
+    color: #E41B17;
+    text-align: center;
+}
+</style>
+<div class="custom-title">
+    ARSENAL PREMIUM SALES
+</div>
+"""
+
+def leaderboard_table_html(monthly_progress):
+    """Centres the styled leaderboard from calculate_monthly_progress() on the page."""
+    return f"""
+    <div style="display: flex; justify-content: center; align-items: center; margin-top: 20px; margin-bottom: 20px;">
+        {monthly_progress}
+    </div>
+    """
 
-    # ✅ 4. Convert MaxSaleQuantity and Capacity to numeric
-    df_fixture["MaxSaleQuantity"] = pd.to_numeric(df_fixture["MaxSaleQuantity"], errors="coerce").fillna(0).astype(int)
-    df_fixture["Capacity"] = pd.to_numeric(df_fixture["Capacity"], errors="coerce").fillna(0).astype(int)
+# "server" switches pages with a full Streamlit rerun; "client" sends all four pages as one
+# component once per data version and lets the browser rotate between them
+ROTATION_MODE = os.getenv("LEADERBOARD_ROTATION", "server")
 
-    # ✅ 5. Adjust Stock Available for Boxes (N7, N5, any "Box" package)
-    df_fixture["Stock Available"] = df_fixture["MaxSaleQuantity"]  # Default: Use MaxSaleQuantity
+# Seconds each page is shown in client rotation
+PAGE_SECONDS = int(os.getenv("LEADERBOARD_PAGE_SECONDS", "25"))
 
-    # Identify packages with "Box" in their name where MaxSaleQuantity is 0
-    box_packages = df_fixture[df_fixture["PackageName"].str.contains("Box", case=False, na=False)]
+# In client rotation the page only reruns this often, to pick up a new data version
+CAROUSEL_REFRESH_SECONDS = int(os.getenv("LEADERBOARD_CAROUSEL_REFRESH", "60"))
 
-    for package in box_packages["PackageName"].unique():
-        package_rows = df_fixture[df_fixture["PackageName"] == package]
-        if package_rows["MaxSaleQuantity"].sum() == 0:  # If all MaxSaleQuantity are 0, use summed Capacity
-            total_capacity = package_rows["Capacity"].sum()
-            df_fixture.loc[df_fixture["PackageName"] == package, "Stock Available"] = total_capacity
+# Push new sales to the carousel's ticker and leaderboard over the live feed (tjt_live_feed).
+# Needs TJT_LIVE_FEED_URL, the feed's public URL as the screens reach it
+LIVE_UPDATES = os.getenv("LEADERBOARD_LIVE_UPDATES", "1") == "1"
+if LIVE_UPDATES and not LIVE_FEED_URL:
+    print("Live updates are off: set TJT_LIVE_FEED_URL to the live feed's public URL (see tjt_live_feed).")
+    LIVE_UPDATES = False
 
-    # ✅ 6. Convert Price to numeric safely
-    df_fixture["Price"] = pd.to_numeric(df_fixture["Price"], errors="coerce").fillna(0)
+# Height in pixels of the carousel component
+CAROUSEL_HEIGHT = int(os.getenv("LEADERBOARD_CAROUSEL_HEIGHT", "1000"))
 
-    # ✅ 7. Aggregate sales data for 'Seats Sold'
-    df_sales_for_fixture = full_sales_data[
-        (full_sales_data["Fixture Name"] == fixture_row["EventName"]) &
-        (full_sales_data["EventCompetition"] == fixture_row.get("EventCompetition", ""))&
-        (full_sales_data["EventId"] == fixture_row["EventId"])
+def carousel_document(pages, ticker="", feed_url=None, page_seconds=PAGE_SECONDS):
+    """
+    Wraps the pages' HTML in one document that shows a page at a time. The page shown is
+    worked out from the clock, so every screen shows the same page and a reloaded
+    document (new data) carries on where the previous one was.
 
-    ]
-    
-    if df_sales_for_fixture.empty:
-        df_fixture["Seats Sold"] = 0
+    With a feed_url, the ticker and the leaderboard (#live-leaderboard, when its data-range
+    matches) are updated in place from the live feed (see live_snapshot): each cell is found
+    by its data-cell key, and rows are put in the pushed order.
+    """
+    sections = "\n".join(f'<section class="carousel-page">{page}</section>' for page in pages)
+    return f"""
+    <style>
+        body {{ margin: 0; background-color: white; }}
+        .carousel-page {{ display: none; }}
+        .carousel-page.active {{ display: block; }}
+        .fixture-page {{ display: flex; gap: 20px; align-items: flex-start; }}
+        .fixture-page aside {{ flex: 0 0 320px; }}
+        .fixture-page main {{ flex: 1; }}
+    </style>
+    {sections}
+    {ticker}
+    <script>
+        const pages = document.querySelectorAll(".carousel-page");
+        function showPage() {{
+            const current = Math.floor(Date.now() / ({page_seconds} * 1000)) % pages.length;
+            pages.forEach((page, i) => page.classList.toggle("active", i === current));
+        }}
+        showPage();
+        setInterval(showPage, 1000);
+
+        const feedUrl = {json.dumps(feed_url)};
+        if (feedUrl) {{
+            const source = new EventSource(feedUrl);
+            let feedRange = null;
+            source.onmessage = (event) => {{
+                const changes = JSON.parse(event.data);
+                if ("ticker" in changes) {{
+                    document.getElementById("live-ticker").innerHTML = changes.ticker;
+                }}
+                if ("leaderboard.range" in changes) {{
+                    feedRange = changes["leaderboard.range"];
+                }}
+                const board = document.getElementById("live-leaderboard");
+                if (!board || board.dataset.range !== feedRange) {{
+                    return;
+                }}
+                const cell = (key) => board.querySelector(`[data-cell="${{CSS.escape(key)}}"]`);
+                for (const [name, value] of Object.entries(changes)) {{
+                    const target = name.startsWith("leaderboard.cell.") && cell(name.slice("leaderboard.cell.".length));
+                    if (target) {{
+                        target.innerHTML = value;
+                    }}
+                }}
+                if ("leaderboard.order" in changes) {{
+                    // Rows follow the exec order pushed; a new or missing exec waits for the next page reload
+                    const rows = changes["leaderboard.order"].map((exec) => cell(`${{exec}}|Sales Exec`)?.closest("tr"));
+                    if (rows.length && rows.every(Boolean)) {{
+                        rows.forEach((row) => row.parentNode.appendChild(row));
+                    }}
+                }}
+            }};
+        }}
+    </script>
+    """
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def render_carousel_html(data_versions, start_date, end_date, as_of, valid_executives, budget_mtime, _sales_cube, _df_inventory):
+    """
+    Renders the leaderboard and the next three fixtures' pages (summary cards and inventory
+    table) as one carousel document. Cached per data version, date range and hour (as_of),
+    since the leaderboard's today/week columns and the days to each fixture depend on it.
+    """
+    if LIVE_UPDATES:
+        # Cells keyed for the live feed's in-place updates
+        progress_data, _ = monthly_progress_frame(_sales_cube, start_date, end_date, targets_data, valid_executives)
+        monthly_progress = None if progress_data is None else live_leaderboard_html(progress_data)
     else:
-        sales_agg = (
-            df_sales_for_fixture
-            .groupby(["Package Name", "EventCompetition"])["Seats"]
-            .sum()
-            .reset_index()
-            .rename(columns={"Seats": "Seats Sold"})
+        monthly_progress, _ = render_monthly_progress(
+            data_versions, start_date, end_date, as_of.date(), valid_executives, _sales_cube
         )
+    pages = [
+        LEADERBOARD_TITLE_HTML
+        + f'<div id="live-leaderboard" data-range="{date_range_label(start_date, end_date)}">'
+        + leaderboard_table_html(monthly_progress)
+        + "</div>"
+    ]
 
-        # ✅ Merge sales with inventory
-        df_fixture = pd.merge(
-            df_fixture,
-            sales_agg,
-            left_on="PackageName",
-            right_on="Package Name",
-            how="left"
-        )
-        df_fixture.drop(columns="Package Name", inplace=True, errors="ignore")
+    fixture_inventory = load_fixture_inventory(data_versions, as_of, _sales_cube, _df_inventory)
+    for position, missing in enumerate(["No upcoming fixtures found.", "No second upcoming fixture found.", "No third upcoming fixture found."]):
+        fixture_row = fixture_inventory.fixture(position)
+        if fixture_row is None:
+            pages.append(f"<p>{missing}</p>")
+            continue
+        cards = "".join(fixture_summary_cards(fixture_row, budget_df, _sales_cube))
+        html_table = render_inventory_table(data_versions, position + 2, fixture_row["EventId"], fixture_inventory)
+        if html_table is None:
+            html_table = "<p>⚠️ 'MaxSaleQuantity' column is missing in API inventory data!</p>"
+        pages.append(f'<div class="fixture-page"><aside>{cards}</aside><main>{INVENTORY_TABLE_CSS}{html_table}</main></div>')
 
-        df_fixture["Seats Sold"] = pd.to_numeric(df_fixture["Seats Sold"], errors="coerce").fillna(0).astype(int)
+    ticker = ticker_html(generate_scrolling_messages(_sales_cube, budget_df, _df_inventory))
+    return carousel_document(pages, ticker, subscribe_url() if LIVE_UPDATES else None)
 
-    # ✅ 8. Compute Stock Remaining (ensuring no negative values)
-    df_fixture["Stock Remaining"] = (df_fixture["Stock Available"] - df_fixture["Seats Sold"]).clip(lower=0)
 
-    # ✅ 9. Rename 'Price' to 'Current Price' and format it
-    df_fixture["Current Price"] = df_fixture["Price"].apply(lambda x: f"£{x:,.2f}")
+def date_range_label(start_date, end_date):
+    return f"{start_date:%Y-%m-%d}/{end_date:%Y-%m-%d}"
 
-    # ✅ 10. Exclude specific packages
-    df_fixture["PackageName"] = df_fixture["PackageName"].str.strip()
-    df_fixture = df_fixture[~df_fixture["PackageName"].isin([
-        "INTERNAL MBM BOX",
-        "Woolwich Restaurant",
-        "AWFC Executive Box - Ticket Only",
-        "AWFC Executive Box - Ticket + F&B",
-        "AWFC Box Arsenal"
-    ])]
-    
-   # 11️⃣ Convert price to numeric for sorting
-    df_fixture["Sort Price"] = df_fixture["Current Price"].replace("[£,]", "", regex=True).astype(float)
 
-    # Rename 'PackageName' to 'Package Name' for display
-    df_fixture.rename(columns={
-        "PackageName": "Package Name", 
-        "Stock Available": "Seats Available", 
-        "Stock Remaining": "Seats Remaining"
-    }, inplace=True)
+def default_date_range():
+    """The sidebar's default range: the 1st of this month to the end of today."""
+    today = pd.Timestamp.now().normalize()
+    return today.replace(day=1), today + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
 
-    # ✅ Sort by Price so the row you keep is the one with largest Price (optional)
-    df_fixture = df_fixture.sort_values(by="Price", ascending=False)
 
-    # ✅ Drop duplicates by "Package Name", keeping the first occurrence
-    df_fixture.drop_duplicates(subset=["Package Name"], keep="first", inplace=True)
+# Plain names of the leaderboard's columns, used to key its cells on the live feed
+LEADERBOARD_COLUMNS = ["Sales Exec", "Today's Sales", "Weekly Sales", "Progress To Monthly Target"]
 
-    # 12. Apply "SOLD OUT" Styling for Package Name if Seats Remaining = 0
-    def style_seats_remaining(seats_remaining):
-        """
-        Returns a styled <div> for the "Seats Remaining" cell:
-        - If seats_remaining <= 0, shows "SOLD OUT" in red background & white text (font-size 10px)
-        - Otherwise, displays the numeric seats_remaining (font-size 18px)
-        """
-        if seats_remaining <= 0:
-            return (
-                "<div style='background-color: red; color: white; font-family: Chapman-Bold; "
-                "font-size: 18px; font-weight: bold; padding: 5px; text-align: center; white-space: nowrap;'>"
-                "SOLD OUT</div>"
-            )
-        else:
-            return (
-                f"<div style='color: black; font-family: Chapman-Bold; font-size: 24px; font-weight: bold; "
-                f"padding: 5px; text-align: center; white-space: nowrap;'>{seats_remaining}</div>"
-            )
 
-    df_fixture["Seats Remaining"] = df_fixture["Seats Remaining"].apply(style_seats_remaining)
+def leaderboard_cells(progress_data):
+    """The cells of a monthly_progress_frame() as {"<exec username>|<column>": HTML}."""
+    return {
+        f"{exec}|{column}": value
+        for exec, values in zip(progress_data.index, progress_data.itertuples(index=False))
+        for column, value in zip(LEADERBOARD_COLUMNS, values)
+    }
 
-    # 13. Generate HTML Table
-    html_table = df_fixture[["Package Name", "Seats Available", "Seats Sold", "Seats Remaining", "Current Price"]].to_html(
-        classes='fixture-table', index=False, escape=False
-    )
 
-    # Final display
-    st.markdown(
-        f"""
-        {html_table}
-        """,
-        unsafe_allow_html=True
-    )
+def live_leaderboard_html(progress_data):
+    """
+    calculate_monthly_progress()'s table with each cell's content wrapped in an element
+    whose data-cell holds its leaderboard_cells() key, so the carousel can update it in place.
+    """
+    keyed = progress_data.copy()
+    for position, column in enumerate(LEADERBOARD_COLUMNS):
+        keyed.iloc[:, position] = [
+            f'<div data-cell="{html.escape(f"{exec}|{column}")}">{value}</div>'
+            for exec, value in zip(keyed.index, keyed.iloc[:, position])
+        ]
+    return keyed.to_html(classes="big-table", escape=False, index=False)
+
+
+def loaded_data():
+    """
+    The sales cube and inventory this process already holds in memory, or (None, None)
+    until both are loaded. Never reads the dataset store or fetches, so the live feed's
+    thread can call it; the load_* helpers' st.error calls can't be used there either.
+    """
+    tjt_hosp_api = sys.modules.get("tjt_hosp_api")
+    tjt_inventory = sys.modules.get("tjt_inventory")
+    sales_cube = tjt_hosp_api.loaded_sales_cube() if tjt_hosp_api else None
+    inventory_frames = tjt_inventory.inventory_dataset.frames if tjt_inventory else None
+    if sales_cube is None or inventory_frames is None:
+        return None, None
+    return sales_cube, inventory_frames["inventory"]
+
+
+def live_feed_key():
+    """Changes when another sales or inventory version is loaded, or on the hour (see render_carousel_html)."""
+    return data_versions(), pd.Timestamp.now().floor("h")
+
+
+def live_snapshot():
+    """
+    The values pushed to open carousels: the ticker text, the leaderboard's exec order and
+    each of its cells for the default date range as "leaderboard.cell.<exec>|<column>"
+    (screens showing another range keep their own). The feed only sends the entries that
+    changed. None until the data is loaded.
+    """
+    sales_cube, df_inventory = loaded_data()
+    if sales_cube is None:
+        return None
+    start_date, end_date = default_date_range()
+    progress_data, _ = monthly_progress_frame(sales_cube, start_date, end_date, targets_data, valid_sales_executives)
+    snapshot = {
+        "ticker": generate_scrolling_messages(sales_cube, budget_df, df_inventory),
+        "leaderboard.range": date_range_label(start_date, end_date),
+    }
+    if progress_data is not None:
+        snapshot["leaderboard.order"] = [str(exec) for exec in progress_data.index]
+        for key, value in leaderboard_cells(progress_data).items():
+            snapshot[f"leaderboard.cell.{key}"] = value
+    return snapshot
+
+
+def start_live_feed():
+    """
+    Starts the live feed (once per process) and wires it to the data: sales are refreshed
+    every LIVE_FEED_REFRESH seconds by the background refresher (only by the process holding
+    its owner lock), and the feed is woken as soon as a new version of either dataset is loaded.
+    """
+    tjt_hosp_api = importlib.import_module("tjt_hosp_api")
+    tjt_inventory = importlib.import_module("tjt_inventory")
+    for dataset in (tjt_hosp_api.sales_dataset, tjt_inventory.inventory_dataset):
+        dataset.add_listener(live_feed.wake)
+    refresher.register(tjt_hosp_api.sales_dataset, LIVE_FEED_REFRESH)
+    refresher.start()
+    live_feed.start(live_snapshot, live_feed_key)
 
 
 ################################################################################
@@ -755,6 +1181,9 @@ def run_dashboard():
       - Page 3: 2nd Upcoming Fixture
       - Page 4: 3rd Upcoming Fixture
     Each page auto-cycles every 15 seconds.
+
+    With LEADERBOARD_ROTATION=client all four pages are sent at once and rotated by
+    the browser; the page only reruns every LEADERBOARD_CAROUSEL_REFRESH seconds.
     """
     # st.set_page_config(page_title="Hospitality Leadership Board", layout="wide")
     
@@ -831,10 +1260,16 @@ def run_dashboard():
     # --------------------------------------------------------------------------
     #  MOVE OUR LOAD FUNCTIONS HERE so that each refresh re-runs them:
     # --------------------------------------------------------------------------
-    filtered_df_without_seats = load_live_data()
+    sales_cube = load_sales_cube()
     df_inventory = load_inventory_data()
+    # Rendered tables are cached per version of this data (see data_versions())
+    versions = data_versions()
     # --------------------------------------------------------------------------
 
+    # Show how old the published sales data is, since pages no longer wait for TJT
+    if "tjt_hosp_api" in sys.modules:
+        st.sidebar.caption(sys.modules["tjt_hosp_api"].sales_dataset.describe_age())
+
     # For sales + services
     valid_sales_executives = ["dcoppin", "TBC", "bgardiner", "dmontague", "jedwards"]
     # valid_services_executives = ["HayleyA", "BethNW", "BenT", "jmurphy", "MeganS"]
@@ -877,14 +1312,6 @@ def run_dashboard():
         unsafe_allow_html=True
     )
     
-    # Ensure `filtered_data` exists
-    filtered_data = filtered_df_without_seats.copy()
-    
-    # Convert 'CreatedOn' to datetime safely
-    filtered_data["CreatedOn"] = pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True)
-    
-    filtered_data = filtered_data[filtered_data["CreatedBy"].isin(valid_sales_executives)]
-
     # -------------------------
     # ✅ **Sidebar - Date Filter**
     # -------------------------
@@ -897,34 +1324,20 @@ def run_dashboard():
     start_date = pd.to_datetime(selected_start_date).replace(day=1)  # Always first day of the month
     end_date = pd.to_datetime(selected_end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)  # Full last day
 
-    # ✅ Apply correct date filtering for sales data
-    filtered_data = filtered_data[
-        (filtered_data["CreatedOn"] >= start_date) &
-        (filtered_data["CreatedOn"] <= end_date)
-    ]
-
 
     # -------------------------
     # ✅ **Render Budget Progress and Next Fixture Side bar**
     # -------------------------
     
-    def render_budget_progress_widget(data, valid_executives, title, start_date, end_date, targets_data):
+    def render_budget_progress_widget(sales_cube, valid_executives, title, start_date, end_date, targets_data):
         """
         Renders a sidebar widget showing total revenue vs. target within the selected date range.
         Includes a download button to export filtered sales data.
         """
-        # ✅ Ensure 'CreatedOn' is datetime
-        data["CreatedOn"] = pd.to_datetime(data["CreatedOn"], errors="coerce", dayfirst=True)
-
-        # ✅ Apply the same date filtering as calculate_monthly_progress()
-        executive_data = data[
-            (data["CreatedOn"] >= start_date) &
-            (data["CreatedOn"] <= end_date) &
-            (data["CreatedBy"].isin(valid_executives))
-        ]
-
-        # ✅ Calculate total revenue for selected range
-        total_revenue = executive_data["Price"].sum()
+        # ✅ Calculate total revenue for selected range (whole days, from the sales cube)
+        total_revenue = sales_cube.total(
+            first_day=start_date.normalize(), last_day=end_date.normalize(), execs=valid_executives
+        )
 
         # ✅ Retrieve correct target
         current_month = start_date.strftime("%B")
@@ -976,9 +1389,9 @@ def run_dashboard():
             unsafe_allow_html=True,
         )
 
-        # ✅ Sidebar Download Button (Filtered Data Export)
-        if not executive_data.empty:
-            csv_data = executive_data.to_csv(index=False)
+        # ✅ Sidebar Download Button (Filtered Data Export, same date filtering as calculate_monthly_progress())
+        csv_data = sales_export_csv(versions, start_date, end_date, valid_executives)
+        if csv_data is not None:
             st.sidebar.download_button(
                 label="📥 Download Sales Data",
                 data=csv_data,
@@ -988,16 +1401,6 @@ def run_dashboard():
 
 
 
-    # -------------------------
-    # ✅ **Filter Sales & Services Data Properly**
-    # -------------------------
-    mask_sales = (
-        filtered_data["CreatedBy"].isin(valid_sales_executives) &
-        (pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True) >= start_date) &
-        (pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True) <= end_date)
-    )
-    filtered_sales_data = filtered_data[mask_sales]
-
     # mask_services = (
     #     filtered_data["CreatedBy"].isin(valid_services_executives) &
     #     (pd.to_datetime(filtered_data["CreatedOn"], errors="coerce", dayfirst=True) >= start_date) &
@@ -1006,170 +1409,13 @@ def run_dashboard():
     # filtered_services_data = filtered_data[mask_services]
     
     
-    def render_next_fixture_sidebar(fixture_row, filtered_data, budget_df):
+    def render_next_fixture_sidebar(fixture_row, budget_df):
         """
         Renders a quick summary widget in the sidebar for the given fixture.
         THIS IS ONLY FOR THE REMAINING INVENTORY PAGES
         """
-        if fixture_row.empty:
-            st.sidebar.markdown(
-                """
-                <style>
-                    @font-face {{
-                        font-family: 'Chapman-Bold';
-                        src: url('fonts/Chapman-Bold_2894575986.ttf') format('truetype');
-                    }}
-                    .no-fixture-widget {{
-                        background-color: #fff0f0;
-                        border: 2px solid #E41B17;
-                        border-radius: 15px;
-                        padding: 20px 15px;
-                        text-align: center;
-                        font-family: 'Chapman-Bold';
-                        font-size: 28px;
-                        font-weight: bold;
-                        color: #E41B17;
-                    }}
-                </style>
-                <div class="no-fixture-widget">
-                    ⚠️ No upcoming fixtures found.
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
-            return
-
-        fixture_name = fixture_row["EventName"]
-        event_competition = fixture_row["EventCompetition"]
-        fixture_date = pd.to_datetime(fixture_row["KickOffEventStart"], errors="coerce")
-
-        # ✅ Calculate fixture details
-        days_to_fixture = (fixture_date - datetime.now()).days if pd.notnull(fixture_date) else "TBC"
-        
-        # Concert are missing EventCompetition
-        if fixture_name in ["Robbie Williams Live 2025 (Friday)", "Robbie Williams Live 2025 (Saturday)"]:
-            event_competition = ""  # Force blank match since it's blank in budget_df
-
-        # ✅ Ensure correct lookup in budget_df
-        if isinstance(budget_df, pd.DataFrame):
-            matching_row = budget_df[
-                budget_df["Fixture Name"].str.strip().str.lower() == fixture_name.strip().lower()
-            ]
-            budget_target = matching_row["Budget Target"].values[0] if not matching_row.empty else 0
-        else:
-            budget_target = budget_df.get((fixture_name, event_competition), 0)
-
-
-        
-
-        # ✅ Ensure budget_target is numeric
-        budget_target = float(str(budget_target).replace("£", "").replace(",", "").strip()) if budget_target else 0
-
-        # ✅ FIX: Filter correct sales data
-        fixture_data = filtered_df_without_seats[
-            (filtered_df_without_seats["Fixture Name"].str.strip().str.lower() == fixture_name.strip().lower()) &
-            (filtered_df_without_seats["EventCompetition"].str.strip().str.lower() == event_competition.strip().lower())&
-            (filtered_df_without_seats["EventId"] == fixture_row["EventId"])
-        ]
-
-        # ✅ Ensure numeric conversion
-        if not fixture_data.empty:
-            fixture_data["Price"] = pd.to_numeric(fixture_data["Price"], errors="coerce").fillna(0)
-            fixture_revenue = fixture_data["Price"].sum()  # ✅ CORRECT Calculation
-        else:
-            fixture_revenue = 0
-
-        # ✅ Compute budget percentage achieved
-        budget_achieved = round((fixture_revenue / budget_target) * 100, 2) if budget_target > 0 else 0
-
-        # ✅ Debugging Output
-        print("\n🔍 DEBUG: Fixture Revenue Calculation")
-        print(f"Fixture: {fixture_name} | Competition: {event_competition}")
-        print(f"Total Rows Matched: {len(fixture_data)}")
-        print(f"🎯 Budget Target: £{budget_target:,.0f}")
-        print(f"💰 FIXED Fixture Revenue: £{fixture_revenue:,.0f}")
-        print(f"📊 Budget Target Achieved: {budget_achieved:.2f}%")
-
-        # 1️⃣ First widget: minimal “Next Fixture” card 
-        st.sidebar.markdown(
-            f"""
-            <style>
-                @font-face {{
-                    font-family: 'Chapman-Bold';
-                    src: url('fonts/Chapman-Bold_2894575986.ttf') format('truetype');
-                }}
-                .next-fixture-minimal {{
-                    background-color: #fff0f0;
-                    border: 2px solid #E41B17; /* Use Blue for the border if desired */
-                    border-radius: 15px;
-                    margin-top: 10px;
-                    padding: 15px;
-                    text-align: center;
-                    font-family: 'Chapman-Bold';
-                    font-weight: bold;
-                }}
-                .next-fixture-minimal .header-text {{
-                    font-size: 24px;
-                    color: #0047AB; /* Blue for "Next Fixture" */
-                    margin-bottom: 10px;
-                }}
-                .next-fixture-minimal .fixture-title {{
-                    font-size: 22px;
-                    color: #E41B17; /* Red for fixture name */
-                    margin-bottom: 5px;
-                }}
-            </style>
-            <div class="next-fixture-minimal">
-                <div class="header-text">🏟️ Next Fixture</div>
-                <div class="fixture-title">{fixture_name} ({event_competition})</div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-
-        # 2️⃣ Second widget: detailed “Next Fixture Details” card
-        st.sidebar.markdown(
-            f"""
-            <style>
-                @font-face {{
-                    font-family: 'Chapman-Bold';
-                    src: url('fonts/Chapman-Bold_2894575986.ttf') format('truetype');
-                }}
-                .next-fixture-widget {{
-                    background-color: #fff0f0;
-                    border: 2px solid #E41B17;
-                    border-radius: 15px;
-                    margin-top: 10px;
-                    padding: 15px;
-                    text-align: center;
-                    font-family: 'Chapman-Bold';
-                    font-size: 24px;
-                    font-weight: bold;
-                    color: #E41B17;
-                }}
-                .next-fixture-widget .fixture-info {{
-                    font-size: 20px;
-                    color: #0047AB;
-                    margin-bottom: 5px;
-                }}
-                .next-fixture-widget .fixture-days {{
-                    font-size: 20px;
-                    color: #E41B17;
-                    margin-bottom: 5px;
-                }}
-            </style>
-            <div class="next-fixture-widget">
-                🏟️ Next Fixture Details <br>
-                <span class="fixture-info">⏳ Days to Fixture:</span>
-                <span class="fixture-days">{days_to_fixture} days</span>
-                <span class="fixture-info">🎯 Budget Target:</span>
-                <span class="fixture-days">£{budget_target:,.0f}</span>
-                <span class="fixture-info">✅ Budget Target Achieved:</span>
-                <span class="fixture-days">{budget_achieved:.2f}%</span>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+        for card in fixture_summary_cards(fixture_row, budget_df, sales_cube):
+            st.sidebar.markdown(card, unsafe_allow_html=True)
 
 
 
@@ -1179,70 +1425,54 @@ def run_dashboard():
     ############################################################################
 
     
-    # PAGE 1: Sales Leaderboard
-    if st.session_state.page == 1:
-        st.markdown(
-            """
-            <style>
-            @font-face {
-                font-family: 'Northbank-N7';
-                src: url('fonts/Northbank-N7_2789728357.ttf') format('truetype');
-            }
-            .custom-title {
-                font-family: 'Northbank-N7';
-                font-size: 45px;
-                font-weight: bold;
-                color: #E41B17;
-                text-align: center;
-            }
-            </style>
-            <div class="custom-title">
-                ARSENAL PREMIUM SALES
-            </div>
-            """,
-            unsafe_allow_html=True,
+    # CLIENT ROTATION: every page in one component, rotated by the browser (LEADERBOARD_ROTATION=client)
+    if ROTATION_MODE == "client":
+        carousel_html = render_carousel_html(
+            versions, start_date, end_date, pd.Timestamp.now().floor("h"), valid_sales_executives,
+            budget_file_mtime(), sales_cube, df_inventory
         )
-        monthly_progress, sales_made = calculate_monthly_progress(
-            filtered_sales_data, start_date, end_date, targets_data
-        )
-        st.markdown(
-            f"""
-            <div style="display: flex; justify-content: center; align-items: center; margin-top: 20px; margin-bottom: 20px;">
-                {monthly_progress}
-            </div>
-            """,
-            unsafe_allow_html=True,
+        components.html(carousel_html, height=CAROUSEL_HEIGHT, scrolling=True)
+        if LIVE_UPDATES:
+            start_live_feed()
+        render_budget_progress_widget(sales_cube, valid_sales_executives, "Sales Exec", start_date, end_date, targets_data)
+
+    # PAGE 1: Sales Leaderboard
+    elif st.session_state.page == 1:
+        st.markdown(LEADERBOARD_TITLE_HTML, unsafe_allow_html=True)
+        monthly_progress, sales_made = render_monthly_progress(
+            versions, start_date, end_date, datetime.now().date(), valid_sales_executives, sales_cube
         )
-        render_budget_progress_widget(filtered_sales_data, valid_sales_executives, "Sales Exec", start_date, end_date, targets_data)
+        st.markdown(leaderboard_table_html(monthly_progress), unsafe_allow_html=True)
+        render_budget_progress_widget(sales_cube, valid_sales_executives, "Sales Exec", start_date, end_date, targets_data)
 
 
     # PAGE 1: 1st Upcoming Fixture
     elif st.session_state.page == 2:
-        next_fixtures = get_upcoming_fixtures(df_inventory, n=3)
-        if len(next_fixtures) >= 1:
-            fixture_1 = next_fixtures.iloc[0]
-            render_next_fixture_sidebar(fixture_1, filtered_data, budget_df)
-            display_inventory_details(fixture_1, df_inventory, filtered_df_without_seats)
+        fixture_inventory = load_fixture_inventory(versions, pd.Timestamp.now().floor("min"), sales_cube, df_inventory)
+        fixture_1 = fixture_inventory.fixture(0)
+        if fixture_1 is not None:
+            render_next_fixture_sidebar(fixture_1, budget_df)
+            display_inventory_details(fixture_1, fixture_inventory, versions, st.session_state.page)
         else:
             st.write("No upcoming fixtures found.")
 
     # PAGE 2: 2nd Upcoming Fixture
     elif st.session_state.page == 3:
-        next_fixtures = get_upcoming_fixtures(df_inventory, n=3)
-        if len(next_fixtures) >= 2:
-            fixture_2 = next_fixtures.iloc[1]
-            render_next_fixture_sidebar(fixture_2, filtered_data, budget_df)
-            display_inventory_details(fixture_2, df_inventory, filtered_df_without_seats)
+        fixture_inventory = load_fixture_inventory(versions, pd.Timestamp.now().floor("min"), sales_cube, df_inventory)
+        fixture_2 = fixture_inventory.fixture(1)
+        if fixture_2 is not None:
+            render_next_fixture_sidebar(fixture_2, budget_df)
+            display_inventory_details(fixture_2, fixture_inventory, versions, st.session_state.page)
         else:
             st.write("No second upcoming fixture found.")
 
     # PAGE 3: 3rd Upcoming Fixture
     elif st.session_state.page == 4:
-        next_fixtures = get_upcoming_fixtures(df_inventory, n=3)
-        if len(next_fixtures) >= 3:
-            fixture_3 = next_fixtures.iloc[2]
-            render_next_fixture_sidebar(fixture_3, filtered_data, budget_df)
-            display_inventory_details(fixture_3, df_inventory, filtered_df_without_seats)
+        fixture_inventory = load_fixture_inventory(versions, pd.Timestamp.now().floor("min"), sales_cube, df_inventory)
+        fixture_3 = fixture_inventory.fixture(2)
+        if fixture_3 is not None:
+            render_next_fixture_sidebar(fixture_3, budget_df)
+            display_inventory_details(fixture_3, fixture_inventory, versions, st.session_state.page)
         else:
             st.write("No third upcoming fixture found.")
 
@@ -1251,51 +1481,16 @@ def run_dashboard():
     ############################################################################
     # Scrolling Marquee & Auto-refresh
     ############################################################################
-    scrolling_message = generate_scrolling_messages(filtered_df_without_seats, budget_df, df_inventory)
-    st.markdown(
-        f"""
-        <style>
-            @font-face {{
-                font-family: 'Northbank-N5';
-                src: url('fonts/Northbank-N5_2789720163.ttf') format('truetype');
-            }}
-            .custom-scroll-box {{
-                overflow: hidden;
-                white-space: nowrap;
-                max-width: 100%;
-                margin: 0 auto;
-                background-color: #fff0f0;
-                color: #E41B17;
-                padding: 10px 5px;
-                border-radius: 10px;
-                font-family: 'Northbank-N5';
-                font-size: 25px;
-                font-weight: bold;
-                text-align: center;
-                border: 1px solid #E41B17;
-                position: fixed;
-                bottom: 0px;
-                bottom: 0;
-                left: 0; /* Ensure it starts at the left edge */
-                width: 100%;
-                z-index: 1000;
-                box-shadow: 0px 4px 8px rgba(0, 0, 0, 0.2);
-            }}
-            body {{
-                padding-bottom: 90px;
-            }}
-        </style>
-        <div class="custom-scroll-box">
-            <marquee behavior="scroll" direction="left" scrollamount="4">
-                {scrolling_message}
-            </marquee>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+    if ROTATION_MODE != "client":  # The carousel document has its own, live-updated ticker
+        scrolling_message = generate_scrolling_messages(sales_cube, budget_df, df_inventory)
+        st.markdown(ticker_html(scrolling_message), unsafe_allow_html=True)
     
     # Automatically refresh the page every 5 minutes (300,000 milliseconds)
-    st_autorefresh(interval=15000, key="auto_refresh")  # Refresh every 5 minutes
+    if ROTATION_MODE == "client":
+        # Pages rotate in the browser; reruns only pick up new data
+        st_autorefresh(interval=CAROUSEL_REFRESH_SECONDS * 1000, key="auto_refresh")
+    else:
+        st_autorefresh(interval=15000, key="auto_refresh")  # Refresh every 5 minutes
 
 ################################################################################
 # 6. Main Entry Point
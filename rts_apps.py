@@ -87,18 +87,18 @@ def reload_data():
     import importlib
     logging.info("🔄 Reloading tjt_hosp_api...")
     try:
-        # Reload the module dynamically
+        # Force a refresh of tjt_hosp_api's shared cache (max_age=0)
         tjt_hosp_api = importlib.import_module('tjt_hosp_api')
-        importlib.reload(tjt_hosp_api)
+        filtered_df_without_seats = tjt_hosp_api.load_hospitality_sales(max_age=0)
 
         # Validate the reloaded data
-        filtered_df_without_seats = getattr(tjt_hosp_api, 'filtered_df_without_seats', None)
         if filtered_df_without_seats is None or filtered_df_without_seats.empty:
             raise ValueError("filtered_df_without_seats is None or empty after reload.")
 
         # Log successful reload
         logging.info(f"✅ Data reloaded successfully. Rows: {len(filtered_df_without_seats)}")
-        st.success("✅ Data refreshed successfully!")
+        # With TJT_REFRESH_MODE=background the refresh runs on the refresher thread, so report the age served
+        st.success(f"✅ Data refreshed successfully! {tjt_hosp_api.sales_dataset.describe_age()}")
 
         # Reload dependent modules dynamically
         importlib.reload(sales_performance)
@@ -194,6 +194,17 @@ else:
         reload_data()  # Call the reload function
         # st.rerun()  # Trigger a full app rerun after reload
 
+    # Show how old the published sales data is, and which events failed to refresh
+    try:
+        tjt_hosp_api = importlib.import_module('tjt_hosp_api')
+        st.sidebar.caption(tjt_hosp_api.sales_dataset.describe_age())
+        failures = tjt_hosp_api.failed_events()
+        if failures:
+            fixtures = ", ".join(str(failure["Fixture Name"]) for failure in failures)
+            st.sidebar.warning(f"⚠️ Sales for these events could not be refreshed and show their last synced data: {fixtures}")
+    except ImportError as e:
+        logging.error(f"Failed to import 'tjt_hosp_api': {e}")
+
     # Update app_registry with the new dashboard
     app_registry = {
         "📊 Hosp Sales": sales_performance.run_app,
@@ -12,13 +12,14 @@ import base64
 # Import live data and reload the module
 def load_live_data():
     try:
-        tjt_hosp_api = importlib.reload(importlib.import_module("tjt_hosp_api"))
-        filtered_df_without_seats = getattr(tjt_hosp_api, "filtered_df_without_seats", None)
+        tjt_hosp_api = importlib.import_module("tjt_hosp_api")
+        # Served from tjt_hosp_api's process-wide cache; only refetched once it is older than TJT_MAX_AGE
+        filtered_df_without_seats = tjt_hosp_api.load_hospitality_sales()
         if filtered_df_without_seats is None:
             raise ImportError("filtered_df_without_seats is not available in tjt_hosp_api.")
         return filtered_df_without_seats
     except ImportError as e:
-        st.error(f"Error reloading tjt_hosp_api: {e}")
+        st.error(f"Error loading tjt_hosp_api data: {e}")
         return pd.DataFrame(columns=["CreatedBy", "Price", "CreatedOn", "SaleLocation", "KickOffEventStart", "Fixture Name", "Package Name", "TotalPrice", "Seats"])
 
 # Load data
@@ -121,7 +122,7 @@ def calculate_monthly_progress(data, start_date, end_date):
 
     # Today's sales (based on the end_date of the range)
     today_sales_data = data[data["CreatedOn"].dt.date == pd.Timestamp(end_date).date()]
-    today_sales_total = today_sales_data.groupby("CreatedBy")["Price"].sum().reindex(targets_data.columns, fill_value=0)
+    today_sales_total = today_sales_data.groupby("CreatedBy", observed=True)["Price"].sum().reindex(targets_data.columns, fill_value=0)
 
     # Weekly sales (from Monday to end_date)
     start_of_week = pd.Timestamp(end_date) - pd.Timedelta(days=pd.Timestamp(end_date).weekday())
@@ -129,11 +130,11 @@ def calculate_monthly_progress(data, start_date, end_date):
         (data["CreatedOn"] >= start_of_week) &
         (data["CreatedOn"] <= pd.to_datetime(end_date))
     ]
-    weekly_sales_total = weekly_sales_data.groupby("CreatedBy")["Price"].sum().reindex(targets_data.columns, fill_value=0)
+    weekly_sales_total = weekly_sales_data.groupby("CreatedBy", observed=True)["Price"].sum().reindex(targets_data.columns, fill_value=0)
 
     # Progress calculation
     progress = (
-        filtered_data.groupby("CreatedBy")["Price"]
+        filtered_data.groupby("CreatedBy", observed=True)["Price"]
         .sum()
         .reindex(targets_data.columns, fill_value=0)
     )
@@ -267,7 +268,7 @@ def get_next_fixture(data, budget_df):
 
     # Aggregate data to find the earliest fixture for each unique `Fixture Name` and `EventCompetition`
     aggregated_data = (
-        future_data.groupby(["Fixture Name", "EventCompetition"], as_index=False)
+        future_data.groupby(["Fixture Name", "EventCompetition"], as_index=False, observed=True)
         .agg({
             "KickOffEventStart": "min",  # Take the earliest kickoff time
             "Price": "sum",             # Sum all prices for revenue
@@ -367,8 +368,8 @@ def generate_scrolling_messages(data, budget_df):
     # Top Fixture of the Day
     today_sales = data[data["CreatedOn"].dt.date == datetime.now().date()]
     if not today_sales.empty:
-        top_fixture = today_sales.groupby("Fixture Name")["Price"].sum().idxmax()
-        top_fixture_revenue = today_sales.groupby("Fixture Name")["Price"].sum().max()
+        top_fixture = today_sales.groupby("Fixture Name", observed=True)["Price"].sum().idxmax()
+        top_fixture_revenue = today_sales.groupby("Fixture Name", observed=True)["Price"].sum().max()
         top_fixture_message = f"📈 Top Selling Fixture Today: {top_fixture} with £{top_fixture_revenue:,.2f} generated."
     else:
         top_fixture_message = "📉 No sales recorded today."
@@ -382,8 +383,8 @@ def generate_scrolling_messages(data, budget_df):
 
     if not exec_sales_today.empty:
         # Calculate the top-selling executive among the specified list
-        top_executive = exec_sales_today.groupby("CreatedBy")["Price"].sum().idxmax()
-        top_executive_revenue = exec_sales_today.groupby("CreatedBy")["Price"].sum().max()
+        top_executive = exec_sales_today.groupby("CreatedBy", observed=True)["Price"].sum().idxmax()
+        top_executive_revenue = exec_sales_today.groupby("CreatedBy", observed=True)["Price"].sum().max()
         top_executive_message = (
             f"🤵‍♀️ Top Selling Exec Today: 🌟{top_executive}🌟 with £{top_executive_revenue:,.2f} generated.."
         )
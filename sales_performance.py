@@ -7,6 +7,7 @@ import sys
 import re
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from tjt_transforms import ensure_datetime
 
 # allow import of your local charts_ module
 sys.path.append("/Users/cmunthali/Documents/PYTHON/APPS")
@@ -19,12 +20,9 @@ from charts_ import (
 # ─── Dynamically import tjt_hosp_api ────────────────────────────────────────────
 try:
     tjt_hosp_api = importlib.import_module('tjt_hosp_api')
-    filtered_df_without_seats = getattr(tjt_hosp_api, 'filtered_df_without_seats', None)
-    if filtered_df_without_seats is None:
-        raise ImportError("filtered_df_without_seats is not available in tjt_hosp_api.")
 except ImportError as e:
     st.error(f"❌ Error importing tjt_hosp_api: {e}")
-    filtered_df_without_seats = None
+    tjt_hosp_api = None
 
 def load_budget_targets():
     """
@@ -82,8 +80,8 @@ def run_app():
         - Contact [cmunthali@arsenal.co.uk](mailto:cmunthali@arsenal.co.uk) for any issues or inquiries.
         """)
 
-    # Dynamically fetch hospitality data on app start
-    loaded_api_df = filtered_df_without_seats
+    # Fetch hospitality data from tjt_hosp_api's process-wide cache
+    loaded_api_df = tjt_hosp_api.load_hospitality_sales() if tjt_hosp_api else None
     if loaded_api_df is None or loaded_api_df.empty:
         st.warning("⚠️ No data available. Please refresh to load the latest data.")
         return
@@ -109,18 +107,13 @@ def run_app():
             filtered_data[col] = pd.to_numeric(filtered_data[col], errors='coerce')
 
         # Convert 'CreatedOn'
-        filtered_data['CreatedOn'] = pd.to_datetime(
-            filtered_data['CreatedOn'], format='%d-%m-%Y %H:%M', errors='coerce'
-        )
-        loaded_api_df['CreatedOn'] = pd.to_datetime(
-            loaded_api_df['CreatedOn'], format='%d-%m-%Y %H:%M', errors='coerce'
-        )
+        filtered_data['CreatedOn'] = ensure_datetime(filtered_data['CreatedOn'], format='%d-%m-%Y %H:%M')
+        loaded_api_df['CreatedOn'] = ensure_datetime(loaded_api_df['CreatedOn'], format='%d-%m-%Y %H:%M')
 
         # ─── STEP 1: parse KickOffEventStart in sales DataFrame to datetime ────────
-        filtered_data['KickOffEventStart'] = pd.to_datetime(
+        filtered_data['KickOffEventStart'] = ensure_datetime(
             filtered_data['KickOffEventStart'],
-            format='%d-%m-%Y %H:%M',
-            errors='coerce'
+            format='%d-%m-%Y %H:%M'
         )
 
         # ─── STEP 1b: create a date-only column to fuse on ─────────────────────────
@@ -232,8 +225,8 @@ def run_app():
         other_sales_total = dynamic_total + filtered_data_without_excluded_keywords['DiscountValue'].sum()
 
         # Metric cards
-        raw_loc   = filtered_data_excluding_packages.groupby('SaleLocation')['TotalPrice'].sum().reset_index()
-        other_loc = filtered_data_without_excluded_keywords.groupby('SaleLocation')['DiscountValue'].sum().reset_index()
+        raw_loc   = filtered_data_excluding_packages.groupby('SaleLocation', observed=True)['TotalPrice'].sum().reset_index()
+        other_loc = filtered_data_without_excluded_keywords.groupby('SaleLocation', observed=True)['DiscountValue'].sum().reset_index()
         raw_loc   = pd.merge(raw_loc, other_loc, on='SaleLocation', how='left').rename(columns={'DiscountValue':'OtherPayments'})
         raw_loc['TotalWithOtherPayments'] = raw_loc['TotalPrice'] + raw_loc['OtherPayments'].fillna(0)
         top_channel = raw_loc.sort_values('TotalWithOtherPayments', ascending=False).iloc[0]
@@ -252,7 +245,7 @@ def run_app():
         # build the summary off of filtered_data_excluding_packages
         total_sold_per_match = (
             filtered_data_excluding_packages
-            .groupby(["Fixture Name","KickOffEventStart"])
+            .groupby(["Fixture Name","KickOffEventStart"], observed=True)
             .agg(
                 DaysToFixture=("Days to Fixture","min"),
                 RTS_Sales=("TotalPrice","sum"),
@@ -261,7 +254,7 @@ def run_app():
             .reset_index()
         )
         other_sales = (
-            filtered_data_without_excluded_keywords.groupby("Fixture Name")['DiscountValue'].sum()
+            filtered_data_without_excluded_keywords.groupby("Fixture Name", observed=True)['DiscountValue'].sum()
         )
         total_sold_per_match = pd.merge(
             total_sold_per_match,
@@ -270,7 +263,7 @@ def run_app():
             how="left"
         )
         total_sold_per_match['OtherSales'] = total_sold_per_match['OtherSales'].fillna(0) + total_sold_per_match['RTS_Sales']
-        covers = filtered_data_excluding_packages.groupby("Fixture Name")['Seats'].sum().rename("CoversSold")
+        covers = filtered_data_excluding_packages.groupby("Fixture Name", observed=True)['Seats'].sum().rename("CoversSold")
         total_sold_per_match = pd.merge(total_sold_per_match, covers, on="Fixture Name", how="left")
         total_sold_per_match['CoversSold'] = total_sold_per_match['CoversSold'].fillna(0).astype(int)
         total_sold_per_match['Avg Spend'] = total_sold_per_match.apply(
@@ -296,7 +289,7 @@ def run_app():
         # Table with Pending Payments
         st.write("### Table with Pending Payments")
         total_discount_value = filtered_data_without_excluded_keywords.groupby(
-            ['Order Id','Country Code','First Name','Surname','Fixture Name','GLCode','CreatedOn']
+            ['Order Id','Country Code','First Name','Surname','Fixture Name','GLCode','CreatedOn'], observed=True
         )[['Discount','DiscountValue','TotalPrice']].sum().reset_index()
         total_discount_value['TotalPrice']    = total_discount_value['TotalPrice'].apply(lambda x: f"£{x:,.2f}")
         total_discount_value['DiscountValue']= total_discount_value['DiscountValue'].apply(lambda x: f"£{x:,.2f}")
@@ -304,8 +297,8 @@ def run_app():
 
         # Package Sales
         st.write("### 🎟️ MBM Package Sales")
-        other_pkg = filtered_data_without_excluded_keywords.groupby('Package Name')['DiscountValue'].sum().rename("OtherPayments")
-        pkg       = filtered_data_excluding_packages.groupby('Package Name')['TotalPrice'].sum().rename("TotalPrice")
+        other_pkg = filtered_data_without_excluded_keywords.groupby('Package Name', observed=True)['DiscountValue'].sum().rename("OtherPayments")
+        pkg       = filtered_data_excluding_packages.groupby('Package Name', observed=True)['TotalPrice'].sum().rename("TotalPrice")
         total_sold_per_package = pd.merge(pkg.reset_index(), other_pkg.reset_index(), on='Package Name', how='left')
         total_sold_per_package['TotalWithOtherPayments'] = total_sold_per_package['TotalPrice'] + total_sold_per_package['OtherPayments'].fillna(0)
         for col in ['TotalPrice','OtherPayments','TotalWithOtherPayments']:
@@ -314,8 +307,8 @@ def run_app():
 
         # Payment Channel table
         st.write("### 🏟️ Payment Channel")
-        other_loc = filtered_data_without_excluded_keywords.groupby('SaleLocation')['DiscountValue'].sum().rename("OtherPayments")
-        loc       = filtered_data_excluding_packages.groupby('SaleLocation')['TotalPrice'].sum().rename("TotalPrice")
+        other_loc = filtered_data_without_excluded_keywords.groupby('SaleLocation', observed=True)['DiscountValue'].sum().rename("OtherPayments")
+        loc       = filtered_data_excluding_packages.groupby('SaleLocation', observed=True)['TotalPrice'].sum().rename("TotalPrice")
         total_sold_per_location = pd.merge(loc.reset_index(), other_loc.reset_index(), on='SaleLocation', how='left')
         total_sold_per_location['TotalWithOtherPayments'] = total_sold_per_location['TotalPrice'] + total_sold_per_location['OtherPayments'].fillna(0)
         for col in ['TotalPrice','OtherPayments','TotalWithOtherPayments']:
@@ -332,7 +325,7 @@ def run_app():
         total_covers_sold  = wool['Seats'].sum()
         st.write(f"Total Sales Revenue: **£{total_sales_revenue:,.0f}**")
         st.write(f"Total Covers Sold: **{int(total_covers_sold)}**")
-        wool_summary = wool.groupby(['Fixture Name','KickOffEventStart']).agg({'Seats':'sum','TotalPrice':'sum'}).reset_index()
+        wool_summary = wool.groupby(['Fixture Name','KickOffEventStart'], observed=True).agg({'Seats':'sum','TotalPrice':'sum'}).reset_index()
         wool_summary = wool_summary.rename(columns={
             'Fixture Name':'Event','KickOffEventStart':'Event Date','Seats':'Covers Sold','TotalPrice':'Revenue'
         })
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-import requests
+from tjt_auth import get_access_token, TJT_BASE_URL
+from tjt_http import shared_client, TJTRequestError
 import time
 import math
 from datetime import datetime
@@ -137,26 +138,16 @@ def run():
     end_date = st.sidebar.date_input("End Date", datetime.now())
     
     # --- API Config ---
-    token_url = "https://www.tjhub3.com/export_arsenal/token"
-    events_url = "https://www.tjhub3.com/export_arsenal/Events/List"
-    preorders_url_template = "https://www.tjhub3.com/export_arsenal/CateringPreorders/List?EventId={}"
-    USERNAME = "hospitality"
-    PASSWORD = "OkMessageSectionType000!"
-
-    @st.cache_data
-    def get_access_token():
-        data = {"Username": USERNAME, "Password": PASSWORD, "grant_type": "password"}
-        resp = requests.post(token_url, data=data)
-        if resp.status_code == 200:
-            return resp.json().get("access_token")
-        return None
+    events_url = f"{TJT_BASE_URL}/Events/List"
+    preorders_url_template = f"{TJT_BASE_URL}/CateringPreorders/List?EventId={{}}"
 
     @st.cache_data
     def fetch_event_details(headers):
-        r = requests.get(events_url, headers=headers)
-        if r.status_code != 200:
+        try:
+            events = shared_client().get_json(events_url, headers=headers).get("Data", {}).get("Events", [])
+        except TJTRequestError as e:
+            st.error(f"Failed to load events from TJT: {e}")
             return []
-        events = r.json().get("Data", {}).get("Events", [])
         return [
             {
                 "EventId": e["Id"],
@@ -169,10 +160,16 @@ def run():
     @st.cache_data
     def fetch_api_preorders(event_ids, headers):
         all_data = []
+        failed_event_ids = []
         for eid in event_ids:
-            r = requests.get(preorders_url_template.format(eid), headers=headers)
-            if r.status_code == 200:
-                all_data.extend(r.json().get("Data", {}).get("CateringPreorders", []))
+            try:
+                r = shared_client().get_json(preorders_url_template.format(eid), headers=headers)
+            except TJTRequestError:
+                failed_event_ids.append(eid)
+                continue
+            all_data.extend(r.get("Data", {}).get("CateringPreorders", []))
+        if failed_event_ids:
+            st.warning(f"Pre-orders could not be loaded for EventId(s): {', '.join(map(str, failed_event_ids))}")
         return pd.DataFrame(all_data)
 
     @st.cache_data
@@ -324,9 +321,10 @@ def run():
             time.sleep(0.2)
 
             # Get API Token
-            token = get_access_token()
-            if not token:
-                st.error("❌ Failed to retrieve API token.")
+            try:
+                token = get_access_token()
+            except TJTRequestError as e:
+                st.error(f"❌ Failed to retrieve API token: {e}")
                 st.stop()
             headers = {"Authorization": f"Bearer {token}"}
             process_progress_bar.progress(30)
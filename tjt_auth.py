@@ -0,0 +1,94 @@
+import os
+import time
+import threading
+from tjt_http import TJTClient, TJTRequestError
+
+# Root of every TJT endpoint; point it at tjt_mock_server to work offline
+TJT_BASE_URL = os.getenv("TJT_BASE_URL", "https://www.tjhub3.com/export_arsenal").rstrip("/")
+
+# OAuth2 endpoint and credentials shared by every TJT API module
+token_url = os.getenv("TJT_TOKEN_URL", f"{TJT_BASE_URL}/token")
+Username = os.getenv("TJT_USERNAME", "hospitality")
+Password = os.getenv("TJT_PASSWORD", "OkMessageSectionType000!")
+grant_type = 'password'
+
+# Tokens are renewed this many seconds before TJT says they expire
+TOKEN_REFRESH_MARGIN = int(os.getenv("TJT_TOKEN_REFRESH_MARGIN", "120"))
+
+
+class TokenProvider:
+    """
+    Caches the TJT bearer token until shortly before its expires_in and renews it ahead of
+    time. Safe to call from several threads: only one of them requests a new token while
+    the others wait for it.
+    """
+
+    def __init__(self, url=token_url, username=Username, password=Password, refresh_margin=TOKEN_REFRESH_MARGIN):
+        self.url = url
+        self.username = username
+        self.password = password
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._client = TJTClient()  # Unauthenticated, with the same timeouts and retries as the API calls
+
+    def _is_fresh(self):
+        return self._token is not None and time.monotonic() < self._expires_at - self.refresh_margin
+
+    def get_token(self, force=False):
+        """Returns a valid access token. Raises TJTRequestError if TJT doesn't issue one."""
+        if not force and self._is_fresh():
+            return self._token
+
+        with self._lock:
+            # Another thread may have renewed the token while this one waited
+            if not force and self._is_fresh():
+                return self._token
+
+            headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+            data = {
+                'Username': self.username,
+                'Password': self.password,
+                'grant_type': grant_type
+            }
+            try:
+                response = self._client.request("POST", self.url, headers=headers, data=data, auth=False)
+            except TJTRequestError as e:
+                print(f"Failed to retrieve access token: {e}")
+                raise
+
+            try:
+                token_data = response.json()
+            except ValueError:
+                # HTML or empty error pages from the token endpoint aren't JSON
+                print(f"Failed to retrieve access token: {response.status_code} from {self.url} is not JSON")
+                raise TJTRequestError(self.url, response.status_code, "token response is not JSON")
+            if not isinstance(token_data, dict) or not token_data.get('access_token'):
+                print(f"Failed to retrieve access token: no access_token in the response from {self.url}")
+                raise TJTRequestError(self.url, response.status_code, "no access_token in response")
+            expires_in = token_data.get('expires_in', 3600)  # Assuming 1 hour default if not provided
+            self._token = token_data.get('access_token')
+            self._expires_at = time.monotonic() + expires_in
+            return self._token
+
+    def invalidate(self):
+        """Drops the cached token, e.g. after the API answers 401."""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+
+# Process-wide provider used by tjt_hosp_api, tjt_inventory and the portal metrics apps
+token_provider = TokenProvider()
+
+
+def get_access_token():
+    return token_provider.get_token()
+
+
+def auth_headers():
+    return {
+        'Authorization': f'Bearer {get_access_token()}',
+        'Content-Type': 'application/json'
+    }
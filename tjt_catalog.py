@@ -0,0 +1,138 @@
+import os
+import time
+import hashlib
+import threading
+import pandas as pd
+from tjt_auth import TJT_BASE_URL
+from tjt_http import shared_client, ijson
+from tjt_sync_store import payload_hash
+
+# Slow-changing TJT lists, kept apart from the transactions' refresh cycle
+accounts_url = f"{TJT_BASE_URL}/Accounts/List"
+event_list_url = f"{TJT_BASE_URL}/Events/List"
+
+# Seconds each catalog is trusted before it is revalidated with TJT
+ACCOUNTS_TTL = int(os.getenv("TJT_ACCOUNTS_TTL", "3600"))
+EVENTS_TTL = int(os.getenv("TJT_EVENTS_TTL", "900"))
+
+# Account fields merged onto the transactions; the rest of each guest record is never kept
+ACCOUNT_COLUMNS = [
+    "GuestId", "FirstName", "Surname", "Email", "CountryCode", "PostCode", "City",
+    "CompanyName", "DOB", "Status", "IsSeasonal",
+]
+
+# Returned by a download when TJT answered 304 Not Modified to our ETag
+NOT_MODIFIED = object()
+
+
+def _conditional_get(url, etag):
+    headers = {"If-None-Match": etag} if etag else None
+    return shared_client().request("GET", url, headers=headers, stream=ijson is not None)
+
+
+def download_accounts(etag=None):
+    """
+    Returns (accounts DataFrame, ETag) or NOT_MODIFIED. The DataFrame holds the
+    ACCOUNT_COLUMNS of every account, built column by column while the response is
+    streamed. Raises TJTRequestError if the accounts can't be fetched.
+    """
+    response = _conditional_get(accounts_url, etag)
+    if response.status_code == 304:
+        response.close()
+        return NOT_MODIFIED
+
+    columns = {name: [] for name in ACCOUNT_COLUMNS}
+    seen = set()
+    for guest in shared_client().iter_response_items(response, "Data.Guests.item"):
+        for name, values in columns.items():
+            values.append(guest.get(name))
+        if len(seen) < len(ACCOUNT_COLUMNS):
+            seen.update(name for name in ACCOUNT_COLUMNS if name in guest)
+    # Fields the API never sent are left out, so merging falls back to "" as before
+    accounts_df = pd.DataFrame({name: values for name, values in columns.items() if name in seen})
+    return accounts_df, response.headers.get("ETag")
+
+
+def download_events(etag=None):
+    """Returns (event list, ETag) or NOT_MODIFIED. Raises TJTRequestError if it can't be fetched."""
+    response = _conditional_get(event_list_url, etag)
+    if response.status_code == 304:
+        response.close()
+        return NOT_MODIFIED
+    events = list(shared_client().iter_response_items(response, "Data.Events.item"))
+    return events, response.headers.get("ETag")
+
+
+def frame_digest(df):
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+
+class Catalog:
+    """
+    Process-wide TTL cache of one slow-changing TJT list.
+
+    get() serves the cached value for ttl seconds without touching TJT. After that it
+    revalidates: with If-None-Match when TJT sent an ETag, otherwise by downloading and
+    comparing a content hash. An unchanged catalog keeps the same value object and
+    digest, so anything derived from it (see derive) is reused rather than rebuilt.
+    If revalidation fails, the cached value is served until the next attempt.
+    """
+
+    def __init__(self, name, download, digest, ttl):
+        self.name = name
+        self.download = download
+        self.digest_func = digest
+        self.ttl = ttl
+        self.value = None
+        self.digest = None
+        self.etag = None
+        self.checked_at = None
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, max_age):
+        return self.value is not None and time.monotonic() - self.checked_at < max_age
+
+    def get(self, max_age=None):
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            if self._is_fresh(max_age):
+                return self.value
+
+            try:
+                result = self.download(self.etag)
+            except Exception as e:
+                if self.value is None:
+                    raise
+                print(f"Failed to revalidate the {self.name} catalog, serving cached copy: {e}")
+                return self.value
+
+            self.checked_at = time.monotonic()
+            if result is NOT_MODIFIED:
+                return self.value
+
+            value, self.etag = result
+            digest = self.digest_func(value)
+            if digest != self.digest:
+                self.value, self.digest = value, digest
+                self._derived.clear()
+            return self.value
+
+    def derive(self, key, build):
+        """Returns build(value), computed once per catalog version."""
+        value = self.get()
+        with self._lock:
+            cache_key = (key, self.digest)
+            if cache_key not in self._derived:
+                self._derived[cache_key] = build(value)
+            return self._derived[cache_key]
+
+    def invalidate(self):
+        """Forces the next get() to revalidate with TJT."""
+        with self._lock:
+            self.checked_at = float("-inf")
+
+
+# Shared by tjt_hosp_api and tjt_inventory, so one Events/List download serves both
+accounts_catalog = Catalog("accounts", download_accounts, frame_digest, ACCOUNTS_TTL)
+events_catalog = Catalog("events", download_events, payload_hash, EVENTS_TTL)
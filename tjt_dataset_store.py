@@ -0,0 +1,395 @@
+import os
+import json
+import time
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+from datetime import datetime
+
+# Bump when a schema below changes so older snapshots are ignored instead of misread
+SCHEMA_VERSION = 4
+
+DATASET_DIR = os.getenv("TJT_DATASET_DIR", os.path.join(os.path.dirname(__file__), "data"))
+
+# Number of published versions kept on disk per dataset
+KEEP_VERSIONS = int(os.getenv("TJT_KEEP_VERSIONS", "3"))
+
+# Low-cardinality names repeated on every sale, stored once per distinct value (pandas category)
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+_SALES_FIELDS = [
+    ("Order Id", pa.int64()),
+    ("KickOffEventStart", pa.timestamp("ns")),
+    ("EventCategory", pa.string()),
+    ("EventCompetition", _CATEGORY),
+    ("Fixture Name", _CATEGORY),
+    ("Type", pa.string()),
+    ("Package Name", _CATEGORY),
+    ("LocationName", pa.string()),
+    ("PackageId", pa.int64()),
+    ("EventId", pa.int64()),
+    ("GuestId", pa.int64()),
+    ("Seats", pa.int64()),
+    ("CRCCode", pa.string()),
+    ("Price", pa.float64()),
+    ("Discount", pa.string()),
+    ("DiscountValue", pa.float64()),
+    ("IsPaid", pa.bool_()),
+    ("PaymentTime", pa.timestamp("ns")),
+    ("CreatedOn", pa.timestamp("ns")),
+    ("CreatedBy", _CATEGORY),
+    ("TotalPrice", pa.float64()),
+    ("GLCode", pa.string()),
+    ("SaleLocation", _CATEGORY),
+    ("CompanyName", pa.string()),
+    ("DOB", pa.string()),
+    ("Status", pa.string()),
+    ("IsSeasonal", pa.bool_()),
+    ("First Name", pa.string()),
+    ("Surname", pa.string()),
+    ("Email", pa.string()),
+    ("Country Code", pa.string()),
+    ("PostCode", pa.string()),
+    ("City", pa.string()),
+]
+
+_SEAT_FIELDS = [
+    ("AreaName", pa.string()),
+    ("PriceBandName", pa.string()),
+    ("Seat Number", pa.string()),
+    ("Row", pa.string()),
+    ("BlockId", pa.string()),
+]
+
+_FIELD_TYPES = dict(_SALES_FIELDS + _SEAT_FIELDS)
+
+# Explicit schemas of every frame that can be published, keyed by frame name
+SCHEMAS = {
+    "filtered_df_without_seats": pa.schema(_SALES_FIELDS),
+    "filtered_df_with_seats": pa.schema([(name, _FIELD_TYPES[name]) for name in [
+        "Order Id", "KickOffEventStart", "EventCategory", "EventCompetition", "Fixture Name", "Type", "Package Name",
+        "LocationName", "PackageId", "EventId", "GuestId", "Seats", "AreaName", "PriceBandName", "Seat Number", "Row",
+        "BlockId", "CRCCode", "Price", "Discount", "DiscountValue", "IsPaid", "PaymentTime", "CreatedOn", "CreatedBy",
+        "TotalPrice", "GLCode", "SaleLocation", "First Name", "Surname", "Email", "Country Code", "PostCode",
+    ]]),
+    # Pre-aggregated sales (tjt_sales_cube) read by the leaderboards instead of the full frame
+    "sales_cube": pa.schema([
+        ("Day", pa.timestamp("ns")),
+        ("CreatedBy", _CATEGORY),
+        ("EventId", pa.int64()),
+        ("Fixture Name", _CATEGORY),
+        ("EventCompetition", _CATEGORY),
+        ("Package Name", _CATEGORY),
+        ("SaleLocation", _CATEGORY),
+        ("Revenue", pa.float64()),
+        ("TotalPrice", pa.float64()),
+        ("Seats", pa.int64()),
+        ("Sales", pa.int64()),
+        ("EventDigest", pa.string()),
+    ]),
+    # Events whose transactions couldn't be fetched for this version (their last synced sales are kept)
+    "failed_events": pa.schema([
+        ("EventId", pa.int64()),
+        ("Fixture Name", pa.string()),
+        ("Error", pa.string()),
+    ]),
+    "recent_sales": pa.schema([(name, _FIELD_TYPES[name]) for name in [
+        "CreatedOn", "CreatedBy", "SaleLocation", "EventId", "Fixture Name", "EventCompetition",
+        "Package Name", "Seats", "Price", "TotalPrice",
+    ]]),
+    "inventory": pa.schema([
+        ("EventId", pa.int64()),
+        ("EventName", pa.string()),
+        ("KickOffEventStart", pa.timestamp("ns")),
+        ("EventCompetition", pa.string()),
+        ("Gender", pa.string()),
+        ("GoLiveDate", pa.timestamp("ns")),
+        ("PackageId", pa.int64()),
+        ("PackageName", pa.string()),
+        ("AvailableSeats", pa.float64()),
+        ("MaxSaleQuantity", pa.float64()),
+        ("Price", pa.float64()),
+        ("Capacity", pa.float64()),
+        ("Stock Available", pa.float64()),
+    ]),
+}
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT or value is pd.NA
+
+
+def _to_bool(value):
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    if isinstance(value, (int, np.integer)) and value in (0, 1):
+        return bool(value)
+    return None
+
+
+def _to_strings(column):
+    """Returns column as str values with None for missing ones; all-text columns skip the per-value str()."""
+    if pd.api.types.infer_dtype(column, skipna=True) in ("string", "empty"):
+        return column.astype(object).where(column.notna(), None)
+    return column.map(lambda value: None if _is_missing(value) else str(value))
+
+
+def conform(df, schema):
+    """
+    Returns df with exactly the schema's columns, in schema order, converted to its types.
+    Missing columns are added as nulls. Values of an integer column that aren't numbers
+    become <NA>, and how many there were is printed with the column name.
+
+    Columns already of the target dtype are passed through untouched, so conforming a
+    frame a second time (e.g. once at ingest and again when publishing) is cheap.
+    """
+    out = pd.DataFrame(index=df.index)
+    for field in schema:
+        name = field.name
+        column = df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+        if pa.types.is_timestamp(field.type):
+            if pd.api.types.is_datetime64_any_dtype(column):
+                out[name] = column
+            else:
+                out[name] = pd.to_datetime(column, format="mixed", errors="coerce")
+        elif pa.types.is_integer(field.type):
+            if column.dtype == "Int64":
+                out[name] = column
+                continue
+            numbers = pd.to_numeric(column, errors="coerce")
+            bad_values = int((numbers.isna() & column.notna() & (column.astype(str) != "")).sum())
+            if bad_values:
+                # One bad id from the API shouldn't fail the whole build; the rest of the column is kept
+                print(f"Column '{name}' has {bad_values} non-numeric value(s); stored as <NA> in {field.type}")
+            out[name] = numbers.round().astype("Int64")
+        elif pa.types.is_floating(field.type):
+            out[name] = column if column.dtype == "float64" else pd.to_numeric(column, errors="coerce").astype("float64")
+        elif pa.types.is_boolean(field.type):
+            out[name] = column if column.dtype == "boolean" else column.map(_to_bool).astype("boolean")
+        elif pa.types.is_dictionary(field.type):
+            if isinstance(column.dtype, pd.CategoricalDtype) and column.cat.categories.dtype == object:
+                out[name] = column
+            else:
+                out[name] = _to_strings(column).astype("category")
+        else:
+            out[name] = _to_strings(column)
+    return out.reset_index(drop=True)
+
+
+def concat_conformed(frames, schema):
+    """
+    Concatenates frames already conformed to schema into one conformed frame. Category
+    columns are unioned (pd.concat would turn differing categories into object columns),
+    with categories sorted as conform() makes them.
+    """
+    if not frames:
+        return conform(pd.DataFrame(), schema)
+    out = {}
+    for field in schema:
+        columns = [df[field.name] for df in frames]
+        if pa.types.is_dictionary(field.type):
+            out[field.name] = pd.Series(union_categoricals(columns, sort_categories=True))
+        else:
+            out[field.name] = pd.concat(columns, ignore_index=True)
+    return pd.DataFrame(out)
+
+
+def _dataset_dir(name):
+    return os.path.join(DATASET_DIR, name)
+
+
+def _manifest_path(name):
+    return os.path.join(_dataset_dir(name), "manifest.json")
+
+
+def publish(name, frames):
+    """
+    Writes a new version of dataset `name` (a dict of frame name -> DataFrame) as one
+    Parquet file per frame, then switches manifest.json to it atomically so readers
+    never see a half-written version. Returns (version, conformed frames).
+    """
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    version_dir = os.path.join(_dataset_dir(name), version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    conformed = {}
+    for frame_name, df in frames.items():
+        schema = SCHEMAS[frame_name]
+        conformed[frame_name] = conform(df, schema)
+        table = pa.Table.from_pandas(conformed[frame_name], schema=schema, preserve_index=False)
+        pq.write_table(table, os.path.join(version_dir, f"{frame_name}.parquet"))
+
+    manifest = {
+        "version": version,
+        "schema_version": SCHEMA_VERSION,
+        "published_at": time.time(),
+        "frames": {frame_name: len(df) for frame_name, df in conformed.items()},
+    }
+    tmp_path = f"{_manifest_path(name)}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, _manifest_path(name))
+
+    _prune_versions(name, keep=version)
+    return version, conformed
+
+
+def _prune_versions(name, keep):
+    versions = sorted(
+        entry for entry in os.listdir(_dataset_dir(name))
+        if os.path.isdir(os.path.join(_dataset_dir(name), entry))
+    )
+    for old in versions[:-KEEP_VERSIONS]:
+        if old != keep:
+            shutil.rmtree(os.path.join(_dataset_dir(name), old), ignore_errors=True)
+
+
+def read_manifest(name):
+    """Returns the manifest of the latest published version, or None if there is none."""
+    try:
+        with open(_manifest_path(name)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if manifest.get("schema_version") != SCHEMA_VERSION:
+        return None
+    return manifest
+
+
+def load(name, manifest=None):
+    """
+    Reads every frame of the latest (or the given) version of a dataset.
+    Integer columns come back as nullable Int64, booleans as nullable boolean and
+    dictionary columns as category.
+    """
+    manifest = manifest or read_manifest(name)
+    if manifest is None:
+        return None
+    version_dir = os.path.join(_dataset_dir(name), manifest["version"])
+    types_mapper = {pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}.get
+    return {
+        frame_name: pq.read_table(os.path.join(version_dir, f"{frame_name}.parquet")).to_pandas(types_mapper=types_mapper)
+        for frame_name in manifest["frames"]
+    }
+
+
+class SharedDataset:
+    """
+    Process-wide cache of one dataset, backed by the on-disk store.
+
+    get() serves the in-memory copy while it is younger than max_age. Otherwise it loads a
+    fresh enough version another process has published, and only as a last resort runs
+    build() and publishes the result. Concurrent callers wait for a single build. If a
+    build fails, the last good data (in memory or on disk) is served instead.
+
+    latest() never builds while anything is published, so pages stay fast while a
+    background refresher (see tjt_refresher) keeps the store up to date.
+
+    Which of the two pages call is set by TJT_REFRESH_MODE (tjt_refresher.read_dataset).
+    In the default "inline" mode every server process builds its own copy when it finds
+    the data stale; "background" or "worker" leaves the building to a single owner.
+    """
+
+    def __init__(self, name, build, max_age):
+        self.name = name
+        self.build = build
+        self.max_age = max_age
+        self.frames = None
+        self.version = None
+        self.loaded_at = None  # Wall-clock time the data was built
+        self._listeners = []
+        self._lock = threading.Lock()  # Held while building, so only one build runs at a time
+        self._load_lock = threading.Lock()  # Held while reading a published version into memory
+
+    def age(self):
+        """Seconds since the data being served was built, or None if nothing is loaded."""
+        return None if self.loaded_at is None else time.time() - self.loaded_at
+
+    def cache_key(self):
+        """
+        Identifies the data being served, for caching anything derived from it. Changes
+        whenever another version is loaded or built (including builds that failed to publish).
+        """
+        return (self.name, self.version, self.loaded_at)
+
+    def describe_age(self):
+        if self.loaded_at is None:
+            return "Data not loaded yet"
+        built = datetime.fromtimestamp(self.loaded_at).strftime("%H:%M:%S")
+        return f"Data as of {built} ({int(self.age())}s ago)"
+
+    def add_listener(self, callback):
+        """Calls callback() (from the loading thread) whenever another version is built or loaded."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _use(self, frames, version, loaded_at):
+        self.frames, self.version, self.loaded_at = frames, version, loaded_at
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"{self.name} listener failed: {e}")
+        return frames
+
+    def _load_published(self, manifest):
+        with self._load_lock:
+            if manifest["version"] != self.version:
+                self._use(load(self.name, manifest), manifest["version"], manifest["published_at"])
+            return self.frames
+
+    def get(self, max_age=None):
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            if self.frames is not None and self.age() < max_age:
+                return self.frames
+
+            manifest = read_manifest(self.name)
+            if manifest is not None and time.time() - manifest["published_at"] < max_age:
+                return self._load_published(manifest)
+
+            return self._build(manifest)
+
+    def latest(self):
+        """
+        Returns the latest published version, whatever its age, without building.
+        Only builds (through get()) if nothing has been published yet.
+        """
+        manifest = read_manifest(self.name)
+        if manifest is None:
+            return self.frames if self.frames is not None else self.get()
+        if manifest["version"] == self.version:
+            return self.frames
+        return self._load_published(manifest)
+
+    def refresh(self):
+        """Builds and publishes a new version now, waiting for any build already running."""
+        with self._lock:
+            return self._build(read_manifest(self.name))
+
+    def _build(self, manifest):
+        try:
+            frames = self.build()
+        except Exception as e:
+            if self.frames is not None:
+                print(f"Failed to refresh {self.name}, serving previous data: {e}")
+                return self.frames
+            if manifest is not None:
+                print(f"Failed to refresh {self.name}, serving published version {manifest['version']}: {e}")
+                return self._load_published(manifest)
+            raise
+
+        try:
+            version, frames = publish(self.name, frames)
+        except Exception as e:
+            print(f"Failed to publish {self.name} snapshot: {e}")
+            version = None
+        with self._load_lock:
+            return self._use(frames, version, time.time())
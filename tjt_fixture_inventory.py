@@ -0,0 +1,122 @@
+import pandas as pd
+
+# Packages never shown on the fixture pages
+EXCLUDED_PACKAGES = [
+    "INTERNAL MBM BOX",
+    "Woolwich Restaurant",
+    "AWFC Executive Box - Ticket Only",
+    "AWFC Executive Box - Ticket + F&B",
+    "AWFC Box Arsenal",
+]
+
+# Columns of each fixture's table, in display order
+TABLE_COLUMNS = ["Package Name", "Seats Available", "Seats Sold", "Seats Remaining", "Current Price"]
+
+
+def inventory_event_id(fixture_row):
+    """EventId whose inventory is shown for a fixture."""
+    if fixture_row["EventName"].strip().lower() == "arsenal v paris saint-germain":
+        # hard-code: only pull the semi-final match (EventId 88)
+        return 88
+    return fixture_row["EventId"]
+
+
+def seats_sold(sales_cube):
+    """
+    Seats sold per EventId, Fixture Name, EventCompetition and Package Name, from the
+    sales cube. Sales with any of those missing are left out, as they can't match a fixture.
+    """
+    keys = ["EventId", "Fixture Name", "EventCompetition", "Package Name"]
+    cube = sales_cube.cube.dropna(subset=keys)
+    sold = cube.groupby(keys, observed=True)["Seats"].sum().reset_index()
+    for name in keys[1:]:
+        sold[name] = sold[name].astype(object)
+    return sold.rename(columns={"Seats": "Seats Sold"})
+
+
+def build_tables(inventory_df, fixtures, sales_cube):
+    """
+    Computes every fixture's package table in one pass over the inventory: stock available
+    (boxes with no MaxSaleQuantity use their summed Capacity), seats sold, seats remaining
+    and current price, one row per package, most expensive first. Returns
+    {fixture EventId: DataFrame with TABLE_COLUMNS plus Price}.
+    """
+    keys = pd.DataFrame({
+        "Position": range(len(fixtures)),
+        "InventoryEventId": [inventory_event_id(row) for _, row in fixtures.iterrows()],
+        "FixtureEventId": fixtures["EventId"].to_numpy(),
+        "FixtureName": fixtures["EventName"].to_numpy(),
+        "FixtureCompetition": [row.get("EventCompetition", "") for _, row in fixtures.iterrows()],
+    })
+    rows = inventory_df.assign(InventoryOrder=range(len(inventory_df))).merge(
+        keys, left_on="EventId", right_on="InventoryEventId"
+    )
+
+    rows["MaxSaleQuantity"] = pd.to_numeric(rows["MaxSaleQuantity"], errors="coerce").fillna(0).astype(int)
+    rows["Capacity"] = pd.to_numeric(rows["Capacity"], errors="coerce").fillna(0).astype(int)
+
+    # Boxes sold by capacity: when none of a box package's rows has a MaxSaleQuantity, offer its whole capacity
+    package_totals = rows.groupby(["Position", "PackageName"])[["MaxSaleQuantity", "Capacity"]].transform("sum")
+    is_box = rows["PackageName"].str.contains("Box", case=False, na=False)
+    rows["Stock Available"] = rows["MaxSaleQuantity"].where(
+        ~(is_box & (package_totals["MaxSaleQuantity"] == 0)), package_totals["Capacity"]
+    ).astype(int)
+
+    rows["Price"] = pd.to_numeric(rows["Price"], errors="coerce").fillna(0)
+
+    rows = rows.merge(
+        seats_sold(sales_cube),
+        how="left",
+        left_on=["FixtureEventId", "FixtureName", "FixtureCompetition", "PackageName"],
+        right_on=["EventId", "Fixture Name", "EventCompetition", "Package Name"],
+        suffixes=("", "_sold"),
+    )
+    rows["Seats Sold"] = pd.to_numeric(rows["Seats Sold"], errors="coerce").fillna(0).astype(int)
+    rows["Seats Remaining"] = (rows["Stock Available"] - rows["Seats Sold"]).clip(lower=0)
+    rows["Current Price"] = rows["Price"].map(lambda x: f"£{x:,.2f}")
+
+    rows["Package Name"] = rows["PackageName"].str.strip()
+    rows = rows[~rows["Package Name"].isin(EXCLUDED_PACKAGES)]
+    rows = rows.rename(columns={"Stock Available": "Seats Available"})
+
+    columns = TABLE_COLUMNS + ["Price"]
+    tables = {}
+    for position, table in rows.sort_values("InventoryOrder").groupby("Position"):
+        # Keep the most expensive row per package. Sorted per fixture, from inventory order, so
+        # packages with equal prices come out in the same order as they always have
+        table = table.sort_values(by="Price", ascending=False).drop_duplicates(subset=["Package Name"], keep="first")
+        tables[position] = table[columns].reset_index(drop=True)
+    return {
+        fixture_id: tables.get(position, pd.DataFrame(columns=columns))
+        for position, fixture_id in enumerate(keys["FixtureEventId"])
+    }
+
+
+class FixtureInventory:
+    """
+    Package tables of the upcoming fixtures for one version of the inventory and sales
+    data, computed once so each fixture page is a dictionary lookup by EventId.
+    """
+
+    def __init__(self, fixtures, tables):
+        self.fixtures = fixtures
+        self.tables = tables
+
+    @classmethod
+    def build(cls, inventory_df, fixtures, sales_cube):
+        """
+        fixtures are the upcoming fixtures' inventory rows (EventId, EventName,
+        EventCompetition). Without a MaxSaleQuantity column no tables are built.
+        """
+        fixtures = fixtures.reset_index(drop=True)
+        if "MaxSaleQuantity" not in inventory_df.columns or fixtures.empty:
+            return cls(fixtures, {})
+        return cls(fixtures, build_tables(inventory_df, fixtures, sales_cube))
+
+    def fixture(self, position):
+        """The fixture at position (0 = soonest), or None if there are fewer fixtures."""
+        return self.fixtures.iloc[position] if position < len(self.fixtures) else None
+
+    def table(self, event_id):
+        """The package table of a fixture, or None if the inventory has no stock data."""
+        return self.tables.get(event_id)
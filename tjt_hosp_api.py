@@ -1,284 +1,380 @@
-import requests
-import json
-import pandas as pd 
-from datetime import datetime, timedelta
-
-# OAuth2 endpoint and credentials
-token_url = 'https://www.tjhub3.com/export_arsenal/token'
-Username = 'hospitality'
-Password = 'OkMessageSectionType000!'
-grant_type = 'password'
-
-# Global variable for storing token expiry time
-token_expiry_time = None
-
-def get_access_token():
-    global token_expiry_time
-    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-    data = {
-        'Username': Username,
-        'Password': Password,
-        'grant_type': grant_type
-    }
-    response = requests.post(token_url, headers=headers, data=data, verify=True)
-    if response.status_code == 200:
-        token_data = response.json()
-        access_token = token_data.get('access_token')
-        expires_in = token_data.get('expires_in', 3600)  # Assuming 1 hour default if not provided
-        token_expiry_time = datetime.now() + timedelta(seconds=expires_in)
-        return access_token
-    else:
-        print(f"Failed to retrieve access token: {response.status_code} - {response.text}")
-        return None
-
-def refresh_token_if_needed():
-    global token_expiry_time, access_token
-    if token_expiry_time is None or datetime.now() >= token_expiry_time:
-        access_token = get_access_token()
-
-# Initial token retrieval
-access_token = get_access_token()
-
-# Set up the headers with the access token
-headers = {
-    'Authorization': f'Bearer {access_token}',
-    'Content-Type': 'application/json'
-}
+import os
+import hashlib
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from tjt_auth import TJT_BASE_URL
+from tjt_http import shared_client, TJTRequestError, ijson
+from tjt_catalog import accounts_catalog, events_catalog, NOT_MODIFIED
+from tjt_transforms import expand_seats, select_sales_columns
+from tjt_sales_cube import SalesCube, update_cube, recent_sales
+from tjt_snapshots import submit_snapshot, WRITE_SNAPSHOTS
+from tjt_dataset_store import SharedDataset, SCHEMAS, conform, concat_conformed
+from tjt_refresher import refresher, read_dataset
+from tjt_sync_store import TransactionStore, DEFAULT_STORE_PATH, payload_hash
+
+# TJT endpoint refreshed on every run; Accounts/List and Events/List come from the catalogs in tjt_catalog
+transactions_url_template = f"{TJT_BASE_URL}/HospitalitySaleTransactions/List?EventId={{}}"
+
+# Maximum number of events whose transactions are fetched at the same time (Step 4)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("TJT_MAX_CONCURRENT_REQUESTS", "8"))
+
+# "delta" revalidates each event with its ETag and reuses the sales of unchanged events; "full" rebuilds everything
+SYNC_MODE = os.getenv("TJT_SYNC_MODE", "delta")
+SYNC_STORE_PATH = os.getenv("TJT_SYNC_STORE", DEFAULT_STORE_PATH)
+
+# Seconds a loaded dataset is served to every caller before it is fetched again
+DEFAULT_MAX_AGE = int(os.getenv("TJT_MAX_AGE", "60"))
+
+# Transaction fields read by the merge, seat expansion and sales columns; others are dropped while decoding
+TRANSACTION_FIELDS = [
+    "Id", "EventId", "Name", "Type", "PackageId", "GuestId", "Seats", "CRCCode", "Price", "Discount",
+    "DiscountValue", "IsPaid", "TotalPrice", "CreatedOn", "PaymentTime", "CreatedBy", "GLCode", "SaleLocation",
+    "Locations", "TMSessionId", "KickOffEventStart", "EventCategory", "EventCompetition",
+]
 
 # Step 1: Retrieve the list of accounts (Guests)
-refresh_token_if_needed()
-accounts_url = "https://www.tjhub3.com/export_arsenal/Accounts/List"
-response = requests.get(accounts_url, headers=headers)
-
-if response.status_code == 200:
-    accounts_data = response.json().get('Data', {}).get('Guests', [])
-    # Create a DataFrame for accounts to merge later
-    accounts_df = pd.DataFrame(accounts_data)
-else:
-    print(f"Failed to retrieve accounts list: {response.status_code} - {response.text}")
-    accounts_df = pd.DataFrame()
+def fetch_accounts():
+    """
+    Returns the accounts DataFrame from the long-TTL accounts catalog (see tjt_catalog).
+    Raises TJTRequestError if they can't be fetched and nothing is cached, since merging
+    without them would blank every guest field.
+    """
+    return accounts_catalog.get()
+
+def build_guest_index(accounts_df):
+    """
+    Indexes the accounts by GuestId (first record wins) so guests are looked up per
+    transaction in constant time instead of scanning accounts_df for every transaction.
+    """
+    if 'GuestId' not in accounts_df.columns:
+        return {}
+    return (
+        accounts_df[accounts_df['GuestId'].notna()]
+        .drop_duplicates(subset='GuestId', keep='first')
+        .set_index('GuestId', drop=False)
+        .to_dict(orient='index')
+    )
 
 # Step 2: Retrieve the list of events
-refresh_token_if_needed()
-event_list_url = "https://www.tjhub3.com/export_arsenal/Events/List"
-response = requests.get(event_list_url, headers=headers)
-
-if response.status_code == 200:
-    events_data = response.json()
-    event_list = events_data.get('Data', {}).get('Events', [])
-else:
-    print(f"Failed to retrieve event list: {response.status_code} - {response.text}")
-    event_list = []
-
-# Step 3: Initialize an empty list to hold the merged data
-merged_data = []
-
-# Step 4: Retrieve transaction data for each event and merge with event details
-for event in event_list:
-    event_id = event['Id']
+def fetch_events():
+    """
+    Returns the event list from the events catalog shared with tjt_inventory.
+    Raises TJTRequestError if it can't be fetched and nothing is cached.
+    """
+    return events_catalog.get()
+
+# Step 4: Retrieve transaction data for each event
+def download_event_transactions(event, etag=None):
+    """
+    Fetches the HospitalitySaleTransactions for a single event. Returns (transactions, ETag,
+    body digest), or NOT_MODIFIED if TJT answered 304 to etag. The body digest is a SHA-256
+    of the response bytes, taken while they are decoded.
+    Raises TJTRequestError if the request still fails after retries.
+    """
+    url = transactions_url_template.format(event['Id'])
+    headers = {"If-None-Match": etag} if etag else None
+    response = shared_client().request("GET", url, headers=headers, stream=ijson is not None)
+    if response.status_code == 304:
+        response.close()
+        return NOT_MODIFIED
+
+    body = hashlib.sha256()
+    transactions = list(shared_client().iter_response_items(
+        response, "Data.HospitalitySaleTransactions.item", fields=TRANSACTION_FIELDS, digest=body,
+    ))
+    return transactions, response.headers.get("ETag"), body.hexdigest()
+
+def fetch_event_transactions(event):
+    """
+    Fetches the HospitalitySaleTransactions for a single event.
+    Raises TJTRequestError if the request still fails after retries.
+    """
+    return download_event_transactions(event)[0]
+
+def fetch_all_transactions(event_list, store=None):
+    """
+    Fetches every event's transactions concurrently, revalidating events held in store
+    with their ETag. Returns (payloads, failures): payloads is in event_list order, each
+    the result of download_event_transactions or None if the fetch failed, and failures
+    lists {"EventId", "Fixture Name", "Error"} for each failed event.
+    """
+    def fetch(event):
+        try:
+            etag = store.etag(event['Id']) if store is not None else None
+            return download_event_transactions(event, etag), None
+        except TJTRequestError as e:
+            return None, {"EventId": event['Id'], "Fixture Name": event.get('Name'), "Error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, MAX_CONCURRENT_REQUESTS)) as executor:
+        results = list(executor.map(fetch, event_list))
+    return [payload for payload, _ in results], [failure for _, failure in results if failure]
+
+def merge_event_transactions(event, transactions_data, guest_index):
+    """
+    Merges one event's transactions with the event details and the guest's account details.
+    """
     fixture_name = event['Name']  # Renamed as Fixture Name
-
-    refresh_token_if_needed()
-    transaction_url = f"https://www.tjhub3.com/export_arsenal/HospitalitySaleTransactions/List?EventId={event_id}"
-    response = requests.get(transaction_url, headers=headers)
-
-    if response.status_code == 200:
-        transactions_data = response.json().get('Data', {}).get('HospitalitySaleTransactions', [])
-
-        for transaction in transactions_data:
-            # Merge event details with transaction data
-            merged_record = {"Fixture Name": fixture_name, **event, **transaction}
-
-            # Merge with Accounts data based on GuestId
-            guest_info = accounts_df[accounts_df['GuestId'] == transaction.get('GuestId')].to_dict(orient='records')
-            if guest_info:
-                merged_record.update({
-                    "First Name": guest_info[0].get("FirstName", ""),
-                    "Surname": guest_info[0].get("Surname", ""),
-                    "Email": guest_info[0].get("Email", ""),
-                    "Country Code": guest_info[0].get("CountryCode", ""),
-                    "PostCode": guest_info[0].get("PostCode", ""),
-                     "City": guest_info[0].get("City", ""),
-                    "CompanyName": guest_info[0].get("CompanyName", ""),
-                    "DOB": guest_info[0].get("DOB", ""),
-                    "GuestId": guest_info[0].get("GuestId", ""),
-                    "Status": guest_info[0].get("Status", ""),
-                    "IsSeasonal": guest_info[0].get("IsSeasonal", ""),
-                })
-            
-            merged_data.append(merged_record)
-    else:
-        print(f"Failed to retrieve transactions for EventId {event_id}: {response.status_code} - {response.text}")
-
-# Step 5: Convert the merged data into a DataFrame
-df = pd.DataFrame(merged_data)
-
-# Step 6: Save the initial merged DataFrame
-df.to_excel('merged_events_transactions1.xlsx', index=False)
-print('initial_merged_events_transactions_with_accounts.csv saved to folder')
-
-
-# Helper function to parse datetime with varying precision
-from datetime import datetime
-
-
-from dateutil import parser
-
-def parse_datetime(date_str):
-    if date_str is None:
-        return None  # Return None if input is None
-    
-    try:
-        dt = parser.parse(date_str)  # Auto-detects format
-        return dt.strftime("%d-%m-%Y %H:%M")
-    except Exception:
-        return date_str  # Return original if parsing fails
-
-
-
-final_data = []
-
-for _, row in df.iterrows():
-    if row['TMSessionId']:
-        tm_session_data = json.loads(row['TMSessionId'])
-        seats = tm_session_data.get('Seats', [])
-        
-        # Extract LocationName from Locations if it's a list of dictionaries
-        if isinstance(row.get('Locations'), list) and row['Locations']:
-            location_info = row['Locations'][0]
-            location_name = location_info.get('LocationName', '')
-            location_order_id = location_info.get('Id')  # Extract the Order Id from the location
+    event_records = []
+
+    for transaction in transactions_data:
+        # Merge event details with transaction data
+        merged_record = {"Fixture Name": fixture_name, **event, **transaction}
+
+        # Merge with Accounts data based on GuestId
+        guest_info = guest_index.get(transaction.get('GuestId'))
+        if guest_info:
+            merged_record.update({
+                "First Name": guest_info.get("FirstName", ""),
+                "Surname": guest_info.get("Surname", ""),
+                "Email": guest_info.get("Email", ""),
+                "Country Code": guest_info.get("CountryCode", ""),
+                "PostCode": guest_info.get("PostCode", ""),
+                "City": guest_info.get("City", ""),
+                "CompanyName": guest_info.get("CompanyName", ""),
+                "DOB": guest_info.get("DOB", ""),
+                "GuestId": guest_info.get("GuestId", ""),
+                "Status": guest_info.get("Status", ""),
+                "IsSeasonal": guest_info.get("IsSeasonal", ""),
+            })
+
+        event_records.append(merged_record)
+
+    return event_records
+
+def build_guest_hashes(accounts_df):
+    """
+    Hashes each account row by GuestId (first record wins, as in build_guest_index), once
+    per accounts catalog version, so an event's guests can be fingerprinted without
+    re-encoding their rows.
+    """
+    if 'GuestId' not in accounts_df.columns:
+        return {}
+    guests = accounts_df[accounts_df['GuestId'].notna()].drop_duplicates(subset='GuestId', keep='first')
+    return dict(zip(guests['GuestId'], pd.util.hash_pandas_object(guests, index=False).tolist()))
+
+def event_digest(event, body_digest, guest_ids, guest_hashes):
+    """
+    Hashes everything an event's sales are built from: the event, its transactions
+    (by the digest of their response body) and the account rows of their guests.
+    """
+    guest_rows = [[str(guest_id), guest_hashes[guest_id]] for guest_id in guest_ids if guest_id in guest_hashes]
+    return payload_hash(event, body_digest, guest_rows)
+
+def build_sales_frames(event, transactions_data, guest_index):
+    """
+    Runs Steps 5-9 over one event's transactions: merges them, expands seats, selects the
+    with-seats and without-seats views and conforms them to their schemas. Returns
+    (filtered_df_with_seats, filtered_df_without_seats) for the event.
+    """
+    # Step 5: Convert the merged data into a DataFrame
+    df = pd.DataFrame(merge_event_transactions(event, transactions_data, guest_index))
+
+    # Step 7: Expand orders into one row per seat (TMSessionId) and tidy the order-level fields
+    final_df = expand_seats(df)
+
+    # Step 8/9: Select the with-seats and without-seats views of the data. Their keys start
+    # with EventId, so de-duplicating per event matches doing it over the whole season.
+    filtered_df_with_seats, filtered_df_without_seats = select_sales_columns(final_df)
+
+    # Apply the declared schema once here (ints, floats, bools, categories for repeated names)
+    return (
+        conform(filtered_df_with_seats, SCHEMAS["filtered_df_with_seats"]),
+        conform(filtered_df_without_seats, SCHEMAS["filtered_df_without_seats"]),
+    )
+
+_sync_store = None
+
+def sync_store():
+    """The delta sync store, loaded from SYNC_STORE_PATH once and kept for the life of the process."""
+    global _sync_store
+    if _sync_store is None:
+        _sync_store = TransactionStore(SYNC_STORE_PATH)
+    return _sync_store
+
+def sync_transactions(event_list, payloads, guest_index, guest_hashes, store=None):
+    """
+    Builds every event's sales frames (see build_sales_frames). With a store (delta sync
+    mode), events whose digest matches the store reuse their cached frames, and events
+    TJT reported unchanged (304) are rebuilt from their stored transactions only if their
+    event details or guests changed. The store is written only if something changed.
+
+    Returns (frames per event, {EventId: digest}); the digests let the sales cube
+    re-aggregate only changed events and are empty in full sync mode.
+    """
+    event_frames = []
+    event_digests = {}
+    events_reused = 0
+
+    for event, payload in zip(event_list, payloads):
+        event_id = event['Id']
+        if store is None:
+            if payload is not None:
+                event_frames.append(build_sales_frames(event, payload[0], guest_index))
+            continue
+
+        downloaded = payload is not None and payload is not NOT_MODIFIED
+        if downloaded:
+            transactions_data, etag, body = payload
+            guest_ids = sorted({transaction.get('GuestId') for transaction in transactions_data} - {None}, key=str)
+        elif event_id in store:
+            # Unchanged (304), or the fetch failed: keep the last synced transactions rather than dropping its sales
+            transactions_data = None
+            etag, body, guest_ids = store.etag(event_id), store.body_digest(event_id), store.guest_ids(event_id)
         else:
-            location_name = ''
-            location_order_id = None
-
-        # Handle the extraction of the Package Name, especially for 'Platinum' under 'Seasonal Membership'
-        package_name = row.get('Name')
-        if row.get('Type') == 'Seasonal Membership' and 'Platinum' in row.get('Name', ''):
-            package_name = 'Platinum'
-        
-        for seat in seats:
-            seat_record = {
-                "Order Id": row["Id"],  # Use Location Id if available, otherwise use row Id
-                "EventId": row.get("EventId"),
-                "First Name": row.get("First Name"),
-                "Surname": row.get("Surname"),
-                "CompanyName": row.get("CompanyName"),
-                "DOB": row.get("DOB"),
-                "Email": row.get("Email"),
-                "IsSeasonal": row.get("IsSeasonal"),
-                "Country Code": row.get("Country Code"),
-                "PostCode": row.get("PostCode"),
-                "City": row.get("City"),
-                "Status": row.get("Status"),
-                "GLCode": row.get("GLCode"),
-                "PackageId": row.get("PackageId"),
-                "GuestId": row.get("GuestId"),
-                "CRCCode": row.get("CRCCode"),
-                "Fixture Name": row["Fixture Name"],
-                "EventCategory": row.get("EventCategory"),
-                "EventCompetition": row.get("EventCompetition"),
-                "Type": row.get("Type"),
-                "KickOffEventStart": parse_datetime(row.get("KickOffEventStart")),
-                "Package Name": package_name,  # Use the updated logic for Package Name
-                "LocationName": location_name,  # Adding the LocationName
-                "Price": row.get("Price"),
-                "Seats": row.get("Seats", seat.get("Seats")),
-                "PriceBandName": seat.get("PriceBandName"),
-                "Row": seat.get("Row"),
-                "Seat Number": seat.get("Number"),
-                "AreaName": seat.get("AreaName"),
-                "BlockId": seat.get("BlockId"),
-                "Discount": row.get("Discount"),
-                "DiscountValue": row.get("DiscountValue"),
-                "IsPaid": row.get("IsPaid"),
-                "TotalPrice": row.get("TotalPrice"),
-                "CreatedOn": parse_datetime(row.get("CreatedOn")),
-                "PaymentTime": parse_datetime(row.get("PaymentTime")),
-                "CreatedBy": row.get("CreatedBy"),
-                "SaleLocation": row.get("SaleLocation"),
-            }
-            
-            final_data.append(seat_record)
-    else:
-        # Handle the scenario where there is no TMSessionId
-        if isinstance(row.get('Locations'), list) and row['Locations']:
-            row['LocationName'] = row['Locations'][0].get('LocationName', '')
-            row['Order Id'] = row['Locations'][0].get('Id') or row["Id"]  # Use Location Id if available
+            continue
+
+        digest = event_digest(event, body, guest_ids, guest_hashes)
+        event_digests[event_id] = digest
+        if not store.is_current(event_id, digest) or (downloaded and store.etag(event_id) != etag):
+            if transactions_data is None:
+                transactions_data = store.get_transactions(event_id)
+            store.update(event_id, digest, etag, body, guest_ids, transactions_data)
+
+        frames = store.get_frames(event_id, digest)
+        if frames is None:
+            if transactions_data is None:
+                transactions_data = store.get_transactions(event_id)
+            frames = build_sales_frames(event, transactions_data, guest_index)
+            store.set_frames(event_id, digest, frames)
         else:
-            row['LocationName'] = ''
-            row['Order Id'] = row["Id"]
-
-        # Handle the extraction of the Package Name for rows without TMSessionId
-        if row.get('Type') == 'Seasonal Membership' and 'Platinum' in row.get('Name', ''):
-            row['Package Name'] = 'Platinum'
+            events_reused += 1
+        event_frames.append(frames)
+
+    if store is not None:
+        store.prune([event['Id'] for event in event_list])
+        store.save()
+        print(f"Delta sync: reused {events_reused} of {len(event_list)} events")
+
+    return event_frames, event_digests
+
+def merged_transactions_frame(event_list, guest_index, store):
+    """Returns the merged records of every event in the store as one DataFrame, for the snapshot export."""
+    return pd.DataFrame([
+        record
+        for event in event_list if event['Id'] in store
+        for record in merge_event_transactions(event, store.get_transactions(event['Id']), guest_index)
+    ])
+
+def report_failed_events(failures):
+    """Prints one line per event whose fetch failed ({"EventId", "Fixture Name", "Error"})."""
+    if failures:
+        print(f"Failed to retrieve transactions for {len(failures)} event(s); their last synced records are kept:")
+        for failure in failures:
+            print(f"  EventId {failure['EventId']} ({failure['Fixture Name']}): {failure['Error']}")
+
+def run_pipeline():
+    """
+    Runs the full TJT ingest once and returns a dict with filtered_df_with_seats,
+    filtered_df_without_seats, sales_cube, recent_sales and failed_events.
+    """
+    # Accounts come from their long-TTL catalog; the index is rebuilt only when they actually change
+    guest_index = accounts_catalog.derive("guest_index", build_guest_index)
+    guest_hashes = accounts_catalog.derive("guest_hashes", build_guest_hashes)
+    event_list = fetch_events()
+    store = sync_store() if SYNC_MODE == "delta" else None
+    payloads, failures = fetch_all_transactions(event_list, store)
+    report_failed_events(failures)
+
+    # Steps 5-9 per event, reusing the frames of unchanged events
+    event_frames, event_digests = sync_transactions(event_list, payloads, guest_index, guest_hashes, store)
+    filtered_df_with_seats = concat_conformed([frames[0] for frames in event_frames], SCHEMAS["filtered_df_with_seats"])
+    filtered_df_without_seats = concat_conformed([frames[1] for frames in event_frames], SCHEMAS["filtered_df_without_seats"])
+    print(f"Loaded {len(filtered_df_without_seats)} hospitality sales rows")
+
+    # Step 9b: Keep the leaderboards' aggregate cube up to date, re-aggregating only changed events
+    previous_cube = (sales_dataset.frames or {}).get("sales_cube")
+    sales_cube = update_cube(previous_cube, filtered_df_without_seats, event_digests)
+    sales_cube = conform(sales_cube, SCHEMAS["sales_cube"])
+
+    # Step 10: Optional exports run on a background thread (TJT_WRITE_SNAPSHOTS=1), never on the request path
+    if WRITE_SNAPSHOTS:
+        if store is not None:
+            merged_df = merged_transactions_frame(event_list, guest_index, store)
         else:
-            row['Package Name'] = row.get('Name')
-
-        # Convert date strings to desired format
-        row['CreatedOn'] = parse_datetime(row.get("CreatedOn"))
-        row['KickOffEventStart'] = parse_datetime(row.get("KickOffEventStart"))
-        
-        # Append the transaction without seat details
-        final_data.append(row)
-
-# Step 8: Convert final_data to a DataFrame
-final_df = pd.DataFrame(final_data)
-
-# Step 9: Filter the DataFrame to include only the desired columns
-filtered_columns_without_seat_data = [
-    "Order Id", "KickOffEventStart", "EventCategory", "EventCompetition", "Fixture Name","Type", "Package Name", "LocationName", "PackageId", "EventId", "GuestId",
-    "Seats", "CRCCode", "Price", "Discount","DiscountValue", "IsPaid", "PaymentTime", "CreatedOn", "CreatedBy", "TotalPrice", "GLCode", "SaleLocation","DiscountValue",
-    "IsPaid", "PaymentTime", "CreatedOn", "CreatedBy", "TotalPrice", "GLCode", "SaleLocation", "CompanyName", "DOB",
-    "GuestId", "Status", "IsSeasonal","First Name", "Surname", "Email", "Country Code", "PostCode", "City"
-]
-
-filtered_columns_with_seat_data = [
-    "Order Id", "KickOffEventStart", "EventCategory", "EventCompetition", "Fixture Name", "Type", "Package Name", "LocationName","PackageId", "EventId", "GuestId",
-    "Seats", "AreaName", "PriceBandName", "Seat Number", "Row", "BlockId", "CRCCode", "Price", "Discount",
-    "DiscountValue", "IsPaid", "PaymentTime", "CreatedOn", "CreatedBy", "TotalPrice", "GLCode", "SaleLocation",
-    "First Name", "Surname", "Email", "Country Code", "PostCode"
-]
-
-# Ensure that you are only selecting columns that exist in the final DataFrame
-filtered_columns_without_seats = [col for col in final_df.columns if col in filtered_columns_without_seat_data]
-
-# Filter the DataFrame based on the filtered columns
-filtered_df_without_seats = final_df[filtered_columns_without_seats].drop_duplicates()
-
-# Print the type to confirm it's a DataFrame
-print(type(filtered_df_without_seats))  # This will print <class 'pandas.core.frame.DataFrame'>
-
-# If you want to print the first 5 rows of the DataFrame, use:
-
-print(filtered_df_without_seats.head(5))
-
-# # Save the filtered DataFrames into separate tabs of an Excel file
-with pd.ExcelWriter('filtered_hosp_data2.xlsx') as writer:
-    filtered_df_without_seats.to_excel(writer, sheet_name='Without seating information', index=False)
-    print(f'filtered_hosp_data1 saved')
-    
-
-
-
-# # Only select columns that exist in the DataFrame
-# filtered_columns_without_seats = [col for col in final_df.columns if col in filtered_columns_without_seat_data]
-# filtered_df_without_seats = final_df[filtered_columns_without_seats].drop_duplicates()
-
-# # Convert filtered_columns_without_seat_data to a DataFrame if it's a list
-# if isinstance(filtered_columns_without_seat_data, list):
-#     filtered_columns_without_seat_data = pd.DataFrame(filtered_columns_without_seat_data)
-
-# # Only select columns that exist in the DataFrame
-# filtered_columns_without_seats = [col for col in final_df.columns if col in filtered_columns_without_seat_data.columns]
-# filtered_df_without_seats = final_df[filtered_columns_without_seats].drop_duplicates()
-
-
-# # Only select columns that exist in the DataFrame
-# filtered_columns_with_seats = [col for col in final_df.columns if col in filtered_columns_with_seat_data]
-# filtered_df_with_seats = final_df[filtered_columns_with_seats]
+            merged_df = pd.DataFrame([
+                record
+                for event, payload in zip(event_list, payloads) if payload is not None
+                for record in merge_event_transactions(event, payload[0], guest_index)
+            ])
+        submit_snapshot({
+            "merged_events_transactions": merged_df,
+            "filtered_hosp_data": filtered_df_without_seats,
+        })
+
+    return {
+        "filtered_df_with_seats": filtered_df_with_seats,
+        "filtered_df_without_seats": filtered_df_without_seats,
+        "sales_cube": sales_cube,
+        "recent_sales": conform(recent_sales(filtered_df_without_seats), SCHEMAS["recent_sales"]),
+        # Published with the data, so every process serving this version can report them
+        "failed_events": conform(pd.DataFrame(failures, columns=["EventId", "Fixture Name", "Error"]), SCHEMAS["failed_events"]),
+    }
 
-# # Save the filtered DataFrames into separate tabs of an Excel file
-# with pd.ExcelWriter('filtered_hosp_data.xlsx') as writer:
-#     filtered_df_without_seats.to_excel(writer, sheet_name='Without seat data', index=False)
-#     filtered_df_with_seats.to_excel(writer, sheet_name='With seat data', index=False)
+# Process-wide cache shared by every Streamlit session and rerun, backed by the
+# versioned Parquet store so a restarted server (or another worker) starts warm
+sales_dataset = SharedDataset("sales", run_pipeline, DEFAULT_MAX_AGE)
+refresher.register(sales_dataset)
+
+def load_hospitality_frames(max_age=DEFAULT_MAX_AGE):
+    """
+    Returns the pipeline output, re-running the pipeline only if both the in-memory copy
+    and the latest published snapshot are older than max_age seconds (max_age=0 forces a
+    refresh). Concurrent callers wait for one fetch instead of each starting their own.
+    If a refresh fails, the last good data is kept.
+
+    That is the default TJT_REFRESH_MODE=inline, where each server process fetches for
+    itself. With TJT_REFRESH_MODE=background or worker, one refresher owns the dataset and
+    pages never fetch: they get the latest published version and
+    sales_dataset.describe_age() says how old it is.
+    """
+    return read_dataset(sales_dataset, max_age)
+
+def load_hospitality_sales(max_age=DEFAULT_MAX_AGE):
+    """
+    Returns a copy of filtered_df_without_seats from the process-wide cache,
+    so callers can add or convert columns without affecting other sessions.
+    """
+    return load_hospitality_frames(max_age)["filtered_df_without_seats"].copy()
+
+def failed_events():
+    """
+    Events whose transactions couldn't be fetched for the sales version being served, as
+    [{"EventId", "Fixture Name", "Error"}]. Empty until data is loaded.
+    """
+    frames = sales_dataset.frames or {}
+    failures = frames.get("failed_events")
+    return [] if failures is None else failures.to_dict("records")
+
+_sales_cube = None
+
+def _cube_for(frames):
+    global _sales_cube
+    if _sales_cube is None or _sales_cube.cube is not frames["sales_cube"]:
+        # When the data was built; unknown if a newer version was loaded in the meantime
+        built_at = sales_dataset.loaded_at if sales_dataset.frames is frames else None
+        _sales_cube = SalesCube(frames["sales_cube"], frames["recent_sales"], built_at)
+    return _sales_cube
+
+def load_sales_cube(max_age=DEFAULT_MAX_AGE):
+    """
+    Returns a SalesCube over the current dataset version (see tjt_sales_cube). The same
+    object, with its memoized query results, is returned until a new version is loaded.
+    """
+    return _cube_for(load_hospitality_frames(max_age))
+
+def loaded_sales_cube():
+    """
+    load_sales_cube() over the version already in memory, or None if nothing is loaded.
+    Never reads the dataset store or builds, so background threads can call it freely.
+    """
+    frames = sales_dataset.frames
+    return None if frames is None else _cube_for(frames)
+
+def __getattr__(name):
+    # Keeps `from tjt_hosp_api import filtered_df_without_seats` working, served from the cache
+    if name in ("filtered_df_with_seats", "filtered_df_without_seats"):
+        return load_hospitality_frames()[name].copy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+if __name__ == "__main__":
+    print(load_hospitality_sales().head(5))
@@ -0,0 +1,181 @@
+import os
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+try:
+    import ijson
+except ImportError:
+    ijson = None  # stream_items() falls back to decoding the whole body
+
+# Connect and read timeouts (seconds) applied to every TJT request
+CONNECT_TIMEOUT = float(os.getenv("TJT_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("TJT_READ_TIMEOUT", "60"))
+
+# Retries after the first attempt, for connection errors, timeouts and RETRY_STATUSES
+MAX_RETRIES = int(os.getenv("TJT_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("TJT_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.getenv("TJT_BACKOFF_CAP", "10"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Keep-alive connections kept open per host; at least the number of concurrent fetches
+POOL_SIZE = int(os.getenv("TJT_HTTP_POOL_SIZE", "16"))
+
+
+class TJTRequestError(Exception):
+    """A TJT request that still failed after all retries."""
+
+    def __init__(self, url, status=None, message=""):
+        self.url = url
+        self.status = status
+        self.message = message
+        super().__init__(f"{status or 'no response'} from {url}: {message}")
+
+
+class TJTClient:
+    """
+    Pooled HTTP client for the TJT API. One requests.Session keeps connections alive
+    across calls and threads. Responses are gzip-compressed when the server supports it.
+    Every request has a timeout.
+
+    Connection errors, timeouts, 429 and 5xx responses are retried up to max_retries
+    times with full-jitter exponential backoff, honouring Retry-After. A 401 renews the
+    bearer token once. Anything still failing raises TJTRequestError.
+    """
+
+    def __init__(self, token_provider=None, pool_size=POOL_SIZE, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_cap=BACKOFF_CAP):
+        self.token_provider = token_provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass  # An HTTP-date; fall back to our own schedule
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def request(self, method, url, headers=None, auth=True, **kwargs):
+        """Returns the successful (2xx) response, or raises TJTRequestError."""
+        kwargs.setdefault("timeout", self.timeout)
+        renewed_token = False
+        attempt = 0
+
+        while True:
+            request_headers = dict(headers or {})
+            if auth and self.token_provider is not None:
+                request_headers["Authorization"] = f"Bearer {self.token_provider.get_token()}"
+
+            try:
+                response = self.session.request(method, url, headers=request_headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt < self.max_retries:
+                    time.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                raise TJTRequestError(url, None, str(e)) from e
+
+            if response.status_code == 401 and auth and self.token_provider is not None and not renewed_token:
+                # The token was revoked or expired early: renew it once and try again
+                response.close()  # Hands a streamed connection back to the pool
+                self.token_provider.invalidate()
+                renewed_token = True
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                response.close()
+                time.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                attempt += 1
+                continue
+
+            if not response.ok:
+                with response:
+                    raise TJTRequestError(url, response.status_code, response.text[:200])
+            return response
+
+    def get_json(self, url, **kwargs):
+        return self.request("GET", url, **kwargs).json()
+
+    def stream_items(self, url, prefix, fields=None, **kwargs):
+        """
+        Yields the elements of the JSON array at prefix (ijson notation, e.g.
+        "Data.Guests.item") one at a time, decoding the body as it arrives, so neither
+        the raw body nor the whole parsed list is ever held in memory.
+
+        With fields, each element is cut down to those keys. The yielded dicts then share
+        the key strings in fields instead of each holding its own copies.
+        """
+        response = self.request("GET", url, stream=ijson is not None, **kwargs)
+        yield from self.iter_response_items(response, prefix, fields)
+
+    def iter_response_items(self, response, prefix, fields=None, digest=None):
+        """
+        stream_items() for a response already requested (with stream=True), e.g. a conditional GET.
+        With digest (a hashlib object), the decoded body bytes are fed to it as they are read,
+        so a payload can be fingerprinted without re-encoding what was parsed.
+        """
+        if ijson is None:
+            if digest is not None:
+                digest.update(response.content)
+            data = response.json()
+            for key in prefix.split(".")[:-1]:
+                data = data.get(key) if isinstance(data, dict) else None
+            items = data or []
+        else:
+            items = self._iter_raw_items(response, prefix, digest)
+
+        if fields is None:
+            yield from items
+        else:
+            for item in items:
+                yield {field: item[field] for field in fields if field in item}
+
+    def _iter_raw_items(self, response, prefix, digest=None):
+        with response:
+            response.raw.decode_content = True  # Let urllib3 undo the gzip encoding
+            body = response.raw if digest is None else _DigestReader(response.raw, digest)
+            try:
+                yield from ijson.items(body, prefix, use_float=True)
+            except (requests.RequestException, Urllib3Error, OSError, ijson.JSONError) as e:
+                # The connection dropped or the body was cut short part-way through
+                raise TJTRequestError(response.url, response.status_code, f"incomplete response: {e}") from e
+
+
+class _DigestReader:
+    """File-like wrapper that feeds every chunk read from raw to a hashlib object."""
+
+    def __init__(self, raw, digest):
+        self.raw = raw
+        self.digest = digest
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        self.digest.update(chunk)
+        return chunk
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def shared_client():
+    """The process-wide client used by every TJT module, authenticated with tjt_auth's token provider."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from tjt_auth import token_provider  # tjt_auth imports this module for its own client
+                _client = TJTClient(token_provider)
+    return _client
@@ -1,135 +1,85 @@
-import requests
+import os
 import json
 import pandas as pd 
-from datetime import datetime, timedelta
-
-# OAuth2 endpoint and credentials
-token_url = 'https://www.tjhub3.com/export_arsenal/token'
-event_list_url = "https://www.tjhub3.com/export_arsenal/Events/List"
-Username = 'hospitality'
-Password = 'OkMessageSectionType000!'
-grant_type = 'password'
-
-def get_access_token():
-    global token_expiry_time
-    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-    data = {
-        'Username': Username,
-        'Password': Password,
-        'grant_type': grant_type
-    }
-    
-    response = requests.post(token_url, headers=headers, data=data, verify=True)
-    if response.status_code == 200:
-        token_data = response.json()
-        new_access_token = token_data.get('access_token')
-        expires_in = token_data.get('expires_in', 3600)
-        token_expiry_time = datetime.now() + timedelta(seconds=expires_in)
-        return new_access_token
-    else:
-        print(f"Failed to retrieve access token: {response.status_code} - {response.text}")
-        return None
-
-def refresh_token_if_needed():
-    global token_expiry_time, access_token
-    if token_expiry_time is None or datetime.now() >= token_expiry_time:
-        access_token = get_access_token()
+from tjt_catalog import events_catalog
+from tjt_dataset_store import SharedDataset
+from tjt_refresher import refresher, read_dataset
+
+# Seconds the merged inventory is served to every caller before it is fetched again
+INVENTORY_MAX_AGE = int(os.getenv("TJT_INVENTORY_MAX_AGE", "60"))
 
 def fetch_events():
-    refresh_token_if_needed()
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'Content-Type': 'application/json'
-    }
-    response = requests.get(event_list_url, headers=headers)
-    
-    if response.status_code == 200:
-        events_data = response.json()
-        return events_data.get('Data', {}).get('Events', [])
-    else:
-        print(f"Failed to retrieve event list: {response.status_code} - {response.text}")
-        return []
+    """
+    Returns the event list from the events catalog shared with tjt_hosp_api, so a
+    leaderboard rerun doesn't download Events/List twice. Raises TJTRequestError if it
+    can't be fetched and nothing is cached.
+    """
+    return events_catalog.get()
+
+# Columns of flatten_events(), in order
+EVENT_COLUMNS = [
+    "EventId",
+    "EventName",
+    "KickOffEventStart",
+    "EventCompetition",
+    "Gender",
+    "GoLiveDate",
+    "PackageId",
+    "PackageName",
+    "AvailableSeats",  # ✅ AvailableSeats retained
+    "MaxSaleQuantity",  # ✅ Not renamed yet
+    "Price",
+    "Capacity"
+]
+
+def _event_datetimes(values):
+    """Parses API date strings to naive datetime64 (wall-clock time), to the second."""
+    parsed = pd.to_datetime(values, errors="coerce")
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        parsed = parsed.dt.tz_localize(None)
+    return parsed.dt.floor("s")
 
 def flatten_events(events):
     """
-    Converts raw event JSON to a DataFrame with:
+    Converts raw event JSON to a DataFrame with one row per event, package and location
+    (one row with no Capacity for packages without locations):
       - EventId, EventName, KickOffEventStart, EventCompetition, Gender, GoLiveDate
       - PackageId, PackageName, AvailableSeats, MaxSaleQuantity, Price, Capacity
+    KickOffEventStart and GoLiveDate are datetime64 columns (NaT when unparseable).
+
+    The nested HospitalityPackages/Locations arrays are unnested a level at a time with
+    explode(), so the work is a handful of column operations instead of one dict per row.
     """
-    all_rows = []
-    for event in events:
-        event_id = event.get("Id")
-        event_name = event.get("Name")
-        kick_off = event.get("KickOffEventStart")
-        competition = event.get("EventCompetition")
-        gender = event.get("Gender")
-        go_live_date = event.get("GoLiveDate")
-
-        packages = event.get("HospitalityPackages", [])
-        if not packages:
-            continue
-
-        for pkg in packages:
-            package_id = pkg.get("PackageId")
-            package_name = pkg.get("PackageName")
-            price = pkg.get("Price")
-            max_sale_quantity = pkg.get("MaxSaleQuantity", 0)  # ✅ Keep MaxSaleQuantity
-            available_seats = pkg.get("AvailableSeats", None)  # ✅ Keep AvailableSeats
-
-            locations = pkg.get("Locations", [])
-            if not locations:
-                all_rows.append({
-                    "EventId": event_id,
-                    "EventName": event_name,
-                    "KickOffEventStart": kick_off,
-                    "EventCompetition": competition,
-                    "Gender": gender,
-                    "GoLiveDate": go_live_date,
-                    "PackageId": package_id,
-                    "PackageName": package_name,
-                    "AvailableSeats": available_seats,  # ✅ Still returning AvailableSeats
-                    "MaxSaleQuantity": max_sale_quantity,  # ✅ Keeping as is
-                    "Price": price,
-                    "Capacity": None
-                })
-            else:
-                for loc in locations:
-                    capacity = loc.get("Capacity")
-                    all_rows.append({
-                        "EventId": event_id,
-                        "EventName": event_name,
-                        "KickOffEventStart": kick_off,
-                        "EventCompetition": competition,
-                        "Gender": gender,
-                        "GoLiveDate": go_live_date,
-                        "PackageId": package_id,
-                        "PackageName": package_name,
-                        "AvailableSeats": available_seats,  # ✅ Still returning AvailableSeats
-                        "MaxSaleQuantity": max_sale_quantity,  # ✅ Keeping as is
-                        "Price": price,
-                        "Capacity": capacity
-                    })
-
-    df = pd.DataFrame(all_rows, columns=[
-        "EventId",
-        "EventName",
-        "KickOffEventStart",
-        "EventCompetition",
-        "Gender",
-        "GoLiveDate",
-        "PackageId",
-        "PackageName",
-        "AvailableSeats",  # ✅ AvailableSeats retained
-        "MaxSaleQuantity",  # ✅ Not renamed yet
-        "Price",
-        "Capacity"
+    # Step 1: One row per event; events without packages are skipped
+    df_events = pd.DataFrame(list(events)).reindex(columns=[
+        "Id", "Name", "KickOffEventStart", "EventCompetition", "Gender", "GoLiveDate", "HospitalityPackages"
     ])
+    df_packages = df_events.explode("HospitalityPackages", ignore_index=True)
+    df_packages = df_packages[df_packages["HospitalityPackages"].notna()]
+    if df_packages.empty:
+        return pd.DataFrame(columns=EVENT_COLUMNS).astype({"KickOffEventStart": "datetime64[ns]", "GoLiveDate": "datetime64[ns]"})
+
+    # Step 2: One row per package
+    packages = df_packages.pop("HospitalityPackages")
+    package_fields = pd.DataFrame(packages.tolist()).reindex(
+        columns=["PackageId", "PackageName", "AvailableSeats", "MaxSaleQuantity", "Price", "Locations"]
+    )
+    # ✅ Keep MaxSaleQuantity; packages that don't send it have none for sale
+    has_max_sale = packages.map(lambda pkg: "MaxSaleQuantity" in pkg).to_numpy()
+    package_fields["MaxSaleQuantity"] = package_fields["MaxSaleQuantity"].where(has_max_sale, 0)
+    df_packages = pd.concat([df_packages.reset_index(drop=True), package_fields], axis=1)
+
+    # Step 3: One row per location; packages with no locations keep a single row (Capacity missing)
+    df = df_packages.explode("Locations", ignore_index=True)
+    locations = df.pop("Locations")
+    capacities = locations.map(lambda location: location.get("Capacity") if isinstance(location, dict) else None)
+    df["Capacity"] = pd.Series(capacities.tolist(), index=df.index)
 
-    # Convert date/time columns to proper format
-    if 'KickOffEventStart' in df.columns:
-        df['KickOffEventStart'] = pd.to_datetime(df['KickOffEventStart'], errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S')
-    if 'GoLiveDate' in df.columns:
-        df['GoLiveDate'] = pd.to_datetime(df['GoLiveDate'], errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S')
+    df = df.rename(columns={"Id": "EventId", "Name": "EventName"})[EVENT_COLUMNS]
+
+    # ✅ Keep real datetimes, so the dashboards don't parse them again
+    df["KickOffEventStart"] = _event_datetimes(df["KickOffEventStart"])
+    df["GoLiveDate"] = _event_datetimes(df["GoLiveDate"])
 
     return df
 
@@ -142,9 +92,7 @@ def get_inventory_data(stock_file="/Users/cmunthali/Documents/PYTHON/APPS/stock_
     4. Merges on columns ["EventName", "PackageName"] (you can add more if you want)
     5. Returns the merged DataFrame
     """
-    global access_token
     # 1) Fetch
-    access_token = get_access_token()
     raw_events = fetch_events()
     
     # 2) Flatten
@@ -174,6 +122,26 @@ def get_inventory_data(stock_file="/Users/cmunthali/Documents/PYTHON/APPS/stock_
 
     return df_merged
 
+# Process-wide cache of get_inventory_data(), backed by the versioned Parquet store
+inventory_dataset = SharedDataset("inventory", lambda: {"inventory": get_inventory_data()}, INVENTORY_MAX_AGE)
+refresher.register(inventory_dataset)
+
+def load_inventory_frames(max_age=INVENTORY_MAX_AGE):
+    """
+    Returns the frames shared by every session ({"inventory": merged inventory}) without
+    copying them. Callers must not modify them; load_inventory() returns a copy.
+    """
+    return read_dataset(inventory_dataset, max_age)
+
+def load_inventory(max_age=INVENTORY_MAX_AGE):
+    """
+    Returns a copy of the merged inventory, fetched at most once every max_age seconds
+    across all sessions (and served from the latest snapshot after a restart). In the
+    default TJT_REFRESH_MODE=inline each server process fetches for itself; set it to
+    background or worker to have a single refresher own the dataset (see tjt_refresher).
+    """
+    return load_inventory_frames(max_age)["inventory"].copy()
+
 if __name__ == "__main__":
     # Fetch and merge data
     merged_df = get_inventory_data()
@@ -0,0 +1,208 @@
+"""
+Pushes live dashboard updates to open screens with server-sent events, so new sales
+reach the leaderboard ticker within seconds instead of on the next page rerun.
+
+A daemon thread rebuilds the snapshot (a dict of HTML/text fragments) as soon as wake()
+is called, e.g. by a dataset listener when a new version is loaded, and otherwise checks
+a cheap key (the versions held in memory) every LIVE_FEED_POLL seconds. Neither reads or
+builds data: the snapshot is made from what the process already has. Clients get the full
+snapshot when they connect and then only the fragments that changed.
+
+The server listens on localhost only and streams nothing without the feed token, so the
+feed is as private as the pages that embed subscribe_url(). Expose it to the screens
+through the app's reverse proxy (same origin and login as the dashboard), e.g. proxy
+https://<app>/live-feed/events to http://127.0.0.1:8502/events, and set TJT_LIVE_FEED_URL
+to that public URL.
+
+Usage (browser side):
+    const source = new EventSource(subscribe_url());  // rendered into the page
+    source.onmessage = (event) => { const changes = JSON.parse(event.data); ... };
+"""
+import os
+import hmac
+import json
+import queue
+import secrets
+import threading
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LIVE_FEED_HOST = os.getenv("TJT_LIVE_FEED_HOST", "127.0.0.1")
+LIVE_FEED_PORT = int(os.getenv("TJT_LIVE_FEED_PORT", "8502"))
+
+# Public URL the screens connect to (normally the reverse proxy's https URL). Required for
+# live updates: there's no default, as localhost means the screen itself, not the server
+LIVE_FEED_URL = os.getenv("TJT_LIVE_FEED_URL", "")
+
+# Token every subscriber must send. Set it when several server processes render pages, so
+# they all embed the token of the process that serves the feed
+LIVE_FEED_TOKEN = os.getenv("TJT_LIVE_FEED_TOKEN") or secrets.token_urlsafe(32)
+
+# Origin allowed to read the feed cross-origin (the dashboard's, e.g. https://rts.example.com).
+# Not needed when the proxy serves the feed on the dashboard's own origin
+LIVE_FEED_ALLOWED_ORIGIN = os.getenv("TJT_LIVE_FEED_ALLOWED_ORIGIN", "")
+
+# Seconds between checks for new data
+LIVE_FEED_POLL = float(os.getenv("TJT_LIVE_FEED_POLL", "2"))
+
+# Seconds between sales refreshes while the feed is running, so new sales reach screens within seconds
+LIVE_FEED_REFRESH = int(os.getenv("TJT_LIVE_FEED_REFRESH", "10"))
+
+# Seconds between keep-alive comments, so proxies don't close idle streams
+KEEPALIVE_SECONDS = 15
+
+
+def subscribe_url(url=LIVE_FEED_URL, token=LIVE_FEED_TOKEN):
+    """The feed URL with its token, for pages shown to signed-in users only."""
+    return f"{url}{'&' if '?' in url else '?'}token={token}"
+
+
+def make_handler(feed, token=LIVE_FEED_TOKEN, allowed_origin=LIVE_FEED_ALLOWED_ORIGIN):
+    class LiveFeedHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # One line per screen per reconnect is just noise
+
+        def _reject(self, status):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path.rstrip("/") != "/events":
+                self._reject(404)
+                return
+            sent_token = parse_qs(url.query).get("token", [""])[0]
+            if not hmac.compare_digest(sent_token.encode(), token.encode()):
+                self._reject(403)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            if allowed_origin:
+                self.send_header("Access-Control-Allow-Origin", allowed_origin)
+                self.send_header("Vary", "Origin")
+            self.end_headers()
+
+            client = feed.subscribe()
+            try:
+                while True:
+                    try:
+                        changes = client.get(timeout=KEEPALIVE_SECONDS)
+                    except queue.Empty:
+                        self.wfile.write(b": keep-alive\n\n")
+                    else:
+                        self.wfile.write(f"data: {json.dumps(changes)}\n\n".encode())
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                feed.unsubscribe(client)
+
+    return LiveFeedHandler
+
+
+class LiveFeed:
+    """
+    Process-wide publisher of one snapshot. start(snapshot, key) sets the callbacks
+    (later calls just replace them, so reloaded page modules keep working) and starts
+    the polling thread and the event stream server once. snapshot() may return None
+    while there's no data yet.
+    """
+
+    def __init__(self, poll_interval=LIVE_FEED_POLL):
+        self.poll_interval = poll_interval
+        self.snapshot = None
+        self.key = None
+        self.current = {}
+        self._current_key = None
+        self._clients = set()
+        self._thread = None
+        self._server = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Returns a queue receiving the current snapshot, then every change."""
+        client = queue.Queue(maxsize=100)
+        with self._lock:
+            if self.current:
+                client.put(dict(self.current))
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def publish(self, snapshot):
+        """Sends the fragments of snapshot that differ from the last one to every client."""
+        with self._lock:
+            changes = {name: value for name, value in snapshot.items() if self.current.get(name) != value}
+            if not changes:
+                return changes
+            self.current = dict(snapshot)
+            for client in list(self._clients):
+                try:
+                    client.put_nowait(changes)
+                except queue.Full:
+                    # A client that stopped reading gets dropped rather than holding memory
+                    self._clients.discard(client)
+        return changes
+
+    def poll_once(self):
+        key = self.key()
+        if key != self._current_key:
+            snapshot = self.snapshot()
+            if snapshot is not None:
+                self.publish(snapshot)
+                self._current_key = key
+
+    def wake(self):
+        """Asks the polling thread to check for new data now (safe to call from any thread)."""
+        self._wake.set()
+
+    def run(self):
+        """Polls until stop() is called. Blocks; start() runs it on a thread."""
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Live feed update failed: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self, snapshot, key, host=LIVE_FEED_HOST, port=LIVE_FEED_PORT):
+        with self._lock:
+            self.snapshot, self.key = snapshot, key
+            if self._server is None:
+                try:
+                    self._server = ThreadingHTTPServer((host, port), make_handler(self))
+                except OSError as e:
+                    # Usually another server process already serves the feed on this port
+                    print(f"Live feed not started on {host}:{port}: {e}")
+                    return self
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name="tjt-live-feed-server", daemon=True).start()
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run, name="tjt-live-feed", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+
+
+# Shared by every session of the server process
+live_feed = LiveFeed()
@@ -0,0 +1,187 @@
+"""
+Synthetic TJT seasons shaped like the export_arsenal API responses, for running the
+ingest offline (see tjt_mock_server) and for benchmarks.
+
+Usage:
+    python tjt_mock_data.py --events 60 --guests 20000 --transactions 100000 --out fixtures/season
+"""
+import os
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+PACKAGES = [
+    ("Platinum Club", 1250.0), ("Diamond Club", 950.0), ("Dining Club", 650.0), ("Woolwich Restaurant", 550.0),
+    ("The Avenue", 425.0), ("Foundry", 395.0), ("Executive Box", 15000.0), ("N7 Box", 9000.0),
+]
+COMPETITIONS = ["Premier League", "UEFA Champions League", "FA Cup", "Carabao Cup", "Women's Super League"]
+OPPONENTS = ["Chelsea", "Tottenham Hotspur", "Manchester City", "Liverpool", "Newcastle United", "Aston Villa", "Brighton", "Everton"]
+SALES_EXECS = ["dcoppin", "bgardiner", "jedwards", "dmontague", "TBC"]
+SALE_LOCATIONS = ["Moto Sale Team", "Online", "Phone"]
+
+
+def _iso(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def make_events(n_events, rng, season_start=datetime(2025, 8, 16, 15, 0)):
+    events = []
+    for i in range(n_events):
+        kick_off = season_start + timedelta(days=7 * (i // 2) + 3 * (i % 2))
+        packages = []
+        for package_id, (name, price) in enumerate(PACKAGES, start=1):
+            boxes = "Box" in name
+            packages.append({
+                "PackageId": package_id,
+                "PackageName": name,
+                "Price": price,
+                "MaxSaleQuantity": 0 if boxes else rng.randint(50, 400),
+                "AvailableSeats": rng.randint(0, 200),
+                "Locations": [
+                    {"Id": 10_000 * package_id + n, "LocationName": f"{name} {n}", "Capacity": rng.choice([10, 12, 16])}
+                    for n in range(rng.randint(2, 6))
+                ] if boxes else [],
+            })
+        events.append({
+            "Id": i + 1,
+            "Name": f"Arsenal v {OPPONENTS[i % len(OPPONENTS)]}",
+            "KickOffEventStart": _iso(kick_off),
+            "GoLiveDate": _iso(kick_off - timedelta(days=60)),
+            "EventCategory": "Men's First Team" if i % 5 else "Women's First Team",
+            "EventCompetition": COMPETITIONS[i % len(COMPETITIONS)],
+            "Gender": "Male" if i % 5 else "Female",
+            "HospitalityPackages": packages,
+        })
+    return events
+
+
+def make_guests(n_guests, rng):
+    return [
+        {
+            "GuestId": guest_id,
+            "FirstName": f"Guest{guest_id}",
+            "Surname": rng.choice(["Smith", "Jones", "Taylor", "Brown", "Wilson"]),
+            "Email": f"guest{guest_id}@example.com",
+            "CountryCode": "GB",
+            "PostCode": rng.choice(["N5 1BU", "N7 7AJ", "EC1V 9HX"]),
+            "City": "London",
+            "CompanyName": rng.choice(["", "Acme Ltd", "Highbury Partners"]),
+            "DOB": None,
+            "Status": "Active",
+            "IsSeasonal": rng.random() < 0.3,
+        }
+        for guest_id in range(1, n_guests + 1)
+    ]
+
+
+def make_transactions(events, n_guests, n_transactions, rng, seat_ratio=0.8):
+    """
+    Spreads n_transactions over the events. Most carry a TMSessionId JSON string with
+    a Seats array (seat_ratio of them); box sales carry a Locations entry instead.
+    """
+    transactions = {event["Id"]: [] for event in events}
+    for i in range(n_transactions):
+        event = events[i % len(events)]
+        package = rng.choice(event["HospitalityPackages"])
+        kick_off = datetime.fromisoformat(event["KickOffEventStart"])
+        created_on = kick_off - timedelta(minutes=rng.randint(60, 120 * 24 * 60))
+        seats = rng.randint(1, 6)
+        price = package["Price"]
+        has_session = not package["Locations"] and rng.random() < seat_ratio
+        transactions[event["Id"]].append({
+            "Id": 1_000_000 + i,
+            "EventId": event["Id"],
+            "Name": package["PackageName"],
+            "Type": "Seasonal Membership" if rng.random() < 0.2 else "Match Day",
+            "PackageId": package["PackageId"],
+            "GuestId": rng.randint(1, max(1, n_guests)),
+            "Seats": seats,
+            "CRCCode": f"CRC{package['PackageId']:03d}",
+            "Price": price,
+            "Discount": None,
+            "DiscountValue": 0.0,
+            "IsPaid": rng.random() < 0.9,
+            "TotalPrice": round(price * seats, 2),
+            "CreatedOn": created_on.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            "PaymentTime": _iso(created_on + timedelta(minutes=rng.randint(0, 600))),
+            "CreatedBy": rng.choice(SALES_EXECS),
+            "GLCode": "GL100",
+            "SaleLocation": rng.choice(SALE_LOCATIONS),
+            "Locations": [rng.choice(package["Locations"])] if package["Locations"] else [],
+            "TMSessionId": json.dumps({"Seats": [
+                {"PriceBandName": "Band A", "Row": str(rng.randint(1, 20)), "Number": str(n + 1), "AreaName": "Club Level", "BlockId": rng.randint(1, 50)}
+                for n in range(seats)
+            ]}) if has_session else None,
+        })
+    return transactions
+
+
+def make_preorders(events, transactions, rng):
+    preorders = {}
+    for event in events:
+        rows = []
+        for transaction in transactions[event["Id"]][::10]:
+            rows.append({
+                "EventId": event["Id"],
+                "Event": event["Name"],
+                "KickOffEventStart": event["KickOffEventStart"],
+                "Location": transaction["Name"],
+                "Guest": f"Guest{transaction['GuestId']} (guest{transaction['GuestId']}@example.com)",
+                "Status": "Confirmed",
+                "FoodMenu": {"Name": "Seasonal Menu", "Quantity": transaction["Seats"], "Price": 45.0},
+                "DrinkMenu": {"Name": "Drinks Package", "Quantity": transaction["Seats"], "Price": 30.0},
+                "PreOrderItems": [{"ProductName": "Champagne", "OrderedAmount": rng.randint(1, 3), "Price": 90.0}],
+            })
+        preorders[event["Id"]] = rows
+    return preorders
+
+
+def generate_season(n_events=40, n_guests=5000, n_transactions=20000, seed=0, seat_ratio=0.8):
+    """
+    Returns a dict with "events", "guests", "transactions" (EventId -> list) and
+    "preorders" (EventId -> list), deterministic for a given seed.
+    """
+    rng = random.Random(seed)
+    events = make_events(n_events, rng)
+    guests = make_guests(n_guests, rng)
+    transactions = make_transactions(events, n_guests, n_transactions, rng, seat_ratio)
+    preorders = make_preorders(events, transactions, rng)
+    return {"events": events, "guests": guests, "transactions": transactions, "preorders": preorders}
+
+
+def response_body(key, records):
+    return {"Data": {key: records}, "Success": True}
+
+
+def save_fixtures(season, directory):
+    """
+    Writes the season as response bodies tjt_mock_server can replay:
+    Accounts_List.json, Events_List.json, and one
+    HospitalitySaleTransactions_List_<EventId>.json / CateringPreorders_List_<EventId>.json per event.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    def write(name, body):
+        with open(os.path.join(directory, f"{name}.json"), "w") as f:
+            json.dump(body, f)
+
+    write("Accounts_List", response_body("Guests", season["guests"]))
+    write("Events_List", response_body("Events", season["events"]))
+    for event_id, rows in season["transactions"].items():
+        write(f"HospitalitySaleTransactions_List_{event_id}", response_body("HospitalitySaleTransactions", rows))
+    for event_id, rows in season["preorders"].items():
+        write(f"CateringPreorders_List_{event_id}", response_body("CateringPreorders", rows))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Generate a synthetic TJT season as replayable fixtures.")
+    arg_parser.add_argument("--events", type=int, default=40)
+    arg_parser.add_argument("--guests", type=int, default=5000)
+    arg_parser.add_argument("--transactions", type=int, default=20000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--out", required=True, help="Directory to write the fixtures to")
+    args = arg_parser.parse_args()
+
+    save_fixtures(generate_season(args.events, args.guests, args.transactions, args.seed), args.out)
+    print(f"Wrote {args.events} events, {args.guests} guests and {args.transactions} transactions to {args.out}")
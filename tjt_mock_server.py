@@ -0,0 +1,152 @@
+"""
+Local stand-in for the TJT export_arsenal API, serving a synthetic season
+(tjt_mock_data) or replaying recorded response bodies from a fixtures directory.
+
+Usage:
+    python tjt_mock_server.py --port 8765 --transactions 100000
+    TJT_BASE_URL=http://127.0.0.1:8765 streamlit run rts_apps.py
+"""
+import os
+import gzip
+import json
+import hashlib
+import time
+import random
+import argparse
+import threading
+from glob import glob
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from tjt_mock_data import generate_season, response_body
+
+ENDPOINTS = ["Accounts/List", "Events/List", "HospitalitySaleTransactions/List", "CateringPreorders/List"]
+
+
+class MockResponses:
+    """
+    Holds the pre-serialized body of every response, keyed by (endpoint, EventId),
+    so requests are served without re-encoding JSON each time.
+    """
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+
+    @classmethod
+    def from_season(cls, season):
+        bodies = {
+            ("Accounts/List", None): response_body("Guests", season["guests"]),
+            ("Events/List", None): response_body("Events", season["events"]),
+        }
+        for event_id, rows in season["transactions"].items():
+            bodies[("HospitalitySaleTransactions/List", str(event_id))] = response_body("HospitalitySaleTransactions", rows)
+        for event_id, rows in season["preorders"].items():
+            bodies[("CateringPreorders/List", str(event_id))] = response_body("CateringPreorders", rows)
+        return cls({key: json.dumps(body).encode() for key, body in bodies.items()})
+
+    @classmethod
+    def from_fixtures(cls, directory):
+        """Loads files written by tjt_mock_data.save_fixtures (or recorded from the real API)."""
+        bodies = {}
+        for path in glob(os.path.join(directory, "*.json")):
+            name = os.path.splitext(os.path.basename(path))[0]
+            endpoint, _, event_id = name.rpartition("_List")
+            with open(path, "rb") as f:
+                bodies[(f"{endpoint}/List", event_id.lstrip("_") or None)] = f.read()
+        return cls(bodies)
+
+    def get(self, endpoint, event_id=None):
+        body = self.bodies.get((endpoint, event_id))
+        if body is None and event_id is not None:
+            # Events without recorded transactions answer like the real API: an empty list
+            key = "HospitalitySaleTransactions" if endpoint.startswith("Hospitality") else "CateringPreorders"
+            body = json.dumps(response_body(key, [])).encode()
+        return body
+
+
+def make_handler(responses, latency=0.0, error_rate=0.0, token="mock-token", expires_in=3600):
+    class MockTJTHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output readable
+
+        def _send(self, status, body, extra_headers=None):
+            if latency:
+                time.sleep(latency)
+            headers = {"Content-Type": "application/json", **(extra_headers or {})}
+            if body and "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if urlparse(self.path).path.rstrip("/").endswith("/token"):
+                self._send(200, json.dumps({"access_token": token, "token_type": "bearer", "expires_in": expires_in}).encode())
+            else:
+                self._send(404, b'{"Message": "Not found"}')
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if self.headers.get("Authorization") != f"Bearer {token}":
+                self._send(401, b'{"Message": "Authorization has been denied for this request."}')
+                return
+            if error_rate and random.random() < error_rate:
+                # Simulates TJT's intermittent overload responses for testing retries
+                self._send(503, b'{"Message": "Service unavailable"}')
+                return
+            endpoint = next((name for name in ENDPOINTS if url.path.rstrip("/").endswith(name)), None)
+            event_id = parse_qs(url.query).get("EventId", [None])[0]
+            body = responses.get(endpoint, event_id) if endpoint else None
+            if body is None:
+                self._send(404, b'{"Message": "Not found"}')
+                return
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", {"ETag": etag})
+            else:
+                self._send(200, body, {"ETag": etag})
+
+    return MockTJTHandler
+
+
+def start_mock_server(responses, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0):
+    """
+    Serves responses on a background thread. Returns (server, base_url); pass base_url
+    as TJT_BASE_URL and call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(responses, latency, error_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="tjt-mock-server", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run a local stand-in for the TJT API.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--fixtures", help="Replay response bodies from this directory instead of generating a season")
+    arg_parser.add_argument("--events", type=int, default=40)
+    arg_parser.add_argument("--guests", type=int, default=5000)
+    arg_parser.add_argument("--transactions", type=int, default=20000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="Share of API requests answered with a 503")
+    args = arg_parser.parse_args()
+
+    if args.fixtures:
+        responses = MockResponses.from_fixtures(args.fixtures)
+    else:
+        responses = MockResponses.from_season(generate_season(args.events, args.guests, args.transactions, args.seed))
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(responses, args.latency, args.error_rate))
+    print(f"Mock TJT API on http://{args.host}:{args.port} (set TJT_BASE_URL to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,174 @@
+import os
+import time
+import argparse
+import threading
+from tjt_dataset_store import DATASET_DIR, read_manifest
+
+try:
+    import fcntl
+except ImportError:  # Windows: without file locks every refresher refreshes
+    fcntl = None
+
+# How datasets get refreshed (TJT_REFRESH_MODE):
+#   "inline"     - the page that finds the data stale fetches it (default). Each server process
+#                  fetches for itself, so use it only with a single Streamlit process
+#   "background" - one refresher thread owns the datasets: the process holding OWNER_LOCK_PATH
+#                  refreshes every REFRESH_INTERVAL seconds and the others load what it publishes
+#   "worker"     - a separate `python tjt_refresher.py` process refreshes; pages only read
+# Deployments running several Streamlit processes should set "background" or "worker"
+# (see .devcontainer/devcontainer.json)
+REFRESH_MODE = os.getenv("TJT_REFRESH_MODE", "inline")
+REFRESH_INTERVAL = int(os.getenv("TJT_REFRESH_INTERVAL", "60"))
+
+# Held by the one process that refreshes; other servers and workers load what it publishes
+OWNER_LOCK_PATH = os.path.join(DATASET_DIR, "refresher.lock")
+
+
+class BackgroundRefresher:
+    """
+    Refreshes every registered SharedDataset on a fixed schedule from a daemon thread,
+    publishing a new version each time. Pages read the published versions, so TJT
+    latency never shows up in render time.
+
+    Each dataset is refreshed every `interval` seconds unless registered with its own.
+    Only the refresher holding OWNER_LOCK_PATH refreshes, so however many server
+    processes (and sessions) are open, TJT is fetched once per interval. The others
+    load each version it publishes and take over if it exits.
+    """
+
+    def __init__(self, interval=REFRESH_INTERVAL):
+        self.interval = interval
+        self.datasets = []
+        self.intervals = {}
+        self._refreshed_at = {}
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._owner_lock = None
+
+    def is_owner(self):
+        """True if this process refreshes the datasets, taking the owner lock if it is free."""
+        if fcntl is None or self._owner_lock is not None:
+            return True
+        os.makedirs(os.path.dirname(OWNER_LOCK_PATH), exist_ok=True)
+        lock_file = open(OWNER_LOCK_PATH, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._owner_lock = lock_file  # Held (open) for the life of the process
+        return True
+
+    def register(self, dataset, interval=None):
+        """Adds dataset to the cycle, refreshed every interval seconds (default: the refresher's interval)."""
+        if dataset not in self.datasets:
+            self.datasets.append(dataset)
+        if interval is not None:
+            self.intervals[dataset.name] = interval
+
+    def _interval(self, dataset):
+        return self.intervals.get(dataset.name, self.interval)
+
+    def _seconds_until_due(self, dataset):
+        refreshed_at = self._refreshed_at.get(dataset.name)
+        if refreshed_at is None:
+            return 0
+        return max(0, self._interval(dataset) - (time.monotonic() - refreshed_at))
+
+    def refresh_once(self, datasets=None):
+        """Refreshes datasets (default: every registered one) once."""
+        datasets = list(self.datasets) if datasets is None else datasets
+        for dataset in datasets:
+            self._refreshed_at[dataset.name] = time.monotonic()
+
+        if not self.is_owner():
+            # Another process refreshes: load what it has published so pages here never wait
+            for dataset in datasets:
+                try:
+                    if read_manifest(dataset.name) is not None:
+                        dataset.latest()
+                except Exception as e:
+                    print(f"Loading published {dataset.name} failed: {e}")
+            return
+
+        for dataset in datasets:
+            started = time.monotonic()
+            try:
+                dataset.refresh()
+                print(f"Refreshed {dataset.name} in {time.monotonic() - started:.1f}s (version {dataset.version})")
+            except Exception as e:
+                print(f"Background refresh of {dataset.name} failed: {e}")
+
+    def run(self):
+        """Refreshes until stop() is called. Blocks; start() runs it on a thread."""
+        triggered = True
+        while not self._stop.is_set():
+            # Every dataset when trigger() asked for it, otherwise those whose interval has passed
+            self.refresh_once(None if triggered else [
+                dataset for dataset in list(self.datasets) if self._seconds_until_due(dataset) == 0
+            ])
+            # Sleep until the next dataset is due, or until trigger() asks for an early refresh
+            next_due = min((self._seconds_until_due(dataset) for dataset in list(self.datasets)), default=self.interval)
+            triggered = self._wake.wait(next_due)
+            self._wake.clear()
+
+    def start(self):
+        """Starts the refresh thread once; later calls are no-ops."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run, name="tjt-refresher", daemon=True)
+                self._thread.start()
+        return self
+
+    def trigger(self):
+        """Asks the running thread to refresh now instead of at the next scheduled cycle."""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+# Shared by tjt_hosp_api and tjt_inventory, which register their datasets on import
+refresher = BackgroundRefresher()
+
+
+def read_dataset(dataset, max_age):
+    """
+    Read path used by the page-facing loaders. In inline mode this is dataset.get(max_age).
+    Otherwise the latest published version is returned as-is; max_age=0 (the Refresh
+    button) asks for a refresh without waiting for it in background mode.
+    """
+    if REFRESH_MODE == "inline":
+        return dataset.get(max_age)
+
+    if REFRESH_MODE == "background":
+        refresher.start()
+        if max_age == 0:
+            refresher.trigger()
+    elif max_age == 0:
+        return dataset.get(max_age)
+
+    return dataset.latest()
+
+
+if __name__ == "__main__":
+    import tjt_hosp_api
+    import tjt_inventory
+
+    arg_parser = argparse.ArgumentParser(description="Fetch TJT data on a schedule and publish dataset versions.")
+    arg_parser.add_argument("--interval", type=int, default=REFRESH_INTERVAL, help="Seconds between refreshes")
+    arg_parser.add_argument("--once", action="store_true", help="Refresh once and exit")
+    args = arg_parser.parse_args()
+
+    refresher.interval = args.interval
+    if args.once:
+        refresher.refresh_once()
+    else:
+        try:
+            refresher.run()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from tjt_dataset_store import SCHEMA_VERSION
+from tjt_sync_store import STORE_VERSION
+
+# Grain of the cube: one row per exec, day, event, package and sale location
+CUBE_DIMENSIONS = ["Day", "CreatedBy", "EventId", "Fixture Name", "EventCompetition", "Package Name", "SaleLocation"]
+
+# Measures kept per cube row: Revenue sums Price (what the leaderboards rank on)
+CUBE_MEASURES = ["Revenue", "TotalPrice", "Seats", "Sales"]
+
+# Columns and number of the most recent sales kept for the ticker's "latest sale" message
+RECENT_SALES_COLUMNS = [
+    "CreatedOn", "CreatedBy", "SaleLocation", "EventId", "Fixture Name", "EventCompetition",
+    "Package Name", "Seats", "Price", "TotalPrice",
+]
+RECENT_SALES = 50
+
+# Bump when build_cube, or the transforms feeding it, change how sales are aggregated
+CUBE_VERSION = 1
+
+
+def build_cube(sales_df):
+    """
+    Aggregates filtered_df_without_seats to CUBE_DIMENSIONS. Rows with missing dimension
+    values are kept as their own groups, so the cube's totals match the sales frame's;
+    SalesCube leaves undated ones (Day is NaT) out of its revenue totals.
+    """
+    frame = pd.DataFrame({
+        "Day": sales_df["CreatedOn"].dt.floor("D"),
+        **{name: sales_df[name] for name in CUBE_DIMENSIONS[1:]},
+        "Revenue": sales_df["Price"],
+        "TotalPrice": sales_df["TotalPrice"],
+        "Seats": sales_df["Seats"],
+    })
+    return (
+        frame.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)
+        .agg(Revenue=("Revenue", "sum"), TotalPrice=("TotalPrice", "sum"), Seats=("Seats", "sum"), Sales=("Revenue", "size"))
+        .reset_index()
+    )
+
+
+def cube_digest(digest):
+    """An event's payload digest qualified by the cube, schema and sync store versions."""
+    if digest is None:
+        return None
+    return f"{CUBE_VERSION}.{SCHEMA_VERSION}.{STORE_VERSION}:{digest}"
+
+
+def update_cube(previous, sales_df, event_digests):
+    """
+    Returns the cube for sales_df, reusing previous cube rows for every event whose
+    payload digest (see tjt_hosp_api.sync_transactions) hasn't changed, so only new or
+    changed events are aggregated again. Without a previous cube or digests (full sync
+    mode) the whole cube is rebuilt. Each row records its event's digest in EventDigest,
+    qualified by cube_digest(), so rows aggregated by older code are never reused.
+    """
+    event_digests = {event_id: cube_digest(digest) for event_id, digest in event_digests.items()}
+    if previous is None or previous.empty or not event_digests:
+        cube = build_cube(sales_df)
+    else:
+        previous_digests = previous.drop_duplicates("EventId").set_index("EventId")["EventDigest"].to_dict()
+        unchanged = [
+            event_id for event_id, digest in event_digests.items()
+            if digest is not None and previous_digests.get(event_id) == digest
+        ]
+        kept = previous[previous["EventId"].isin(unchanged)].drop(columns="EventDigest")
+        changed = build_cube(sales_df[~sales_df["EventId"].isin(unchanged).to_numpy()])
+        # Category columns hold different categories per part, so they come out as object here
+        cube = pd.concat([kept, changed], ignore_index=True)
+
+    cube["EventDigest"] = cube["EventId"].map(event_digests)
+    return cube
+
+
+def recent_sales(sales_df, n=RECENT_SALES):
+    """Returns the n latest sales by CreatedOn, newest first."""
+    dated = sales_df[sales_df["CreatedOn"].notna()]
+    return dated.nlargest(n, "CreatedOn")[RECENT_SALES_COLUMNS].reset_index(drop=True)
+
+
+def _normalized(values):
+    return values.astype(object).where(values.notna(), "").astype(str).str.strip().str.lower()
+
+
+class SalesCube:
+    """
+    Read side of the cube for one dataset version. Every query is answered from the
+    cube (a few thousand rows) instead of the sales frame, and its result is memoized,
+    so dashboard reruns between refreshes are dictionary lookups.
+
+    Results are shared between callers; copy them before modifying. built_at is when the
+    dataset version was built (epoch seconds), or None if unknown.
+    """
+
+    def __init__(self, cube, recent, built_at=None):
+        self.cube = cube
+        self.recent = recent
+        self.built_at = built_at
+        self._results = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def empty(cls):
+        return cls(pd.DataFrame(columns=CUBE_DIMENSIONS + CUBE_MEASURES), pd.DataFrame(columns=RECENT_SALES_COLUMNS))
+
+    def _memoized(self, key, compute):
+        with self._lock:
+            if key not in self._results:
+                self._results[key] = compute()
+            return self._results[key]
+
+    def _rows(self, first_day=None, last_day=None, execs=None, where=None):
+        # Undated sales (CreatedOn was missing or unparseable) never count towards totals
+        mask = self.cube["Day"].notna()
+        if first_day is not None:
+            mask &= self.cube["Day"] >= pd.Timestamp(first_day).normalize()
+        if last_day is not None:
+            mask &= self.cube["Day"] <= pd.Timestamp(last_day).normalize()
+        if execs is not None:
+            mask &= self.cube["CreatedBy"].isin(execs)
+        for name, value in (where or {}).items():
+            mask &= self.cube[name] == value
+        return self.cube[mask]
+
+    def total(self, by=None, measure="Revenue", first_day=None, last_day=None, execs=None, where=None):
+        """
+        Sums measure over dated sales made from first_day to last_day (inclusive, whole
+        days) by execs, where each column in `where` equals its value. Returns a Series
+        indexed by the `by` column (only values with sales), or a number when by is None.
+        """
+        key = (by, measure, first_day, last_day, tuple(execs) if execs is not None else None,
+               tuple(sorted((where or {}).items())))
+
+        def compute():
+            rows = self._rows(first_day, last_day, execs, where)
+            if by is None:
+                return rows[measure].sum()
+            return rows.groupby(by, observed=True)[measure].sum()
+
+        return self._memoized(key, compute)
+
+    def fixture_revenue(self, fixture_name, event_competition, event_id=None):
+        """Dated revenue of a fixture, matching name and competition ignoring case and surrounding spaces."""
+        def compute():
+            rows = self._rows(where=None if event_id is None else {"EventId": event_id})
+            mask = (_normalized(rows["Fixture Name"]) == fixture_name.strip().lower()) & (
+                _normalized(rows["EventCompetition"]) == event_competition.strip().lower()
+            )
+            return rows.loc[mask, "Revenue"].sum()
+
+        return self._memoized(("fixture_revenue", fixture_name, event_competition, event_id), compute)
+
+    def month_digests(self):
+        """
+        {month start: fingerprint of the cube rows dated in that month}, for months with
+        sales. Rows are identified by their event's EventDigest, or by their own values
+        where they have none (full sync mode), so any change to a month's sales, e.g. a
+        refund reaching a closed month, gives that month a new fingerprint.
+        """
+        def compute():
+            cube = self.cube[self.cube["Day"].notna()]
+            if cube.empty:
+                return {}
+            row_hashes = pd.util.hash_pandas_object(cube.drop(columns="EventDigest", errors="ignore"), index=False).to_numpy()
+            if "EventDigest" in cube.columns:
+                has_digest = cube["EventDigest"].notna().to_numpy()
+                event_hashes = pd.util.hash_pandas_object(cube[["EventId", "EventDigest"]], index=False).to_numpy()
+                row_hashes = np.where(has_digest, event_hashes, row_hashes)
+            months = cube["Day"].dt.to_period("M").dt.start_time
+            return {
+                month_start: hashlib.sha256(np.unique(hashes.to_numpy()).tobytes()).hexdigest()
+                for month_start, hashes in pd.Series(row_hashes, index=cube.index).groupby(months.to_numpy())
+            }
+
+        return self._memoized("month_digests", compute)
+
+    def latest_sale(self):
+        """The most recent sale as a Series, or None if there are none."""
+        return self.recent.iloc[0] if not self.recent.empty else None
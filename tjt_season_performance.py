@@ -0,0 +1,116 @@
+"""
+Season performance store: revenue and % of target per sales exec and month, as used by
+the leaderboard's "Monthly Performance" report.
+
+Month totals are read from the sales cube (tjt_sales_cube), which is kept up to date
+event by event as transactions arrive, so the current month follows every refresh. A
+closed month is frozen the first time it is read from data built at least
+MONTH_CLOSE_GRACE seconds after it ended: later reruns and refreshes reuse its totals, so
+the season view costs about the same as the current month's. Data fetched before then
+(e.g. just before midnight, or by a lagging refresher) never freezes a month, so none of
+its last sales are lost. Each frozen month is kept with the fingerprint of the cube rows
+it was read from (SalesCube.month_digests), so a refund, cancellation or edit that reaches
+it later is picked up by the next version of the data.
+"""
+import os
+import threading
+import pandas as pd
+from datetime import datetime
+
+# Seconds after a month ends before data built from then on is trusted to be final for it
+MONTH_CLOSE_GRACE = int(os.getenv("TJT_MONTH_CLOSE_GRACE", "3600"))
+
+
+def month_starts(first_day, last_day):
+    """First day of every month from first_day's month to last_day's month."""
+    first_day = pd.Timestamp(first_day).normalize()
+    return pd.date_range(first_day.replace(day=1), pd.Timestamp(last_day).normalize(), freq="MS")
+
+
+class SeasonPerformance:
+    """
+    Process-wide store of closed months' revenue per exec, keyed by month and execs and
+    kept with the month's fingerprint. Results are shared between callers; copy them
+    before modifying.
+    """
+
+    def __init__(self, grace=MONTH_CLOSE_GRACE):
+        self.grace = grace
+        self._closed = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forgets the frozen months, so they're read from the cube again."""
+        with self._lock:
+            self._closed.clear()
+
+    def is_final(self, sales_cube, month_end):
+        """True if sales_cube was built long enough after month_end to hold all of its sales."""
+        if sales_cube.built_at is None or sales_cube.cube.empty:
+            return False
+        closed_at = month_end + pd.Timedelta(days=1) + pd.Timedelta(seconds=self.grace)
+        return pd.Timestamp(datetime.fromtimestamp(sales_cube.built_at)) >= closed_at
+
+    def month_revenue(self, sales_cube, month_start, first_day, last_day, execs):
+        """
+        Revenue per exec (Series indexed by CreatedBy, only execs with sales) in the month
+        starting month_start, counting sales from first_day to last_day (whole days).
+        """
+        month_end = month_start + pd.offsets.MonthEnd(0)
+        first = max(month_start, pd.Timestamp(first_day).normalize())
+        last = min(month_end, pd.Timestamp(last_day).normalize())
+
+        # Open months, closed ones only partly in the date range, and closed ones the cube
+        # may not have all the sales of, follow the cube
+        whole_month = (first, last) == (month_start, month_end)
+        if not whole_month or not self.is_final(sales_cube, month_end):
+            return sales_cube.total(by="CreatedBy", first_day=first, last_day=last, execs=execs)
+
+        # A frozen month is read again only if the sales it was read from changed
+        key = (month_start, tuple(execs))
+        digest = sales_cube.month_digests().get(month_start)
+        with self._lock:
+            frozen = self._closed.get(key)
+            if frozen is None or frozen[0] != digest:
+                frozen = (digest, sales_cube.total(by="CreatedBy", first_day=first, last_day=last, execs=execs))
+                self._closed[key] = frozen
+            return frozen[1]
+
+    def revenue(self, sales_cube, first_day, last_day, execs):
+        """
+        Revenue from first_day to last_day as a DataFrame indexed by (Month, Year), one
+        row per month in the range, with a column per exec (0 where they sold nothing).
+        """
+        months = month_starts(first_day, last_day)
+        rows = [
+            self.month_revenue(sales_cube, month_start, first_day, last_day, execs).reindex(execs)
+            for month_start in months
+        ]
+        index = pd.MultiIndex.from_arrays(
+            [[month_start.strftime("%B") for month_start in months], [month_start.year for month_start in months]],
+            names=["Month", "Year"],
+        )
+        return pd.DataFrame(rows, index=index, columns=execs, dtype=float).fillna(0)
+
+    def performance(self, sales_cube, first_day, last_day, targets_data, execs):
+        """
+        Returns a DataFrame indexed like targets_data ((Month, Year)) with two columns per
+        exec: (exec, 'Revenue') and (exec, '% of target'). Months outside the date range
+        have 0 revenue; a 0 target gives NaN (no sales) or inf.
+        """
+        revenue = self.revenue(sales_cube, first_day, last_day, execs)
+        revenue = revenue.reindex(targets_data.index).fillna(0)
+        targets = targets_data.reindex(columns=execs).fillna(0)
+        percent = (revenue / targets * 100).round(0)
+        return pd.DataFrame(
+            {
+                (exec, name): frame[exec]
+                for exec in execs
+                for name, frame in (("Revenue", revenue), ("% of target", percent))
+            },
+            index=targets_data.index,
+        )
+
+
+# Shared by every session of the server process
+season_performance = SeasonPerformance()
@@ -0,0 +1,83 @@
+import os
+import argparse
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# Where exports are written, and in which format ("parquet" by default, "excel" on request)
+SNAPSHOT_DIR = os.getenv("TJT_SNAPSHOT_DIR", os.path.join(os.path.dirname(__file__), "snapshots"))
+SNAPSHOT_FORMAT = os.getenv("TJT_SNAPSHOT_FORMAT", "parquet")
+
+# Exports are opt-in: set TJT_WRITE_SNAPSHOTS=1 to write one after every pipeline run
+WRITE_SNAPSHOTS = os.getenv("TJT_WRITE_SNAPSHOTS", "0") == "1"
+
+# A single background worker, so exports never block a page render and never overlap
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tjt-snapshot")
+
+
+def _to_parquet(df, path):
+    try:
+        df.to_parquet(path, index=False)
+    except Exception:
+        # Mixed-type object columns (e.g. DOB) can't be inferred by pyarrow; store them as text
+        text_df = df.copy()
+        for column in text_df.columns[text_df.dtypes == object]:
+            text_df[column] = text_df[column].map(lambda value: value if value is None else str(value))
+        text_df.to_parquet(path, index=False)
+
+
+def write_snapshot(frames, fmt=None, directory=None):
+    """
+    Writes each named DataFrame in frames to directory, as <name>.parquet or as one
+    <name>.xlsx workbook per frame. Returns the paths written.
+    """
+    fmt = fmt or SNAPSHOT_FORMAT
+    directory = directory or SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for name, df in frames.items():
+        if fmt == "excel":
+            path = os.path.join(directory, f"{name}.xlsx")
+            df.to_excel(path, index=False)
+        elif fmt == "parquet":
+            path = os.path.join(directory, f"{name}.parquet")
+            _to_parquet(df, path)
+        else:
+            raise ValueError(f"Unknown snapshot format: {fmt}")
+        paths.append(path)
+        print(f"Snapshot saved: {path}")
+    return paths
+
+
+def _write_snapshot_logged(frames, fmt):
+    try:
+        return write_snapshot(frames, fmt)
+    except Exception as e:
+        print(f"Failed to write snapshot: {e}")
+        return []
+
+
+def submit_snapshot(frames, fmt=None, force=False):
+    """
+    Queues a snapshot on the background writer if snapshots are enabled (or force=True).
+    Returns the Future, or None if nothing was queued.
+    """
+    if not (WRITE_SNAPSHOTS or force):
+        return None
+    return _executor.submit(_write_snapshot_logged, dict(frames), fmt)
+
+
+if __name__ == "__main__":
+    import tjt_hosp_api
+
+    arg_parser = argparse.ArgumentParser(description="Export the current hospitality sales data.")
+    arg_parser.add_argument("--format", choices=["parquet", "excel"], default=SNAPSHOT_FORMAT)
+    arg_parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    args = arg_parser.parse_args()
+
+    frames = tjt_hosp_api.load_hospitality_frames()
+    write_snapshot(
+        {"filtered_hosp_data": frames["filtered_df_without_seats"], "filtered_hosp_data_with_seats": frames["filtered_df_with_seats"]},
+        fmt=args.format,
+        directory=args.dir,
+    )
@@ -0,0 +1,157 @@
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+from datetime import datetime
+
+# Bump when the layout of the stored records changes so old stores are discarded
+STORE_VERSION = 2
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(__file__), "tjt_sync_store.pkl")
+
+
+def payload_hash(*parts):
+    """
+    Returns a stable SHA-256 hex digest of any JSON-like objects
+    (event dicts, transaction lists, guest records).
+    """
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def event_watermark(transactions):
+    """
+    Returns the latest CreatedOn / PaymentTime value found in an event's transactions,
+    or None if the event has no dated transactions.
+    """
+    timestamps = [
+        value
+        for transaction in transactions
+        for value in (transaction.get("CreatedOn"), transaction.get("PaymentTime"))
+        if value
+    ]
+    return max(timestamps) if timestamps else None
+
+
+class TransactionStore:
+    """
+    Local store of hospitality sale transactions, keyed by EventId and then by transaction
+    Id. Each event keeps the digest of everything its sales were built from, the ETag and
+    body digest of its last download, its guests and its CreatedOn/PaymentTime watermark,
+    so unchanged events can be reused without downloading or re-merging them.
+
+    One store is kept in memory for the life of the process; save() only writes the file
+    when something changed. Each event's built sales frames are cached in memory alongside
+    (see get_frames), but never written.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.events = {}
+        self.frames = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                stored = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return
+        except Exception as e:
+            print(f"Ignoring unreadable sync store at {self.path}: {e}")
+            return
+
+        if isinstance(stored, dict) and stored.get("version") == STORE_VERSION:
+            self.events = stored.get("events", {})
+
+    def save(self):
+        """
+        Writes the store if it changed since it was loaded or last saved. The file is
+        replaced atomically from a temp file of its own, so a crashed run never leaves a
+        half-written store and processes saving at the same time don't clobber each other.
+        """
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(self.path)}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump({"version": STORE_VERSION, "events": self.events}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self.dirty = False
+        except OSError as e:
+            print(f"Failed to save sync store to {self.path}: {e}")
+
+    def __contains__(self, event_id):
+        return event_id in self.events
+
+    def is_current(self, event_id, digest):
+        entry = self.events.get(event_id)
+        return entry is not None and entry["hash"] == digest
+
+    def get_transactions(self, event_id):
+        return list(self.events[event_id]["transactions"].values())
+
+    def digest(self, event_id):
+        entry = self.events.get(event_id)
+        return entry["hash"] if entry else None
+
+    def etag(self, event_id):
+        entry = self.events.get(event_id)
+        return entry["etag"] if entry else None
+
+    def body_digest(self, event_id):
+        entry = self.events.get(event_id)
+        return entry["body"] if entry else None
+
+    def guest_ids(self, event_id):
+        entry = self.events.get(event_id)
+        return entry["guest_ids"] if entry else []
+
+    def watermark(self, event_id):
+        entry = self.events.get(event_id)
+        return entry["watermark"] if entry else None
+
+    def update(self, event_id, digest, etag, body, guest_ids, transactions):
+        keyed_transactions = {}
+        for index, transaction in enumerate(transactions):
+            key = transaction.get("Id")
+            if key is None or key in keyed_transactions:
+                key = (key, index)  # Keep repeated Ids so the merged output is unchanged
+            keyed_transactions[key] = transaction
+
+        self.events[event_id] = {
+            "hash": digest,
+            "etag": etag,
+            "body": body,
+            "guest_ids": guest_ids,
+            "watermark": event_watermark(transactions),
+            "synced_at": datetime.now(),
+            "transactions": keyed_transactions,
+        }
+        self.dirty = True
+
+    def get_frames(self, event_id, digest):
+        """Returns the frames cached for event_id by set_frames under digest, or None."""
+        cached = self.frames.get(event_id)
+        return cached[1] if cached is not None and cached[0] == digest else None
+
+    def set_frames(self, event_id, digest, frames):
+        self.frames[event_id] = (digest, frames)
+
+    def prune(self, event_ids):
+        """Drops events that are no longer returned by Events/List."""
+        keep = set(event_ids)
+        for event_id in list(self.events):
+            if event_id not in keep:
+                del self.events[event_id]
+                self.dirty = True
+        for event_id in list(self.frames):
+            if event_id not in keep:
+                del self.frames[event_id]
@@ -0,0 +1,242 @@
+import json
+import numpy as np
+import pandas as pd
+from dateutil import parser
+
+# Columns of a per-seat record, in the order the original Step 7 loop built them
+SEAT_RECORD_COLUMNS = [
+    "Order Id", "Transaction Id", "EventId", "First Name", "Surname", "CompanyName", "DOB", "Email", "IsSeasonal",
+    "Country Code", "PostCode", "City", "Status", "GLCode", "PackageId", "GuestId", "CRCCode",
+    "Fixture Name", "EventCategory", "EventCompetition", "Type", "KickOffEventStart", "Package Name",
+    "LocationName", "Price", "Seats", "PriceBandName", "Row", "Seat Number", "AreaName", "BlockId",
+    "Discount", "DiscountValue", "IsPaid", "TotalPrice", "CreatedOn", "PaymentTime", "CreatedBy",
+    "SaleLocation",
+]
+
+# Transaction columns copied onto every seat record unchanged
+SEAT_TRANSACTION_COLUMNS = [
+    "EventId", "First Name", "Surname", "CompanyName", "DOB", "Email", "IsSeasonal", "Country Code",
+    "PostCode", "City", "Status", "GLCode", "PackageId", "GuestId", "CRCCode", "Fixture Name",
+    "EventCategory", "EventCompetition", "Type", "Price", "Discount", "DiscountValue", "IsPaid",
+    "TotalPrice", "CreatedBy", "SaleLocation",
+]
+
+# Keys read from each entry of TMSessionId['Seats'] -> output column name
+SEAT_FIELDS = {
+    "PriceBandName": "PriceBandName",
+    "Row": "Row",
+    "Number": "Seat Number",
+    "AreaName": "AreaName",
+    "BlockId": "BlockId",
+}
+
+filtered_columns_without_seat_data = [
+    "Order Id", "KickOffEventStart", "EventCategory", "EventCompetition", "Fixture Name", "Type", "Package Name", "LocationName", "PackageId", "EventId", "GuestId",
+    "Seats", "CRCCode", "Price", "Discount", "DiscountValue", "IsPaid", "PaymentTime", "CreatedOn", "CreatedBy", "TotalPrice", "GLCode", "SaleLocation",
+    "CompanyName", "DOB", "Status", "IsSeasonal", "First Name", "Surname", "Email", "Country Code", "PostCode", "City"
+]
+
+# Natural keys of the two sales views. A sale is one transaction of an event; Order Id alone
+# isn't enough, since box sales take theirs from the Locations entry. A seat row is one seat
+# of a transaction, or the transaction itself when it has no seat data.
+SALES_KEY = ["EventId", "Transaction Id"]
+SEAT_KEY = SALES_KEY + ["AreaName", "BlockId", "Row", "Seat Number"]
+
+filtered_columns_with_seat_data = [
+    "Order Id", "KickOffEventStart", "EventCategory", "EventCompetition", "Fixture Name", "Type", "Package Name", "LocationName","PackageId", "EventId", "GuestId",
+    "Seats", "AreaName", "PriceBandName", "Seat Number", "Row", "BlockId", "CRCCode", "Price", "Discount",
+    "DiscountValue", "IsPaid", "PaymentTime", "CreatedOn", "CreatedBy", "TotalPrice", "GLCode", "SaleLocation",
+    "First Name", "Surname", "Email", "Country Code", "PostCode"
+]
+
+
+# Timestamp columns that leave the pipeline as datetime64, truncated to the minute
+DATETIME_COLUMNS = ["KickOffEventStart", "CreatedOn", "PaymentTime"]
+
+
+def _parse_datetime_fallback(value):
+    try:
+        return parser.parse(value).replace(tzinfo=None)  # Auto-detects format
+    except Exception:
+        return pd.NaT
+
+
+def to_datetime_column(series):
+    """
+    Parses a column of TJT timestamps into datetime64, truncated to the minute.
+
+    The API sends ISO 8601 strings, which are parsed in one vectorized pass. Anything
+    that doesn't match falls back to dateutil, once per distinct value; values neither
+    can read become NaT. Offsets are dropped so times stay in the wall-clock time sent.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series
+    else:
+        try:
+            parsed = pd.to_datetime(series, format="ISO8601", errors="coerce")
+        except (ValueError, TypeError):
+            parsed = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        parsed = parsed.dt.tz_localize(None)
+    elif not pd.api.types.is_datetime64_any_dtype(parsed):
+        parsed = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+
+    unparsed = parsed.isna() & series.notna()
+    if unparsed.any():
+        fallback = {value: _parse_datetime_fallback(value) for value in series[unparsed].unique()}
+        parsed = parsed.copy()
+        parsed[unparsed] = pd.to_datetime(series[unparsed].map(fallback), errors="coerce")
+
+    return parsed.dt.floor("min")
+
+
+def ensure_datetime(series, **kwargs):
+    """
+    Returns series as datetime64, running pd.to_datetime(series, errors="coerce", **kwargs)
+    only if it isn't already typed (e.g. data loaded from an older Excel export).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, errors="coerce", **kwargs)
+
+
+def _column(df, name):
+    """Returns a column of df, or a column of None if the API did not send it."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _has_session(value):
+    return isinstance(value, str) and value != ""
+
+
+def _loads(value):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return {}
+
+
+def parse_tm_sessions(values):
+    """
+    Parses a list of TMSessionId JSON strings with a single json.loads call,
+    falling back to one call per value if the batch does not parse cleanly.
+    """
+    if not values:
+        return []
+    try:
+        parsed = json.loads("[" + ",".join(values) + "]")
+        if len(parsed) == len(values):
+            return parsed
+    except ValueError:
+        pass
+    return [_loads(value) for value in values]
+
+
+def expand_seats(df):
+    """
+    Columnar replacement for the Step 7 loop over df.iterrows().
+
+    Orders with a TMSessionId become one row per seat in TMSessionId['Seats'], carrying the
+    seat's PriceBandName/Row/Number/AreaName/BlockId. Orders without one are kept as a single
+    row with LocationName, Order Id and Package Name added. Every row gets the Transaction Id
+    it came from. Rows stay in df order, and KickOffEventStart, CreatedOn and PaymentTime
+    come out as datetime64 columns.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=SEAT_RECORD_COLUMNS)
+
+    df = df.reset_index(drop=True)
+    order_ids = _column(df, "Id")
+
+    # Locations[0] gives the LocationName and, for orders without seats, the Order Id
+    first_locations = _column(df, "Locations").map(lambda locations: locations[0] if isinstance(locations, list) and locations else {})
+    location_names = first_locations.map(lambda location: location.get("LocationName", ""))
+    location_order_ids = pd.Series(
+        [location.get("Id") or order_id for location, order_id in zip(first_locations, order_ids)],
+        index=df.index,
+        dtype=object,
+    )
+
+    # 'Platinum' packages sold as a 'Seasonal Membership' are reported as just 'Platinum'
+    names = _column(df, "Name")
+    is_platinum = (_column(df, "Type") == "Seasonal Membership") & names.map(lambda name: isinstance(name, str) and "Platinum" in name)
+    package_names = names.where(~is_platinum, "Platinum")
+
+    kick_off = to_datetime_column(_column(df, "KickOffEventStart"))
+    created_on = to_datetime_column(_column(df, "CreatedOn"))
+    payment_time = to_datetime_column(_column(df, "PaymentTime"))
+
+    has_session = _column(df, "TMSessionId").map(_has_session)
+
+    # Orders with seat data: explode the Seats arrays into one row per seat
+    sessions = parse_tm_sessions(df.loc[has_session, "TMSessionId"].tolist()) if has_session.any() else []
+    seat_lists = [(session.get("Seats") or []) if isinstance(session, dict) else [] for session in sessions]
+    seat_counts = np.fromiter((len(seats) for seats in seat_lists), dtype=np.int64, count=len(seat_lists))
+    source = df.index[has_session.to_numpy()].repeat(seat_counts)
+    seats = pd.DataFrame.from_records(
+        [seat for seats in seat_lists for seat in seats],
+        columns=list(SEAT_FIELDS) + ["Seats"],
+    )
+
+    seat_rows = pd.DataFrame({"Order Id": order_ids.loc[source].to_numpy()})
+    seat_rows["Transaction Id"] = seat_rows["Order Id"]
+    for name in SEAT_TRANSACTION_COLUMNS:
+        seat_rows[name] = _column(df, name).loc[source].to_numpy()
+    # The order's own Seats value wins; the seat entry's is only used if the order has none
+    seat_rows["Seats"] = (_column(df, "Seats").loc[source] if "Seats" in df.columns else seats["Seats"]).to_numpy()
+    for field, name in SEAT_FIELDS.items():
+        seat_rows[name] = seats[field].to_numpy()
+    seat_rows["KickOffEventStart"] = kick_off.loc[source].to_numpy()
+    seat_rows["Package Name"] = package_names.loc[source].to_numpy()
+    seat_rows["LocationName"] = location_names.loc[source].to_numpy()
+    seat_rows["CreatedOn"] = created_on.loc[source].to_numpy()
+    seat_rows["PaymentTime"] = payment_time.loc[source].to_numpy()
+    seat_rows = seat_rows[SEAT_RECORD_COLUMNS]
+    seat_rows["_source"] = source
+
+    # Orders without seat data keep every transaction column
+    order_rows = df.loc[~has_session].copy()
+    order_rows["LocationName"] = location_names[~has_session]
+    order_rows["Order Id"] = location_order_ids[~has_session]
+    order_rows["Transaction Id"] = order_ids[~has_session]
+    order_rows["Package Name"] = package_names[~has_session]
+    order_rows["CreatedOn"] = created_on[~has_session]
+    order_rows["KickOffEventStart"] = kick_off[~has_session]
+    order_rows["PaymentTime"] = payment_time[~has_session]
+    order_rows["_source"] = order_rows.index
+
+    columns = SEAT_RECORD_COLUMNS + [column for column in order_rows.columns if column not in SEAT_RECORD_COLUMNS and column != "_source"]
+    final_df = pd.concat([seat_rows, order_rows], ignore_index=True)
+    final_df = final_df.sort_values("_source", kind="stable").reset_index(drop=True)
+    return final_df.reindex(columns=columns)
+
+
+def drop_duplicate_keys(df, key, columns=None):
+    """
+    Keeps the first row (in df order) of each distinct key, hashing only the key columns.
+    Rows without a Transaction Id can't be keyed, so of those only exact repeats across
+    columns (default: all of df's) are dropped.
+    """
+    keyed = df["Transaction Id"].notna().to_numpy()
+    duplicated = df.duplicated(subset=key, keep="first").to_numpy() & keyed
+    if not keyed.all():
+        unkeyed = df.loc[~keyed, columns if columns is not None else df.columns]
+        duplicated[~keyed] = unkeyed.duplicated(keep="first").to_numpy()
+    return df[~duplicated]
+
+
+def select_sales_columns(final_df):
+    """
+    Returns (filtered_df_with_seats, filtered_df_without_seats) from the expanded frame:
+    one row per SEAT_KEY and one row per SALES_KEY respectively. When the API repeats a
+    transaction, its first occurrence (event order, then API order) wins.
+    """
+    columns_with_seats = [col for col in final_df.columns if col in filtered_columns_with_seat_data]
+    columns_without_seats = [col for col in final_df.columns if col in filtered_columns_without_seat_data]
+    return (
+        drop_duplicate_keys(final_df, SEAT_KEY, columns_with_seats)[columns_with_seats],
+        drop_duplicate_keys(final_df, SALES_KEY, columns_without_seats)[columns_without_seats],
+    )
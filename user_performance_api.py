@@ -5,7 +5,7 @@ from io import BytesIO
 import re
 from datetime import datetime
 import seaborn as sns
-from tjt_hosp_api import filtered_df_without_seats
+from tjt_hosp_api import load_hospitality_sales
 
 # Helper Functions
 def filter_data_by_date_time(df, min_date, max_date):
@@ -43,7 +43,7 @@ def generate_kpis(filtered_data):
     total_packages = len(filtered_data)
     average_revenue_per_package = total_revenue / total_packages if total_packages > 0 else 0
     top_exec = (
-        filtered_data.groupby('CreatedBy')['TotalPrice'].sum().idxmax()
+        filtered_data.groupby('CreatedBy', observed=True)['TotalPrice'].sum().idxmax()
         if not filtered_data.empty else "N/A"
     )
 
@@ -68,7 +68,7 @@ def generate_sales_table(filtered_data):
     
     # Group by date and executive
     filtered_data['Date'] = filtered_data['CreatedOn'].dt.date
-    daily_sales = filtered_data.groupby(['Date', 'CreatedBy']).agg(
+    daily_sales = filtered_data.groupby(['Date', 'CreatedBy'], observed=True).agg(
         Transactions=('Order Id', 'count'),
         TotalRevenue=('TotalPrice', 'sum'),
         AvgRevenuePerTransaction=('TotalPrice', 'mean'),
@@ -138,7 +138,7 @@ def generate_revenue_chart(filtered_data):
     """Generate a bar chart for revenue by fixture."""
     st.write("### 📊 Revenue by Fixture")
     revenue_by_fixture = (
-        filtered_data.groupby('Fixture Name')['TotalPrice']
+        filtered_data.groupby('Fixture Name', observed=True)['TotalPrice']
         .sum()
         .sort_values(ascending=False)
     )
@@ -187,7 +187,7 @@ def run_app():
 
 
     # Load data
-    loaded_api_df = filtered_df_without_seats 
+    loaded_api_df = load_hospitality_sales()
 
     if loaded_api_df is not None and not loaded_api_df.empty:
         st.sidebar.success("✅ Data retrieved successfully.")